@@ -0,0 +1,315 @@
+"""
+ASR backends - the speech recognition engines SpeechToText can run on
+Faster-Whisper (accurate, the default) and Vosk (small Kaldi models for weak CPUs)
+share one interface; testing/backend_benchmark.py records which one suits this machine
+"""
+import importlib.util
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+from collections import namedtuple
+import numpy as np
+import config
+from asr_tuner import load_tuning
+
+# One decoded segment
+#   text: Segment text
+#   words: (start, end, word) tuples in seconds from the start of the audio,
+#          word text keeps its leading space (empty without word timestamps)
+Segment = namedtuple("Segment", ["text", "words"])
+
+
+class ASRBackend(ABC):
+    """
+    Base class for speech recognition engines.
+
+    A backend loads models and decodes int16 mono audio at
+    config.AUDIO_SAMPLE_RATE into Segments. It is stateless apart from
+    what it caches per model, so one instance can serve several models
+    and threads. SpeechToText builds tiers, profiles, warm-up and streaming
+    (local agreement over transcribe()) on top of these methods.
+    """
+
+    name = None   # Key in BACKENDS and config.ASR_BACKEND
+    label = None  # Name shown in logs
+    module = None  # Python package the backend needs
+
+    @classmethod
+    def is_available(cls):
+        """True if the backend's package is installed (checked without importing it)"""
+        return importlib.util.find_spec(cls.module) is not None
+
+    @abstractmethod
+    def model_name(self, partial=False):
+        """Model for committed text, or for streaming partials (same name = no partials tier)"""
+
+    def thread_budget(self):
+        """Threads shared by all models, as tuned for this machine (None = not tuned)"""
+        return None
+
+    def result_settings(self):
+        """Engine settings besides the model that change decode results (part of cache keys)"""
+        return {}
+
+    def tune(self, force=False, **options):
+        """Tune settings for this machine if it wasn't tuned yet, returns True if they changed"""
+        return False
+
+    @abstractmethod
+    def load(self, name, settings, cpu_threads):
+        """
+        Load a model
+
+        Args:
+            name: Model name or path
+            settings: Decoding profile from config.ASR_PROFILES
+            cpu_threads: Threads the model may use
+
+        Returns:
+            Model object passed back to transcribe()
+        """
+
+    @abstractmethod
+    def transcribe(self, model, audio_data, settings, word_timestamps=False, vad_filter=True, initial_prompt=None):
+        """
+        Decode audio (raises on errors)
+
+        Args:
+            model: Model from load()
+            audio_data: numpy array of int16 audio samples
+            settings: Decoding profile from config.ASR_PROFILES
+            word_timestamps: Fill in Segment.words
+            vad_filter: Drop silence before decoding
+            initial_prompt: Text spoken before the audio (decoder context)
+
+        Returns:
+            list: Segments
+        """
+
+    def batch_clip_seconds(self, model):
+        """Longest clip (s) transcribe_batch() decodes in full (None = no limit)"""
+        return None
+
+    def transcribe_batch(self, model, audio_data, clips, settings):
+        """
+        Decode several clips of one buffer in one call (with word timestamps)
+
+        Args:
+            clips: (start, end) sample range of every clip in audio_data, none longer than batch_clip_seconds()
+
+        Returns:
+            list: Segments, word times relative to the start of audio_data
+
+        Raises:
+            NotImplementedError: The backend has no batched decoding (clips are decoded one by one)
+        """
+        raise NotImplementedError
+
+
+class FasterWhisperBackend(ASRBackend):
+    """Whisper models on CTranslate2 - accurate, the fastest Whisper on CPU"""
+
+    name = "faster-whisper"
+    label = "Faster-Whisper"
+    module = "faster_whisper"
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pipelines = {}  # id(model) -> BatchedInferencePipeline
+        self.tuning = load_tuning()  # ASRTuner result for this machine (None = configured settings)
+
+    def model_name(self, partial=False):
+        if partial:
+            return config.ASR_PARTIAL_MODEL or self.model_name()
+        return self.tuning["model"] if self.tuning else config.ASR_MODEL
+
+    def thread_budget(self):
+        return self.tuning["cpu_threads"] if self.tuning else None
+
+    def result_settings(self):
+        return {
+            "device": config.ASR_DEVICE,
+            "compute_type": self.tuning["compute_type"] if self.tuning else config.ASR_COMPUTE_TYPE,
+        }
+
+    def tune(self, force=False, **options):
+        """
+        Run ASRTuner and remember its pick for this machine
+
+        Args:
+            force: Tune again even if this machine was tuned already
+            **options: ASRTuner arguments (candidates, target RTF, audio)
+        """
+        if self.tuning is not None and not force:
+            return False
+        if options.get("audio") is None and not config.ASR_TUNING_AUDIO:
+            print("[FasterWhisperBackend] No tuning recording (config.ASR_TUNING_AUDIO), keeping the configured settings")
+            return False
+        from asr_tuner import ASRTuner, save_tuning
+        tuning = ASRTuner(self, **options).run()
+        if tuning is None:
+            return False
+        save_tuning(tuning)
+        self.tuning = tuning
+        return True
+
+    def load(self, name, settings, cpu_threads):
+        compute_type = self.tuning["compute_type"] if self.tuning else config.ASR_COMPUTE_TYPE
+        num_workers = settings["num_workers"] or (self.tuning["num_workers"] if self.tuning else 1)
+        return self.load_model(name, compute_type, cpu_threads, num_workers)
+
+    def load_model(self, name, compute_type, cpu_threads, num_workers):
+        """Load a Whisper model with explicit settings (also used by ASRTuner for its candidates)"""
+        from faster_whisper import WhisperModel  # Heavy import (CTranslate2), kept off the startup path
+
+        # compute_type: "int8" for CPU, "float16" for GPU
+        return WhisperModel(
+            name,
+            device=config.ASR_DEVICE,
+            compute_type=compute_type,
+            cpu_threads=cpu_threads,
+            num_workers=num_workers,  # Transcriptions the model can run in parallel
+            download_root=None  # Uses default cache
+        )
+
+    def transcribe(self, model, audio_data, settings, word_timestamps=False, vad_filter=True, initial_prompt=None):
+        # Convert int16 to float32 normalized to [-1.0, 1.0]
+        audio_float = audio_data.astype(np.float32) / 32768.0
+
+        segments, info = model.transcribe(
+            audio_float,
+            language=config.ASR_LANGUAGE,
+            beam_size=settings["beam_size"],
+            best_of=settings["best_of"],
+            temperature=list(settings["temperature"]),
+            without_timestamps=settings["without_timestamps"],
+            word_timestamps=word_timestamps,
+            initial_prompt=initial_prompt,
+            vad_filter=vad_filter,  # Voice Activity Detection
+            vad_parameters=dict(
+                min_silence_duration_ms=config.ASR_VAD_MIN_SILENCE_MS,
+                threshold=config.ASR_VAD_THRESHOLD
+            )
+        )
+
+        # Segments are generated lazily - decode everything now
+        return [self._segment(segment) for segment in segments]
+
+    def batch_clip_seconds(self, model):
+        # The batched pipeline pads or trims every clip's features to one 30s window
+        return model.feature_extractor.chunk_length
+
+    def transcribe_batch(self, model, audio_data, clips, settings):
+        audio_float = audio_data.astype(np.float32) / 32768.0
+        segments, info = self._pipeline(model).transcribe(
+            audio_float,
+            language=config.ASR_LANGUAGE,
+            beam_size=settings["beam_size"],
+            best_of=settings["best_of"],
+            temperature=list(settings["temperature"]),
+            without_timestamps=settings["without_timestamps"],
+            word_timestamps=True,
+            vad_filter=False,  # Chunks are speech-only already, clips mark where each one is
+            clip_timestamps=[{"start": start, "end": end} for start, end in clips],
+            batch_size=len(clips)
+        )
+        return [self._segment(segment) for segment in segments]
+
+    def _pipeline(self, model):
+        """Batched decoding on a loaded model (created on first use; needs faster-whisper 1.1+)"""
+        with self.lock:
+            if id(model) not in self.pipelines:
+                from faster_whisper import BatchedInferencePipeline
+                self.pipelines[id(model)] = BatchedInferencePipeline(model=model)
+            return self.pipelines[id(model)]
+
+    @staticmethod
+    def _segment(segment):
+        return Segment(segment.text, [(word.start, word.end, word.word) for word in segment.words or []])
+
+
+class VoskBackend(ASRBackend):
+    """
+    Kaldi models through Vosk - ~50MB, a fraction of Whisper's CPU time and
+    memory, less accurate. Decoding profiles, prompts and the thread budget
+    don't apply; Vosk finds its own pauses, so vad_filter is ignored too.
+    """
+
+    name = "vosk"
+    label = "Vosk"
+    module = "vosk"
+
+    def model_name(self, partial=False):
+        return config.VOSK_MODEL
+
+    def load(self, name, settings, cpu_threads):
+        import vosk
+        vosk.SetLogLevel(-1)
+        if os.path.isdir(name):
+            return vosk.Model(name)
+        return vosk.Model(model_name=name)  # Downloaded on first use
+
+    def transcribe(self, model, audio_data, settings, word_timestamps=False, vad_filter=True, initial_prompt=None):
+        import vosk
+        recognizer = vosk.KaldiRecognizer(model, config.AUDIO_SAMPLE_RATE)
+        recognizer.SetWords(word_timestamps)
+
+        # The recognizer closes an utterance at every pause it hears
+        results = []
+        data = np.ascontiguousarray(audio_data, dtype=np.int16).tobytes()
+        step = config.AUDIO_SAMPLE_RATE * 2  # One second of int16 audio per call
+        for start in range(0, len(data), step):
+            if recognizer.AcceptWaveform(data[start:start + step]):
+                results.append(json.loads(recognizer.Result()))
+        results.append(json.loads(recognizer.FinalResult()))
+
+        # Match Whisper's word text, which carries its own leading space
+        return [Segment(" " + result["text"], [(word["start"], word["end"], " " + word["word"])
+                                                for word in result.get("result", [])])
+                for result in results if result.get("text")]
+
+
+BACKENDS = {backend.name: backend for backend in (FasterWhisperBackend, VoskBackend)}
+
+
+def available_backends():
+    """Names of the backends whose packages are installed"""
+    return [name for name, backend in BACKENDS.items() if backend.is_available()]
+
+
+def load_backend_choice():
+    """Backend recorded by testing/backend_benchmark.py for this machine (None if there is none)"""
+    try:
+        with open(config.ASR_BACKEND_CHOICE_FILE, encoding="utf-8") as f:
+            return json.load(f)["backend"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def save_backend_choice(name, results):
+    """Record the backend to use on this machine, with the benchmark results it was picked from"""
+    os.makedirs(os.path.dirname(config.ASR_BACKEND_CHOICE_FILE), exist_ok=True)
+    with open(config.ASR_BACKEND_CHOICE_FILE, "w", encoding="utf-8") as f:
+        json.dump({"backend": name, "results": results}, f, indent=2)
+
+
+def get_backend(name=None):
+    """
+    Create a backend
+
+    Args:
+        name: Backend name (default: config.ASR_BACKEND, then the benchmarked
+              choice for this machine if it is still installed, then Faster-Whisper)
+
+    Returns:
+        ASRBackend
+    """
+    name = name or config.ASR_BACKEND
+    if name is None:
+        recorded = load_backend_choice()
+        name = recorded if recorded in BACKENDS and BACKENDS[recorded].is_available() else "faster-whisper"
+    try:
+        return BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown ASR backend: {name}") from None
@@ -0,0 +1,210 @@
+"""
+ASR tuner - times real transcription on this machine across model sizes,
+compute types and thread settings, and remembers the best setting that keeps up
+"""
+import json
+import os
+import platform
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+import config
+from audio_sources import FileAudioSource
+
+
+def machine_fingerprint():
+    """What the tuning result depends on - a different machine or candidate set is tuned again"""
+    return {
+        "system": platform.system(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "device": config.ASR_DEVICE,
+        "models": list(config.ASR_TUNING_MODELS),
+        "target_rtf": config.ASR_TUNING_TARGET_RTF,
+    }
+
+
+def load_tuning():
+    """Tuned settings for this machine (None if it wasn't tuned yet)"""
+    try:
+        with open(config.ASR_TUNING_FILE, encoding="utf-8") as f:
+            tuning = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return tuning if tuning.get("machine") == machine_fingerprint() else None
+
+
+def save_tuning(tuning):
+    """Remember tuned settings for this machine"""
+    os.makedirs(os.path.dirname(config.ASR_TUNING_FILE), exist_ok=True)
+    with open(config.ASR_TUNING_FILE, "w", encoding="utf-8") as f:
+        json.dump(tuning, f, indent=2)
+
+
+class ASRTuner:
+    """
+    Picks Faster-Whisper settings for this machine by timing real decodes.
+
+    Candidates are tried from most to least accurate: model sizes in
+    reverse order of config.ASR_TUNING_MODELS, and for each model its
+    compute types from fastest to most precise. The most accurate model
+    whose fastest compute type meets `target_rtf` wins, with the most
+    precise compute type that still meets it. The thread count is then
+    tuned for the lowest latency, and num_workers > 1 is only kept if
+    parallel decodes give clearly more throughput. If nothing meets the
+    target, the fastest candidate is used.
+    """
+
+    def __init__(self, backend, audio=None, models=None, compute_types=None, threads=None, workers=None,
+                 target_rtf=None, profile=None, repeats=2):
+        """
+        Initialize tuner
+
+        Args:
+            backend: FasterWhisperBackend that loads and runs the candidates
+            audio: int16 speech to decode (default: the recording in config.ASR_TUNING_AUDIO)
+            models: Model sizes, least to most accurate (default: config.ASR_TUNING_MODELS)
+            compute_types: Compute types, fastest to most precise (default: config.ASR_TUNING_COMPUTE_TYPES)
+            threads: cpu_threads values to try (default: all, half and a quarter of the cores)
+            workers: num_workers values to try (default: config.ASR_TUNING_WORKERS)
+            target_rtf: Slowest acceptable decode time / audio length (default: config.ASR_TUNING_TARGET_RTF)
+            profile: Decoding profile the decodes use, without temperature fallback (default: config.ASR_DEFAULT_PROFILE)
+            repeats: Timed decodes per candidate (median is used, after one untimed decode)
+        """
+        self.backend = backend
+        if audio is None:
+            audio = self._fixture_audio()
+        self.audio = audio
+        self.seconds = len(audio) / config.AUDIO_SAMPLE_RATE
+        self.models = list(models or config.ASR_TUNING_MODELS)
+        self.compute_types = self._supported(compute_types or config.ASR_TUNING_COMPUTE_TYPES)
+        cores = os.cpu_count() or 4
+        self.threads = list(threads or dict.fromkeys([cores, max(1, cores // 2), max(1, cores // 4)]))
+        self.workers = list(workers or config.ASR_TUNING_WORKERS)
+        self.target_rtf = target_rtf if target_rtf is not None else config.ASR_TUNING_TARGET_RTF
+        # Fallback temperatures only run on unreliable decodes - they would make the timings depend on the clip
+        settings = config.ASR_PROFILES[profile or config.ASR_DEFAULT_PROFILE]
+        self.settings = dict(settings, temperature=settings["temperature"][:1])
+        self.repeats = repeats
+        self.results = []  # Every measurement, in the order it was taken
+
+    @staticmethod
+    def _fixture_audio():
+        """Tuning clip from config.ASR_TUNING_AUDIO - timings on anything but speech say nothing about dictation"""
+        if not config.ASR_TUNING_AUDIO:
+            raise ValueError("ASR tuning needs a speech recording (config.ASR_TUNING_AUDIO)")
+        seconds = config.ASR_TUNING_SECONDS
+        return FileAudioSource(config.ASR_TUNING_AUDIO).samples[:int(seconds * config.AUDIO_SAMPLE_RATE)]
+
+    @staticmethod
+    def _supported(compute_types):
+        """Compute types CTranslate2 can run on config.ASR_DEVICE (all of them if it can't tell)"""
+        try:
+            import ctranslate2
+            supported = ctranslate2.get_supported_compute_types(config.ASR_DEVICE)
+        except Exception:
+            return list(compute_types)
+        return [compute_type for compute_type in compute_types if compute_type in supported]
+
+    def run(self):
+        """
+        Measure candidates and pick the setting for this machine
+
+        Returns:
+            dict: model, compute_type, cpu_threads, num_workers, rtf, the machine
+                  fingerprint and every measurement (None if no candidate could run)
+        """
+        print(f"[ASRTuner] Tuning on {self.seconds:.1f}s of audio for RTF <= {self.target_rtf}...")
+        start = time.perf_counter()
+        all_threads = self.threads[0]
+
+        # Most accurate model that keeps up, with the most precise compute type that still does
+        best = None
+        fastest = None  # Used if nothing meets the target
+        for model in reversed(self.models):
+            for compute_type in self.compute_types:
+                result = self._measure(model, compute_type, all_threads, 1)
+                if result is None:
+                    continue
+                if fastest is None or result["rtf"] < fastest["rtf"]:
+                    fastest = result
+                if result["rtf"] > self.target_rtf:
+                    break  # More precise compute types are slower still
+                best = result
+            if best is not None:
+                break
+        best = best or fastest
+        if best is None:
+            print("[ASRTuner] No candidate could be loaded, keeping the configured settings")
+            return None
+
+        # Lowest latency thread count for that setting
+        for threads in self.threads[1:]:
+            result = self._measure(best["model"], best["compute_type"], threads, 1)
+            if result is not None and result["rtf"] < best["rtf"]:
+                best = result
+
+        # Parallel decodes only pay off if they clearly add throughput
+        single = best
+        for workers in self.workers:
+            if workers <= 1:
+                continue
+            result = self._measure(single["model"], single["compute_type"], single["cpu_threads"], workers)
+            if result is not None and result["throughput_rtf"] < 0.8 * best["throughput_rtf"]:
+                best = dict(result, rtf=single["rtf"])
+
+        tuning = {
+            "machine": machine_fingerprint(),
+            "model": best["model"],
+            "compute_type": best["compute_type"],
+            "cpu_threads": best["cpu_threads"],
+            "num_workers": best["num_workers"],
+            "rtf": best["rtf"],
+            "tuned_seconds": time.perf_counter() - start,
+            "results": self.results,
+        }
+        met = "meets" if best["rtf"] <= self.target_rtf else "misses"
+        print(f"[ASRTuner] Picked {best['model']} ({best['compute_type']}, {best['cpu_threads']} threads, "
+              f"{best['num_workers']} workers): RTF {best['rtf']:.3f} {met} the target "
+              f"(tuned in {tuning['tuned_seconds']:.0f}s)")
+        return tuning
+
+    def _measure(self, model_name, compute_type, cpu_threads, num_workers):
+        """Load one candidate and time decodes with it (None if it can't be loaded)"""
+        print(f"[ASRTuner] {model_name} {compute_type}, {cpu_threads} threads, {num_workers} workers...")
+        try:
+            load_start = time.perf_counter()
+            model = self.backend.load_model(model_name, compute_type, cpu_threads, num_workers)
+            load_seconds = time.perf_counter() - load_start
+            self._decode(model)  # Lazy setup isn't part of the steady state
+
+            if num_workers == 1:
+                times = []
+                for _ in range(self.repeats):
+                    decode_start = time.perf_counter()
+                    self._decode(model)
+                    times.append(time.perf_counter() - decode_start)
+                rtf = statistics.median(times) / self.seconds
+                throughput_rtf = rtf
+            else:
+                # One decode per worker at the same time, as queued chunks would run
+                rtf = None
+                with ThreadPoolExecutor(max_workers=num_workers) as executor:
+                    decode_start = time.perf_counter()
+                    list(executor.map(lambda _: self._decode(model), range(num_workers)))
+                    throughput_rtf = (time.perf_counter() - decode_start) / (num_workers * self.seconds)
+        except Exception as e:
+            print(f"[ASRTuner] {model_name} {compute_type} failed: {e}")
+            return None
+        finally:
+            model = None  # Free the model before the next candidate loads
+
+        result = {
+            "model": model_name, "compute_type": compute_type, "cpu_threads": cpu_threads,
+            "num_workers": num_workers, "load_seconds": load_seconds, "rtf": rtf, "throughput_rtf": throughput_rtf,
+        }
+        self.results.append(result)
+        return result
+
+    def _decode(self, model):
+        self.backend.transcribe(model, self.audio, self.settings, word_timestamps=True, vad_filter=False)
@@ -0,0 +1,260 @@
+"""
+ASR worker process - runs the speech model outside the UI process
+Audio is handed over through shared memory (no pickling of sample arrays),
+results come back over a queue, so transcription never holds the UI's GIL
+"""
+import functools
+import itertools
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+import numpy as np
+import config
+from streaming_transcriber import StreamingTranscriber
+
+
+def _attach_shared_memory(name):
+    """Open an existing block without handing it to this process's resource tracker"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+def _worker_main(requests, results):
+    """
+    Worker process entry point: owns the model and serves requests until told to stop
+
+    Requests are (job_id, method, block_name, sample_count, kwargs) tuples,
+    None stops the worker. Results are (job_id, value, error) tuples.
+    """
+    from speech_to_text import SpeechToText  # Model loads here, not in the UI process
+
+    try:
+        stt = SpeechToText()
+        stt.load()
+    except Exception as e:
+        results.put(("ready", None, f"Model failed to load: {e}"))
+        return
+    results.put(("ready", stt.tiered, None))
+
+    while True:
+        request = requests.get()
+        if request is None:
+            break
+
+        job_id, method, block_name, sample_count, kwargs = request
+        block = None
+        audio = None
+        try:
+            block = _attach_shared_memory(block_name)
+            audio = np.ndarray((sample_count,), dtype=np.int16, buffer=block.buf)
+            results.put((job_id, getattr(stt, method)(audio, **kwargs), None))
+        except Exception as e:
+            results.put((job_id, None, str(e)))
+        finally:
+            audio = None  # Release the export before closing the block
+            if block is not None:
+                block.close()
+
+
+class TranscriptionWorker:
+    """
+    SpeechToText stand-in that forwards work to a persistent worker process.
+
+    transcribe_audio(), transcribe_words() and transcribe_window() block like
+    SpeechToText's; submit() returns a concurrent.futures.Future instead. Each
+    job copies its audio once into a shared memory block that the worker
+    reads in place.
+    The process is started on construction and restarted if it dies.
+    """
+
+    def __init__(self):
+        self.context = multiprocessing.get_context("spawn")  # Same behaviour on Windows and Linux
+        self.lock = threading.Lock()
+        self.job_ids = itertools.count(1)
+        self.jobs = {}  # Job id -> (Future, SharedMemory block)
+        self.process = None
+        self.ready = threading.Event()  # Set once the worker has loaded the model
+        self.tiered = None  # Whether the worker has a partials model (known once it is ready)
+        self._start_process()
+
+    def _start_process(self):
+        """Spawn the worker and the thread that collects its results"""
+        self.ready.clear()
+        self.requests = self.context.Queue()
+        self.results = self.context.Queue()
+        self.process = self.context.Process(
+            target=_worker_main, args=(self.requests, self.results),
+            name="WriteForMe-ASR", daemon=True
+        )
+        self.process.start()
+        print(f"[TranscriptionWorker] Started ASR worker process (pid {self.process.pid})")
+
+        threading.Thread(
+            target=self._collect_results, args=(self.process, self.results), daemon=True
+        ).start()
+
+    def _collect_results(self, process, results):
+        """Resolve futures as results arrive, fail them if the worker dies"""
+        while True:
+            try:
+                job_id, value, error = results.get(timeout=1.0)
+            except queue.Empty:
+                if process.is_alive():
+                    continue
+                with self.lock:
+                    if process is not self.process:
+                        return  # Already replaced after close()
+                    self.process = None
+                    failed = list(self.jobs.values())
+                    self.jobs = {}
+                print(f"[TranscriptionWorker] ASR worker exited (code {process.exitcode})")
+                for future, block in failed:
+                    self._free_block(block)
+                    future.set_exception(RuntimeError("ASR worker process exited"))
+                return
+            except (EOFError, OSError):
+                return  # Queue closed by close()
+
+            if job_id == "ready":
+                if error:
+                    print(f"[TranscriptionWorker] {error}")
+                else:
+                    print("[TranscriptionWorker] ASR worker ready")
+                    self.tiered = value
+                    self.ready.set()
+                continue
+
+            with self.lock:
+                future, block = self.jobs.pop(job_id, (None, None))
+            if future is None:
+                continue
+            self._free_block(block)
+            if error:
+                future.set_exception(RuntimeError(error))
+            else:
+                future.set_result(value)
+
+    def _free_block(self, block):
+        block.close()
+        try:
+            block.unlink()
+        except FileNotFoundError:
+            pass
+
+    def submit(self, method, audio_data, **kwargs):
+        """
+        Queue a transcription in the worker process
+
+        Args:
+            method: SpeechToText method to run (e.g. "transcribe_words")
+            audio_data: numpy array of int16 audio samples (copied into shared memory)
+            **kwargs: Extra arguments for the method (must be picklable)
+
+        Returns:
+            concurrent.futures.Future: Resolves to the method's return value
+        """
+        samples = np.asarray(audio_data, dtype=np.int16)
+        block = shared_memory.SharedMemory(create=True, size=max(samples.nbytes, 1))
+        np.ndarray(samples.shape, dtype=np.int16, buffer=block.buf)[:] = samples
+
+        future = Future()
+        with self.lock:
+            if self.process is None:
+                self._start_process()
+            job_id = next(self.job_ids)
+            self.jobs[job_id] = (future, block)
+            self.requests.put((job_id, method, block.name, len(samples), kwargs))
+        return future
+
+    def load(self):
+        """Wait until the worker process has loaded the model (raises if it exited first)"""
+        while not self.ready.wait(timeout=1.0):
+            with self.lock:
+                process = self.process
+            if process is None or not process.is_alive():
+                raise RuntimeError("ASR worker process exited before the model was loaded")
+
+    def transcribe_audio(self, audio_data, vad_filter=True, profile=None):
+        """Same as SpeechToText.transcribe_audio, run in the worker process"""
+        if audio_data is None or len(audio_data) == 0:
+            return ""
+        try:
+            return self.submit("transcribe_audio", audio_data, vad_filter=vad_filter, profile=profile).result()
+        except Exception as e:
+            print(f"[TranscriptionWorker] Error: {e}")
+            return ""
+
+    def transcribe_words(self, audio_data, offset=0.0, segment_map=None, profile=None):
+        """Same as SpeechToText.transcribe_words, run in the worker process"""
+        if audio_data is None or len(audio_data) == 0:
+            return []
+        try:
+            return self.submit("transcribe_words", audio_data, offset=offset, segment_map=segment_map,
+                               profile=profile).result()
+        except Exception as e:
+            print(f"[TranscriptionWorker] Error: {e}")
+            return []
+
+    def transcribe_words_batch(self, audio_data, clips, profile=None):
+        """Same as SpeechToText.transcribe_words_batch, run in the worker process"""
+        try:
+            return self.submit("transcribe_words_batch", audio_data, clips=clips, profile=profile).result()
+        except Exception as e:
+            print(f"[TranscriptionWorker] Error: {e}")
+            return [[] for _ in clips]
+
+    def transcribe_window(self, audio_data, offset=0.0, initial_prompt=None, partial=False, profile=None):
+        """Same as SpeechToText.transcribe_window, run in the worker process"""
+        if audio_data is None or len(audio_data) == 0:
+            return []
+        try:
+            return self.submit("transcribe_window", audio_data, offset=offset, initial_prompt=initial_prompt,
+                               partial=partial, profile=profile).result()
+        except Exception as e:
+            print(f"[TranscriptionWorker] Error: {e}")
+            return []
+
+    def transcribe_stream(self, audio_stream, profile=None):
+        """
+        Same as SpeechToText.transcribe_stream, each window is decoded in the worker process
+
+        The worker serves one request at a time, so with two model tiers a
+        finalize call holds back the partials queued behind it.
+        """
+        decode = functools.partial(self.transcribe_window, profile=profile)
+        tiered = self.tiered
+        if tiered is None:
+            # Still loading - tuning may pick other models, so this is only a guess
+            partial_name = config.ASR_PARTIAL_MODEL
+            tiered = config.ASR_STREAMING and partial_name and partial_name != config.ASR_MODEL
+        if tiered:
+            transcriber = StreamingTranscriber(functools.partial(self.transcribe_window, partial=True),
+                                               finalize=decode)
+        else:
+            transcriber = StreamingTranscriber(decode)
+        return transcriber.stream(audio_stream)
+
+    def close(self):
+        """Stop the worker process and fail anything still queued"""
+        with self.lock:
+            process = self.process
+            self.process = None
+            pending = list(self.jobs.values())
+            self.jobs = {}
+        if process is None:
+            return
+
+        try:
+            self.requests.put(None)
+            process.join(timeout=5)
+        finally:
+            if process.is_alive():
+                process.terminate()
+            for future, block in pending:
+                self._free_block(block)
+                future.set_exception(RuntimeError("ASR worker closed"))
+        print("[TranscriptionWorker] ASR worker stopped")
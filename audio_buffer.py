@@ -0,0 +1,251 @@
+"""
+Audio buffer module - storage for recorded audio samples (RAM ring buffer or on-disk session file)
+"""
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+import numpy as np
+import config
+
+
+class _AudioStore:
+    """
+    Single-writer, multi-reader bookkeeping shared by the audio stores.
+
+    The owner marks audio it no longer needs with release(). Other readers
+    (VAD/visualizer, in-flight chunk transcriptions) hold references with
+    retain() so the region they read from is not reused underneath them.
+    Storage before `retained_from` - the oldest of all of these - is free.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._references = {}  # Reader key -> oldest position the reader still needs
+        self.write_pos = 0     # Absolute index of the next sample to write
+        self.read_pos = 0      # Absolute index of the oldest sample the owner still needs
+
+    def __len__(self):
+        """Number of retained samples"""
+        return self.write_pos - self.read_pos
+
+    @property
+    def retained_from(self):
+        """Oldest position still needed by the owner or any reader"""
+        with self._lock:
+            return self._retained_from()
+
+    def _retained_from(self):
+        return min(self.read_pos, min(self._references.values(), default=self.read_pos))
+
+    def release(self, position):
+        """Mark everything before `position` as no longer needed by the owner"""
+        with self._lock:
+            self.read_pos = max(self.read_pos, min(position, self.write_pos))
+
+    def retain(self, key, position):
+        """
+        Keep audio from `position` on available for a reader
+
+        Args:
+            key: Hashable reader identifier (calling again moves its reference)
+            position: Oldest absolute position the reader will still view
+        """
+        with self._lock:
+            self._references[key] = position
+
+    def drop(self, key):
+        """Remove a reader's reference (no-op if it has none)"""
+        with self._lock:
+            self._references.pop(key, None)
+
+    def _check_range(self, start, end):
+        """Resolve `end` and make sure [start, end) is still stored"""
+        if end is None:
+            end = self.write_pos
+        retained_from = self._retained_from()
+        if start < retained_from or end > self.write_pos or start > end:
+            raise ValueError(
+                f"Range [{start}, {end}) outside retained audio "
+                f"[{retained_from}, {self.write_pos})"
+            )
+        return end
+
+
+class AudioRingBuffer(_AudioStore):
+    """
+    Fixed-capacity int16 ring buffer for recorded audio.
+
+    Every sample is stored twice (at i and i + capacity) so any window of up
+    to `capacity` samples is contiguous and can be handed out as a zero-copy
+    view. Positions are absolute sample counts since the last reset().
+    """
+
+    def __init__(self, capacity):
+        """
+        Initialize ring buffer
+
+        Args:
+            capacity: Number of samples that can be retained at once
+        """
+        super().__init__()
+        self.capacity = int(capacity)
+        self._data = np.zeros(self.capacity * 2, dtype=np.int16)
+
+    def reset(self):
+        """Forget all samples and references (storage is reused, nothing is reallocated)"""
+        with self._lock:
+            self._references = {}
+            self.write_pos = 0
+            self.read_pos = 0
+
+    def write(self, samples):
+        """Append samples, called from the audio callback"""
+        count = len(samples)
+        if count == 0:
+            return
+
+        with self._lock:
+            retained_from = self._retained_from()
+            needed = self.write_pos + count - retained_from
+            if needed > self.capacity:
+                self._grow(retained_from, needed)
+            self._store(self.write_pos, samples)
+            self.write_pos += count
+
+    def view(self, start, end=None):
+        """
+        Get a zero-copy view of samples [start, end)
+
+        Args:
+            start: Absolute start position (must still be retained)
+            end: Absolute end position (default: everything written so far)
+
+        Returns:
+            numpy.ndarray: int16 view into the buffer storage
+        """
+        with self._lock:
+            end = self._check_range(start, end)
+            offset = start % self.capacity
+            return self._data[offset:offset + (end - start)]
+
+    def close(self):
+        """Nothing to release - storage is freed with the last view"""
+        pass
+
+    def _store(self, position, samples):
+        """Copy samples into both halves of the storage starting at `position`"""
+        offset = position % self.capacity
+        first = min(len(samples), self.capacity - offset)
+        rest = len(samples) - first
+
+        self._data[offset:offset + first] = samples[:first]
+        self._data[offset + self.capacity:offset + self.capacity + first] = samples[:first]
+        if rest:
+            self._data[:rest] = samples[first:]
+            self._data[self.capacity:self.capacity + rest] = samples[first:]
+
+    def _grow(self, retained_from, needed):
+        """Reallocate storage when retained audio would otherwise be overwritten"""
+        retained = self._data[retained_from % self.capacity:][:self.write_pos - retained_from].copy()
+        new_capacity = max(self.capacity * 2, needed)
+        print(f"[AudioRingBuffer] Growing buffer to {new_capacity / config.AUDIO_SAMPLE_RATE:.0f}s of audio")
+
+        # Views handed out earlier keep the old array alive, so they stay valid
+        self.capacity = new_capacity
+        self._data = np.zeros(self.capacity * 2, dtype=np.int16)
+        self._store(retained_from, retained)
+
+
+class SessionAudioStore(_AudioStore):
+    """
+    Append-only on-disk store for one recording session.
+
+    Samples are appended to a raw int16 file as they arrive, so a crash loses
+    at most the buffer being written. Views are np.memmap slices of the file:
+    zero-copy, and the OS page cache (not the process) holds the audio. Same
+    interface as AudioRingBuffer, so AudioRecorder can use either.
+    """
+
+    def __init__(self, directory=None):
+        """
+        Initialize session store
+
+        Args:
+            directory: Where session files are written (default: config.AUDIO_SESSION_DIR)
+        """
+        super().__init__()
+        self.directory = Path(directory or config.AUDIO_SESSION_DIR)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._file = None
+        self.path = None
+
+        self._remove_stale_files()
+        self._open_file()
+
+    def _open_file(self):
+        """Start a new session file"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        self.path = self.directory / f"session_{timestamp}_{os.getpid()}.pcm"
+        self._file = open(self.path, "w+b", buffering=0)  # Unbuffered: every write reaches the OS
+        self._references = {}
+        self.write_pos = 0
+        self.read_pos = 0
+
+    def _remove_stale_files(self):
+        """Delete session files left behind longer than config.AUDIO_SESSION_KEEP_HOURS"""
+        cutoff = time.time() - config.AUDIO_SESSION_KEEP_HOURS * 3600
+        for path in self.directory.glob("session_*.pcm"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except OSError:
+                pass  # Still mapped by another process, try again next time
+
+    def reset(self):
+        """Delete the current session file and start a new one (references are forgotten)"""
+        with self._lock:
+            self._close_file()
+            self._open_file()
+
+    def write(self, samples):
+        """Append samples, called from the audio callback"""
+        if len(samples) == 0:
+            return
+
+        with self._lock:
+            self._file.write(memoryview(np.ascontiguousarray(samples, dtype=np.int16)).cast('B'))
+            self.write_pos += len(samples)
+
+    def view(self, start, end=None):
+        """
+        Get a zero-copy, read-only view of samples [start, end)
+
+        Args:
+            start: Absolute start position (must still be retained)
+            end: Absolute end position (default: everything written so far)
+
+        Returns:
+            numpy.ndarray: int16 memory-mapped view of the session file
+        """
+        with self._lock:
+            end = self._check_range(start, end)
+            if end == start:
+                return np.zeros(0, dtype=np.int16)  # Empty ranges can't be mapped
+            return np.memmap(self.path, dtype=np.int16, mode="r", offset=start * 2, shape=(end - start,))
+
+    def close(self):
+        """Close and delete the session file"""
+        with self._lock:
+            self._close_file()
+
+    def _close_file(self):
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        try:
+            self.path.unlink()
+        except OSError:
+            pass  # Views are still mapped (Windows) - removed as a stale file later
@@ -1,24 +1,41 @@
 """
 Audio recording module for continuous microphone input with streaming chunks
 """
-import pyaudio
 import numpy as np
 import threading
 import queue
 import config
 import webrtcvad
 import time
+from concurrent.futures import Future
+from audio_buffer import AudioRingBuffer, SessionAudioStore
+from audio_sources import PyAudioSource
+from speech_segments import SpeechTimeline, SegmentMap, compact_speech
 
 
 class AudioRecorder:
-    def __init__(self):
-        self.audio = pyaudio.PyAudio()
-        self.stream = None
+    def __init__(self, source=None):
+        """
+        Initialize recorder
+        
+        Args:
+            source: AudioSource to record from (default: live microphone via PyAudio)
+        """
+        self.source = source if source is not None else PyAudioSource()
         self.is_recording = False
         self.audio_queue = queue.Queue() # For transcription (full audio)
-        self.raw_queue = queue.Queue()   # For visualizer processing
-        self.level_queue = queue.Queue() # For GUI updates
-        self.audio_buffer = []
+        self.raw_queue = queue.Queue(maxsize=config.RAW_QUEUE_SIZE)      # For visualizer processing (positions, not copies)
+        self.level_queue = queue.Queue(maxsize=config.LEVEL_QUEUE_SIZE)  # For GUI updates (latest wins)
+        self.dropped_raw_frames = 0    # Buffers dropped because VAD/FFT fell behind
+        self.dropped_level_frames = 0  # Visualizer frames dropped because the GUI fell behind
+        self.audio_buffer = self._new_audio_buffer()
+        
+        # Warm stream: the device stays open and the last moments before the hotkey
+        # are kept in a small pre-roll ring, prepended when recording starts
+        self.warm_stream = config.AUDIO_WARM_STREAM
+        self.preroll = AudioRingBuffer(config.AUDIO_SAMPLE_RATE * config.AUDIO_PREROLL_MS // 1000)
+        self.capture_lock = threading.Lock()  # Serializes the callback with start/stop
+        self.stream_condition = threading.Condition()  # Wakes stream_audio() readers on new audio
         
         # Initialize VAD
         self.vad = webrtcvad.Vad()
@@ -26,11 +43,34 @@ class AudioRecorder:
         
         # Chunking for streaming transcription
         self.chunk_callback = None  # Callback function for chunks
-        self.chunk_duration = 15.0  # Process every 15 seconds
-        self.chunk_overlap = 1.0    # 1 second overlap for continuity
+        self.chunk_min_duration = config.CHUNK_MIN_SECONDS
+        self.chunk_max_duration = config.CHUNK_MAX_SECONDS
+        self.chunk_pause_duration = config.CHUNK_PAUSE_MS / 1000
+        self.chunk_overlap = config.CHUNK_OVERLAP_SECONDS  # Overlap stitched by word timestamps
         self.recording_start_time = None
-        self.last_chunk_time = None
-        self.chunk_buffer_start = 0  # Track where next chunk starts
+        self.chunk_buffer_start = 0  # Sample position where next chunk starts
+        self.pending_chunks = {}     # Chunk window start -> end, retained in the buffer until transcription confirms
+        self.tail_map = SegmentMap.identity(0.0, 0.0)  # Maps the audio returned by stop_recording() to recording time
+        self.tail_boundary = 0.0     # Time (s) where the tail's own audio begins (before it is overlap)
+        self.streamed_session = None  # Session whose audio stream_audio() releases as it reads (no chunking)
+        self.pending_lock = threading.Lock()
+        self.cut_lock = threading.Lock()  # Serializes chunk cuts with the tail cut in stop_recording()
+        self.dispatch_condition = threading.Condition()  # Signals when cut chunks reach the callback
+        self.undispatched = 0        # Chunks cut but not handed to the callback yet
+        
+        # Pause tracking from VAD (sample positions in the current session)
+        self.session_id = 0
+        self.silence_start = None    # Start of the current silence run
+        self.pending_cut = None      # Silence-aligned chunk boundary found by VAD
+        self.chunk_condition = threading.Condition()  # Wakes the chunk monitor
+        self.vad_session = None      # Session of the last buffer seen by VAD
+        self.vad_position = 0        # Sample position VAD expects next
+        self.vad_carry = np.zeros(0, dtype=np.int16)  # Samples short of a full VAD frame
+        self.band_layouts = {}       # Buffer length -> cached (window, band edges, band widths)
+        
+        # Speech runs from VAD, used to send only speech to the transcriber
+        self.trim_silence = config.TRIM_SILENCE
+        self.speech_timeline = SpeechTimeline()
         
         # Start processing threads
         self.processing_thread = threading.Thread(target=self._process_visualizer_data, daemon=True)
@@ -39,8 +79,24 @@ class AudioRecorder:
         self.chunk_monitor_thread = threading.Thread(target=self._monitor_chunks, daemon=True)
         self.chunk_monitor_thread.start()
         
+        if self.warm_stream:
+            self._open_stream()
+        
     def set_chunk_callback(self, callback):
-        """Set callback function for chunk processing"""
+        """
+        Set callback function for chunk processing
+        
+        The callback is called as callback(chunk_audio, segment_map, chunk_boundary):
+        chunk_audio is speech-only audio when silence trimming is on, segment_map
+        (a SegmentMap) converts its times back to seconds since recording started and
+        chunk_boundary is the time where the chunk's own audio begins - everything
+        before it is overlap that the previous chunk also covered.
+        
+        The callback runs on the chunk monitor thread and should only queue the
+        work (e.g. on a TranscriptionQueue) and return its Future. chunk_audio may
+        be a view of the recording buffer, which is kept until that Future is
+        done. Any other return value means the chunk was handled on return.
+        """
         self.chunk_callback = callback
         
     def start_recording(self):
@@ -48,186 +104,518 @@ class AudioRecorder:
         if self.is_recording:
             return
             
-        self.is_recording = True
-        self.audio_buffer = []
-        self.recording_start_time = time.time()
-        self.last_chunk_time = time.time()
-        self.chunk_buffer_start = 0
+        with self.capture_lock:
+            # Positions queued for VAD refer to the old session's storage
+            self._drain_queue(self.raw_queue)
+            with self.pending_lock:
+                if self.pending_chunks:
+                    # Chunks from the previous session are still being transcribed from
+                    # views into the current buffer - give this session fresh storage
+                    self.audio_buffer.close()
+                    self.audio_buffer = self._new_audio_buffer()
+                    self.pending_chunks = {}
+                else:
+                    self.audio_buffer.reset()
+            self.audio_buffer.retain("visualizer", 0)
+            self.recording_start_time = time.time()
+            self.chunk_buffer_start = 0
+            self.session_id += 1
+            self.silence_start = None
+            self.pending_cut = None
+            self.speech_timeline.reset()
+            
+            if self.warm_stream and self.source.is_active():
+                # Device is already running - start with the pre-roll so the first word isn't clipped
+                self.audio_buffer.write(self.preroll.view(self.preroll.read_pos))
+                self.preroll.reset()
+                preroll_samples = self.audio_buffer.write_pos
+                self._put_latest(self.raw_queue, (self.session_id, self.audio_buffer, 0, preroll_samples))
+                self.is_recording = True
+                print(f"[AudioRecorder] Recording started (warm, {preroll_samples / config.AUDIO_SAMPLE_RATE:.2f}s pre-roll)")
+                return
+            
+            self.is_recording = True
         
         # Open audio stream
-        self.stream = self.audio.open(
-            format=pyaudio.paInt16,
-            channels=config.AUDIO_CHANNELS,
-            rate=config.AUDIO_SAMPLE_RATE,
-            input=True,
-            frames_per_buffer=config.AUDIO_CHUNK_SIZE,
-            stream_callback=self._audio_callback
-        )
-        
-        self.stream.start_stream()
+        self._open_stream()
         print("[AudioRecorder] Recording started")
         
-    def _audio_callback(self, in_data, frame_count, time_info, status):
-        """Callback for audio stream - FAST: just store data"""
-        if self.is_recording:
-            # Convert bytes to numpy array
-            audio_data = np.frombuffer(in_data, dtype=np.int16)
-            
-            # Store in buffer for later transcription
-            self.audio_buffer.append(audio_data)
-            
-            # Put in queue for visualizer processing (decoupled)
-            self.raw_queue.put(audio_data.copy())
-            
-        return (in_data, pyaudio.paContinue)
+    def _new_audio_buffer(self):
+        """Create session audio storage - RAM ring buffer or memory-mapped file"""
+        if config.AUDIO_SPILL_TO_DISK:
+            return SessionAudioStore()
+        return AudioRingBuffer(config.AUDIO_SAMPLE_RATE * config.AUDIO_BUFFER_SECONDS)
+    
+    def _open_stream(self):
+        """Start delivering audio from the source"""
+        self.source.open(self._audio_callback)
+    
+    def _close_stream(self):
+        """Stop the source if it is delivering audio"""
+        self.source.close()
+    
+    def _audio_callback(self, in_data):
+        """Callback for audio source - FAST: just store data"""
+        with self.capture_lock:
+            self._capture(in_data)
+    
+    def _capture(self, in_data):
+        """Store one buffer from the stream (recording) or keep it as pre-roll (warm and idle)"""
+        if not self.is_recording:
+            if self.warm_stream:
+                # Idle: keep only the most recent pre-roll, nothing else runs
+                audio_data = np.frombuffer(in_data, dtype=np.int16)
+                self.preroll.release(self.preroll.write_pos + len(audio_data) - self.preroll.capacity)
+                self.preroll.write(audio_data)
+            return
+        
+        # Convert bytes to numpy array
+        audio_data = np.frombuffer(in_data, dtype=np.int16)
+        position = self.audio_buffer.write_pos
+        
+        # The only copy: into the ring buffer that every consumer reads views of
+        self.audio_buffer.write(audio_data)
+        
+        # Queue the position for visualizer/VAD processing (decoupled)
+        item = (self.session_id, self.audio_buffer, position, len(audio_data))
+        if self._put_latest(self.raw_queue, item):
+            self.dropped_raw_frames += 1
+        
+        # Wake the chunk monitor once the chunk reaches its hard maximum
+        max_samples = self.chunk_max_duration * config.AUDIO_SAMPLE_RATE
+        if self.chunk_callback and self.audio_buffer.write_pos - self.chunk_buffer_start >= max_samples:
+            self._notify_chunk_monitor()
+        
+        self._notify_streams()
+    
+    def _put_latest(self, target_queue, item):
+        """Put an item without blocking, dropping the oldest one if the queue is full (True if dropped)"""
+        dropped = False
+        while True:
+            try:
+                target_queue.put_nowait(item)
+                return dropped
+            except queue.Full:
+                try:
+                    target_queue.get_nowait()
+                    dropped = True
+                except queue.Empty:
+                    pass
+    
+    def _drain_queue(self, target_queue):
+        """Discard everything waiting in a queue"""
+        try:
+            while True:
+                target_queue.get_nowait()
+        except queue.Empty:
+            pass
     
     def _process_visualizer_data(self):
-        """Process audio data for visualizer in a separate thread"""
+        """Process audio data for VAD and visualizer in a separate thread"""
         while True:
             try:
-                audio_data = self.raw_queue.get()
+                # Block for one buffer, then take whatever else queued up meanwhile
+                batch = [self.raw_queue.get()]
+                while len(batch) < config.VISUALIZER_BATCH_SIZE:
+                    try:
+                        batch.append(self.raw_queue.get_nowait())
+                    except queue.Empty:
+                        break
                 
                 # --- VOICE ACTIVITY DETECTION (VAD) ---
-                # webrtcvad needs 10, 20, or 30ms frames. 
-                # config.AUDIO_CHUNK_SIZE is 1024, at 16000Hz that's 64ms.
-                # We'll split the chunk into smaller pieces for VAD.
+                # Consecutive buffers are classified as one stream in a single pass,
+                # reading one view of the recording buffer (no copies)
                 is_speech = False
-                frame_duration_ms = 20 # ms
-                samples_per_frame = int(config.AUDIO_SAMPLE_RATE * frame_duration_ms / 1000)
-                bytes_per_sample = 2 # 16-bit
-                
-                # Convert numpy back to bytes for VAD
-                in_data = audio_data.tobytes()
-                
-                for i in range(0, len(in_data), samples_per_frame * bytes_per_sample):
-                    frame = in_data[i:i + samples_per_frame * bytes_per_sample]
-                    if len(frame) < samples_per_frame * bytes_per_sample:
-                        break
-                    if self.vad.is_speech(frame, config.AUDIO_SAMPLE_RATE):
-                        is_speech = True
-                        break
+                run_start = 0
+                for i in range(1, len(batch) + 1):
+                    if i < len(batch) and batch[i][:2] == batch[i - 1][:2] and \
+                            batch[i][2] == batch[i - 1][2] + batch[i - 1][3]:
+                        continue
+                    session_id, buffer, position, _ = batch[run_start]
+                    run_end = batch[i - 1][2] + batch[i - 1][3]
+                    is_speech = self._run_vad(session_id, position, buffer.view(position, run_end))
+                    run_start = i
                 
                 # --- ADVANCED VISUALIZER PROCESSING ---
-                # 1. Apply Hanning window to reduce spectral leakage
-                window = np.hanning(len(audio_data))
-                windowed_data = audio_data * window
-                
-                # 2. Perform FFT
-                fft_data = np.abs(np.fft.rfft(windowed_data))
+                # Only the newest buffer is drawn; older ones would be stale frames
+                session_id, buffer, position, count = batch[-1]
+                bands = self._compute_bands(buffer.view(position, position + count))
                 
-                # 3. Group into frequency bands (logarithmic scaling)
-                num_bands = 12
-                bands = []
-                
-                max_bin = int(len(fft_data) * 0.5) 
-                indices = np.logspace(0, np.log10(max_bin), num_bands + 1, dtype=int)
-                
-                for i in range(num_bands):
-                    start, end = indices[i], indices[i+1]
-                    if start == end: end = start + 1
-                    band_val = np.mean(fft_data[start:end])
-                    bands.append(float(band_val))
+                # Everything up to here has been read - let the buffer reuse it
+                if session_id == self.session_id:
+                    buffer.retain("visualizer", position + count)
                 
                 # Put the frequency bands AND the speech flag in the queue
-                self.level_queue.put((bands, is_speech))
+                if self._put_latest(self.level_queue, (bands, is_speech)):
+                    self.dropped_level_frames += 1
                 
             except Exception as e:
-                # print(f"Error in visualizer processing: {e}")
-                pass
+                print(f"[AudioRecorder] Visualizer processing error: {e}")
+    
+    def _compute_bands(self, audio_data):
+        """Compute logarithmic frequency band levels for one buffer"""
+        layout = self.band_layouts.get(len(audio_data))
+        if layout is None:
+            layout = self._build_band_layout(len(audio_data))
+            self.band_layouts[len(audio_data)] = layout
+        window, band_edges, band_widths = layout
+        
+        # 1. Apply Hanning window to reduce spectral leakage
+        # 2. Perform FFT
+        fft_data = np.abs(np.fft.rfft(audio_data * window))
+        
+        # 3. Average each band with a single reduceat (the last sum runs to the end and is dropped)
+        bands = np.add.reduceat(fft_data, band_edges)[:-1] / band_widths
+        return bands.tolist()
+    
+    def _build_band_layout(self, buffer_length):
+        """Precompute the window and logarithmic band edges for a buffer length"""
+        window = np.hanning(buffer_length)
+        
+        num_bands = config.VISUALIZER_BANDS
+        max_bin = int((buffer_length // 2 + 1) * 0.5)
+        band_edges = np.logspace(0, np.log10(max_bin), num_bands + 1, dtype=int)
+        
+        # Empty bands (equal edges) read the single bin at their start
+        band_widths = np.maximum(np.diff(band_edges), 1)
+        return window, band_edges, band_widths
+    
+    def _run_vad(self, session_id, position, audio_data):
+        """Classify every VAD frame in a buffer, returns True if any frame is speech"""
+        # webrtcvad needs 10, 20, or 30ms frames. 
+        # config.AUDIO_CHUNK_SIZE is 1024, at 16000Hz that's 64ms.
+        # Frames are cut from the continuous stream; leftover samples carry over.
+        frame_duration_ms = 20 # ms
+        samples_per_frame = int(config.AUDIO_SAMPLE_RATE * frame_duration_ms / 1000)
+        bytes_per_sample = 2 # 16-bit
+        bytes_per_frame = samples_per_frame * bytes_per_sample
+        
+        # Start over on a new recording (or if buffers were dropped)
+        carry = self.vad_carry
+        if session_id != self.vad_session or position != self.vad_position:
+            if session_id == self.session_id:
+                self.silence_start = None  # Unknown audio in the gap is not a pause
+                # Dropped buffers were never classified - keep them (and the carried
+                # samples) as speech so silence trimming can't cut words out
+                gap_start = self.vad_position - len(carry) if session_id == self.vad_session else 0
+                if position > gap_start:
+                    self.speech_timeline.add_speech(gap_start, position)
+            carry = audio_data[:0]
+        self.vad_session = session_id
+        self.vad_position = position + len(audio_data)
+        
+        data = np.concatenate((carry, audio_data)) if len(carry) else audio_data
+        frame_start = position - len(carry)
+        num_frames = len(data) // samples_per_frame
+        
+        # Byte view of the samples for VAD (no conversion back to bytes)
+        in_data = memoryview(np.ascontiguousarray(data[:num_frames * samples_per_frame])).cast('B')
+        
+        frame_flags = [
+            self.vad.is_speech(in_data[i * bytes_per_frame:(i + 1) * bytes_per_frame], config.AUDIO_SAMPLE_RATE)
+            for i in range(num_frames)
+        ]
+        self._track_pause(session_id, frame_start, frame_flags, samples_per_frame)
+        
+        self.vad_carry = data[num_frames * samples_per_frame:].copy()
+        return any(frame_flags)
+    
+    def _track_pause(self, session_id, frame_start, frame_flags, samples_per_frame):
+        """Update the current silence run from VAD frame flags and mark a chunk boundary once a pause is long enough"""
+        if session_id != self.session_id or not len(frame_flags):
+            return  # Buffer from a previous recording
+        
+        # The pause check only runs where a silence run ends (or at the end of the batch)
+        last = len(frame_flags) - 1
+        for i, frame_is_speech in enumerate(frame_flags):
+            if frame_is_speech:
+                self.silence_start = None
+                frame_pos = frame_start + i * samples_per_frame
+                self.speech_timeline.add_speech(frame_pos, frame_pos + samples_per_frame)
+                continue
+            
+            if self.silence_start is None:
+                self.silence_start = frame_start + i * samples_per_frame
+            if i == last or frame_flags[i + 1]:
+                self._check_pause(frame_start + (i + 1) * samples_per_frame)
+        
+        self.speech_timeline.mark_classified(frame_start + len(frame_flags) * samples_per_frame)
+    
+    def _check_pause(self, silence_end):
+        """Mark a chunk boundary if the silence run up to `silence_end` is a long enough pause"""
+        if self.pending_cut is not None:
+            return
+        
+        # Only pauses after the minimum chunk length count
+        min_samples = int(self.chunk_min_duration * config.AUDIO_SAMPLE_RATE)
+        pause_samples = int(self.chunk_pause_duration * config.AUDIO_SAMPLE_RATE)
+        pause_start = max(self.silence_start, self.chunk_buffer_start + min_samples)
+        
+        if silence_end - pause_start >= pause_samples:
+            # Cut in the middle of the pause so neither chunk clips a word
+            self.pending_cut = pause_start + pause_samples // 2
+            self._notify_chunk_monitor()
+    
+    def _next_chunk_cut(self):
+        """Get the sample position where the next chunk should end, or None to keep recording"""
+        max_samples = int(self.chunk_max_duration * config.AUDIO_SAMPLE_RATE)
+        cut = self.pending_cut
+        if cut is not None and self.chunk_buffer_start < cut <= self.chunk_buffer_start + max_samples:
+            return cut
+        
+        # No pause found in time - force a cut at the hard maximum (audio that piled
+        # up while dispatch was held up goes into the following chunks)
+        if self.audio_buffer.write_pos - self.chunk_buffer_start >= max_samples:
+            return self.chunk_buffer_start + max_samples
+        
+        return None
+    
+    def _notify_streams(self):
+        """Wake stream_audio() readers (new audio, or recording ended)"""
+        with self.stream_condition:
+            self.stream_condition.notify_all()
+    
+    def stream_audio(self):
+        """
+        Yield the current recording's audio as it arrives, until recording stops
+        
+        Each item is a zero-copy view of everything captured since the previous
+        one - several buffers at once if the reader was busy - and is retained
+        until the next item is requested. Call right after start_recording().
+        
+        Without a chunk callback nothing else reads the audio again, so it is
+        released as the reader moves on and stop_recording() returns no tail.
+        """
+        session_id = self.session_id
+        buffer = self.audio_buffer
+        key = ("stream", session_id)
+        position = 0
+        buffer.retain(key, position)
+        owns_audio = self.chunk_callback is None
+        if owns_audio:
+            self.streamed_session = session_id
+        try:
+            while True:
+                with self.stream_condition:
+                    while self.is_recording and self.session_id == session_id and buffer.write_pos == position:
+                        self.stream_condition.wait()
+                    end = buffer.write_pos
+                    active = self.is_recording
+                
+                # A new recording started, or this one was cancelled (buffer reset)
+                if self.session_id != session_id or end < position:
+                    return
+                
+                if end > position:
+                    yield buffer.view(position, end)
+                    position = end
+                    buffer.retain(key, position)
+                    if owns_audio:
+                        buffer.release(position)
+                        self.speech_timeline.prune(buffer.retained_from)
+                if not active:
+                    return
+        finally:
+            buffer.drop(key)
+    
+    def _notify_chunk_monitor(self):
+        """Wake the chunk monitor to re-check for a closed chunk"""
+        with self.chunk_condition:
+            self.chunk_condition.notify()
     
     def _monitor_chunks(self):
-        """Monitor recording and trigger chunk processing"""
+        """Dispatch chunks as soon as a pause (or the maximum length) closes one"""
         while True:
             try:
-                if self.is_recording and self.chunk_callback:
-                    current_time = time.time()
-                    elapsed = current_time - self.last_chunk_time
-                    
-                    # Check if it's time to process a chunk
-                    if elapsed >= self.chunk_duration and len(self.audio_buffer) > 0:
-                        self._process_chunk()
-                        
-                time.sleep(0.5)  # Check every 0.5 seconds
+                # Parked on the condition until the audio callback or VAD signals -
+                # no polling while idle or between chunks
+                with self.chunk_condition:
+                    chunk_end = None
+                    while chunk_end is None:
+                        if self.is_recording and self.chunk_callback:
+                            chunk_end = self._next_chunk_cut()
+                        if chunk_end is None:
+                            self.chunk_condition.wait()
+                
+                # Once stop_recording() cut the tail, everything after the last chunk is in it.
+                # The callback runs outside the lock: it may block on a full transcription
+                # queue, and stopping must not wait for that
+                with self.cut_lock:
+                    chunk = self._process_chunk(chunk_end) if self.is_recording else None
+                if chunk is not None:
+                    self._dispatch_chunk(*chunk)
             except Exception as e:
-                pass
+                print(f"[AudioRecorder] Chunk monitor error: {e}")
     
-    def _process_chunk(self):
-        """Process current audio chunk in background"""
+    def _process_chunk(self, chunk_end):
+        """
+        Cut the audio up to `chunk_end` (sample position) as the next chunk
+        
+        Returns:
+            tuple: _dispatch_chunk() arguments, or None if there is nothing to transcribe
+        """
+        dispatch = None
         try:
-            # Get current total buffer length
-            current_buffer_length = len(self.audio_buffer)
-            
             # Only process if we have new data
-            if current_buffer_length <= self.chunk_buffer_start:
-                return
-            
-            # Extract ONLY the NEW audio chunks since last processing
-            new_chunks = self.audio_buffer[self.chunk_buffer_start:current_buffer_length]
-            
-            if not new_chunks:
-                return
+            if chunk_end <= self.chunk_buffer_start:
+                return None
             
-            # Combine new chunks into audio array
-            chunk_audio = np.concatenate(new_chunks)
+            # Zero-copy view of the new audio since last processing, plus the
+            # overlap before the previous cut so boundary words are heard twice
+            chunk_start = self.chunk_buffer_start
+            window_start = self._overlap_start(chunk_start)
+            chunk_audio, segment_map = self._speech_only(
+                self.audio_buffer.view(window_start, chunk_end), window_start, chunk_end
+            )
             
             # Call the callback with chunk data
             if self.chunk_callback and len(chunk_audio) > 0:
-                duration = len(chunk_audio) / config.AUDIO_SAMPLE_RATE
+                duration = (chunk_end - window_start) / config.AUDIO_SAMPLE_RATE
                 from datetime import datetime
                 timestamp = datetime.now().strftime("%H:%M:%S")
-                print(f"[{timestamp}] [AudioRecorder] Processing chunk: {duration:.1f}s")
+                print(f"[{timestamp}] [AudioRecorder] Processing chunk: {duration:.1f}s ({segment_map.speech_duration:.1f}s speech)")
+                
+                # Keep the region alive until its transcription is confirmed
+                with self.pending_lock:
+                    self.pending_chunks[window_start] = chunk_end
+                    self.audio_buffer.retain(("chunk", window_start), window_start)
                 
-                # Trigger background transcription
-                threading.Thread(
-                    target=self.chunk_callback,
-                    args=(chunk_audio.copy(), time.time()),
-                    daemon=True
-                ).start()
+                # Handed over for transcription once the lock is released (the view itself if nothing was trimmed)
+                with self.dispatch_condition:
+                    self.undispatched += 1
+                dispatch = (self.audio_buffer, window_start, chunk_audio, segment_map,
+                            chunk_start / config.AUDIO_SAMPLE_RATE)
+            elif self.chunk_callback:
+                print("[AudioRecorder] Skipping chunk without speech")
             
             # Update tracking - move start position to current end
-            self.chunk_buffer_start = current_buffer_length
-            self.last_chunk_time = time.time()
+            self.chunk_buffer_start = chunk_end
+            if self.pending_cut is not None and self.pending_cut <= chunk_end:
+                self.pending_cut = None
+            self._release_confirmed_audio()
             
         except Exception as e:
             print(f"[AudioRecorder] Chunk processing error: {e}")
+        return dispatch
+    
+    def _overlap_start(self, chunk_start):
+        """Sample position where a chunk's window starts, including the overlap"""
+        overlap_samples = int(self.chunk_overlap * config.AUDIO_SAMPLE_RATE)
+        return max(0, chunk_start - overlap_samples)
+    
+    def _speech_only(self, audio, window_start, window_end):
+        """Cut silence out of audio[window_start:window_end] using the VAD speech runs"""
+        if not self.trim_silence:
+            return audio, SegmentMap.identity(window_start / config.AUDIO_SAMPLE_RATE,
+                                              len(audio) / config.AUDIO_SAMPLE_RATE)
+        
+        padding = config.AUDIO_SAMPLE_RATE * config.TRIM_PADDING_MS // 1000
+        min_silence = config.AUDIO_SAMPLE_RATE * config.TRIM_MIN_SILENCE_MS // 1000
+        ranges = self.speech_timeline.speech_ranges(window_start, window_end, padding, min_silence)
+        return compact_speech(audio, window_start, ranges)
+    
+    def _dispatch_chunk(self, buffer, window_start, chunk_audio, segment_map, chunk_boundary):
+        """Call the chunk callback and release the chunk's audio once its Future is done"""
+        try:
+            result = self.chunk_callback(chunk_audio, segment_map, chunk_boundary)
+        except Exception as e:
+            print(f"[AudioRecorder] Chunk callback error: {e}")
+            result = None
+        finally:
+            with self.dispatch_condition:
+                self.undispatched -= 1
+                self.dispatch_condition.notify_all()
+        
+        if isinstance(result, Future):
+            result.add_done_callback(lambda _: self._finish_chunk(buffer, window_start))
+        else:
+            self._finish_chunk(buffer, window_start)
+    
+    def wait_for_dispatch(self, timeout=None):
+        """
+        Wait until every chunk cut so far was handed to the chunk callback
+        (after stop_recording(), the last one may still wait for a queue slot)
+        
+        Returns:
+            bool: False if the timeout expired first
+        """
+        with self.dispatch_condition:
+            return self.dispatch_condition.wait_for(lambda: self.undispatched == 0, timeout)
+    
+    def _finish_chunk(self, buffer, window_start):
+        """Drop a transcribed chunk's reference to the buffer"""
+        buffer.drop(("chunk", window_start))
+        with self.pending_lock:
+            # Chunks from an older session belong to a buffer that is no longer in use
+            if buffer is not self.audio_buffer:
+                return
+            self.pending_chunks.pop(window_start, None)
+        self._release_confirmed_audio()
+    
+    def _release_confirmed_audio(self):
+        """Release audio the chunker is done with (pending chunks and VAD keep their own references)"""
+        # The next chunk re-reads the overlap before its start
+        self.audio_buffer.release(self._overlap_start(self.chunk_buffer_start))
+        self.speech_timeline.prune(self.audio_buffer.retained_from)
     
     def stop_recording(self):
         """Stop recording and return only remaining audio (after last chunk)"""
         if not self.is_recording:
             return None
-            
-        self.is_recording = False
         
-        if self.stream:
-            self.stream.stop_stream()
-            self.stream.close()
+        # A chunk being cut right now is dispatched first, and none is cut after the tail
+        with self.cut_lock:
+            with self.capture_lock:
+                self.is_recording = False
+            tail_audio = self._cut_tail()
+        self._notify_streams()
+        
+        # A warm stream keeps running and goes back to filling the pre-roll
+        if not self.warm_stream:
+            self._close_stream()
             
         print("[AudioRecorder] Recording stopped")
+        if self.dropped_raw_frames or self.dropped_level_frames:
+            print(f"[AudioRecorder] Dropped frames so far - VAD/FFT: {self.dropped_raw_frames}, GUI: {self.dropped_level_frames}")
+        return tail_audio
+    
+    def _cut_tail(self):
+        """Audio after the last chunk plus the overlap, or None (sets tail_map and tail_boundary)"""
+        window_end = self.audio_buffer.write_pos
+        if self.streamed_session == self.session_id:
+            # The stream reader transcribed (and released) everything already
+            self.tail_map = SegmentMap.identity(window_end / config.AUDIO_SAMPLE_RATE, 0.0)
+            self.tail_boundary = window_end / config.AUDIO_SAMPLE_RATE
+            return None
+        
+        # Zero-copy view if nothing is trimmed, valid until the next recording starts
+        window_start = self._overlap_start(self.chunk_buffer_start)
+        self.tail_map = SegmentMap.identity(window_start / config.AUDIO_SAMPLE_RATE, 0.0)
+        self.tail_boundary = self.chunk_buffer_start / config.AUDIO_SAMPLE_RATE
         
-        # Get only remaining audio after last chunk position
-        if self.audio_buffer and len(self.audio_buffer) > self.chunk_buffer_start:
-            remaining_audio = np.concatenate(self.audio_buffer[self.chunk_buffer_start:])
-            self.audio_buffer = []  # Clear buffer to free memory
-            return remaining_audio
+        if window_end > self.chunk_buffer_start:
+            tail_audio, self.tail_map = self._speech_only(
+                self.audio_buffer.view(window_start, window_end), window_start, window_end
+            )
+            if len(tail_audio) > 0:
+                return tail_audio
         
-        self.audio_buffer = []  # Clear buffer even if no remaining audio
         return None
     
     def cancel_recording(self):
         """Cancel recording without returning data"""
-        self.is_recording = False
+        with self.capture_lock:
+            self.is_recording = False
         
-        if self.stream:
-            self.stream.stop_stream()
-            self.stream.close()
+        if not self.warm_stream:
+            self._close_stream()
             
-        self.audio_buffer = []
+        self.audio_buffer.reset()
+        self._notify_streams()
         
         # Clear queues
-        while not self.raw_queue.empty():
-            self.raw_queue.get()
-        while not self.level_queue.empty():
-            self.level_queue.get()
+        self._drain_queue(self.raw_queue)
+        self._drain_queue(self.level_queue)
             
         print("[AudioRecorder] Recording cancelled")
     
@@ -240,6 +628,5 @@ class AudioRecorder:
     
     def cleanup(self):
         """Clean up audio resources"""
-        if self.stream:
-            self.stream.close()
-        self.audio.terminate()
+        self.source.terminate()
+        self.audio_buffer.close()
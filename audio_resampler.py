@@ -0,0 +1,94 @@
+"""
+Audio resampler - converts a device's native capture format to the 16kHz mono
+stream the rest of the pipeline expects, one buffer at a time
+"""
+from math import gcd
+import numpy as np
+import config
+
+
+class StreamingResampler:
+    """
+    Stateful polyphase resampler with channel downmixing.
+
+    The rate ratio is reduced to up/down (48000 -> 16000 is 1/3, 44100 -> 16000
+    is 160/441). A windowed-sinc low-pass prototype is split into `up` phases
+    of `taps` coefficients each, so every output sample costs `taps`
+    multiply-adds no matter how awkward the ratio is. The last `taps - 1` input
+    samples are carried between calls, so buffers can be any length and the
+    output is identical to resampling the whole stream at once.
+    """
+
+    def __init__(self, input_rate, input_channels=1, output_rate=None, taps=None):
+        """
+        Initialize resampler
+
+        Args:
+            input_rate: Device sample rate (Hz)
+            input_channels: Interleaved channels in the input (averaged to mono)
+            output_rate: Target sample rate (default: config.AUDIO_SAMPLE_RATE)
+            taps: Filter length per phase (default: config.AUDIO_RESAMPLER_TAPS)
+        """
+        self.input_rate = int(input_rate)
+        self.input_channels = int(input_channels)
+        self.output_rate = int(output_rate or config.AUDIO_SAMPLE_RATE)
+        self.taps = int(taps or config.AUDIO_RESAMPLER_TAPS)
+
+        divisor = gcd(self.input_rate, self.output_rate)
+        self.up = self.output_rate // divisor
+        self.down = self.input_rate // divisor
+        self.bank = self._design_filter_bank()
+        self._tap_offsets = np.arange(self.taps)
+        self.reset()
+
+    def reset(self):
+        """Forget the carried input (start of a new stream)"""
+        self._history = np.zeros(self.taps - 1, dtype=np.float32)
+        self._history_start = -(self.taps - 1)  # Input index of _history[0]
+        self._next_output = 0                    # Output index of the next sample produced
+
+    def _design_filter_bank(self):
+        """Kaiser-windowed sinc low-pass, split into (up, taps) polyphase coefficients"""
+        length = self.up * self.taps
+        # Cut off just below the lower of the two Nyquist rates, in cycles per upsampled sample
+        cutoff = 0.5 / max(self.up, self.down) * config.AUDIO_RESAMPLER_ROLLOFF
+        m = np.arange(length) - (length - 1) / 2
+        prototype = 2 * cutoff * np.sinc(2 * cutoff * m) * np.kaiser(length, 8.0)
+        prototype *= self.up / prototype.sum()  # Unity gain at DC after zero-stuffing
+
+        # bank[phase, k] multiplies input sample (i - k) for outputs at that phase
+        return prototype.reshape(self.taps, self.up).T.astype(np.float32)
+
+    def process(self, in_data):
+        """
+        Resample one buffer
+
+        Args:
+            in_data: Raw bytes or int16 array of interleaved samples at input_rate
+
+        Returns:
+            numpy.ndarray: int16 mono samples at output_rate
+        """
+        samples = np.frombuffer(in_data, dtype=np.int16) if isinstance(in_data, (bytes, bytearray)) else in_data
+        if self.input_channels > 1:
+            samples = samples.reshape(-1, self.input_channels).mean(axis=1, dtype=np.float32)
+        if self.up == self.down:
+            return np.rint(samples).astype(np.int16, copy=False)
+
+        data = np.concatenate((self._history, samples.astype(np.float32, copy=False)))
+        data_end = self._history_start + len(data)
+
+        # Every output whose newest input sample has arrived: n * down // up < data_end
+        output_end = -(-data_end * self.up // self.down)
+        positions = np.arange(self._next_output, output_end, dtype=np.int64) * self.down
+        newest = positions // self.up - self._history_start
+        phases = positions % self.up
+
+        # (outputs, taps) gather of the input, weighted by each output's phase
+        window = data[newest[:, None] - self._tap_offsets]
+        output = np.einsum("ij,ij->i", window, self.bank[phases])
+
+        self._next_output = output_end
+        self._history = data[len(data) - (self.taps - 1):]
+        self._history_start = data_end - (self.taps - 1)
+        return np.clip(np.rint(output), -32768, 32767).astype(np.int16)
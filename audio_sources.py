@@ -0,0 +1,283 @@
+"""
+Audio sources - where AudioRecorder gets its samples from
+Live microphone (PyAudio), audio files and synthetic signals share one interface,
+so chunking, VAD and transcription can also run headless (tests, benchmarks)
+"""
+import threading
+import time
+import wave
+from abc import ABC, abstractmethod
+import numpy as np
+import config
+from audio_resampler import StreamingResampler
+
+
+class AudioSource(ABC):
+    """
+    Base class for audio inputs.
+
+    A source delivers int16 mono audio at config.AUDIO_SAMPLE_RATE as raw bytes,
+    config.AUDIO_CHUNK_SIZE samples at a time, by calling `callback(in_data)`
+    from its own thread between open() and close().
+    """
+
+    @abstractmethod
+    def open(self, callback):
+        """Start delivering audio buffers to callback(in_data)"""
+
+    @abstractmethod
+    def close(self):
+        """Stop delivering audio"""
+
+    @abstractmethod
+    def is_active(self):
+        """True while buffers are being delivered"""
+
+    def terminate(self):
+        """Release the source for good"""
+        self.close()
+
+
+class PyAudioSource(AudioSource):
+    """
+    Live microphone input through PyAudio.
+
+    Devices that can't capture 16kHz mono directly (many USB/Bluetooth
+    headsets only offer 44.1/48kHz stereo) are opened in their native format
+    and converted by a StreamingResampler inside the stream callback.
+    """
+
+    def __init__(self):
+        import pyaudio  # Only needed for live capture
+        self.pyaudio = pyaudio
+        self.audio = pyaudio.PyAudio()
+        self.stream = None
+        self.resampler = None  # Set when the device is opened in its native format
+
+    def _capture_format(self):
+        """Get (rate, channels) to open the default input device with"""
+        try:
+            if self.audio.is_format_supported(
+                config.AUDIO_SAMPLE_RATE,
+                input_channels=config.AUDIO_CHANNELS,
+                input_format=self.pyaudio.paInt16,
+                input_device=self.audio.get_default_input_device_info()["index"]
+            ):
+                return config.AUDIO_SAMPLE_RATE, config.AUDIO_CHANNELS
+        except (ValueError, IOError):
+            pass  # Not supported - fall back to the device's own format
+
+        device = self.audio.get_default_input_device_info()
+        rate = int(device["defaultSampleRate"])
+        channels = max(1, min(int(device["maxInputChannels"]), 2))
+        return rate, channels
+
+    def open(self, callback):
+        """Open and start the microphone stream"""
+        self.close()
+
+        rate, channels = self._capture_format()
+        if rate == config.AUDIO_SAMPLE_RATE and channels == config.AUDIO_CHANNELS:
+            self.resampler = None
+            frames_per_buffer = config.AUDIO_CHUNK_SIZE
+        else:
+            self.resampler = StreamingResampler(rate, channels)
+            # Same buffer duration as at 16kHz, so downstream sees ~AUDIO_CHUNK_SIZE samples
+            frames_per_buffer = round(config.AUDIO_CHUNK_SIZE * rate / config.AUDIO_SAMPLE_RATE)
+            print(f"[PyAudioSource] Device doesn't offer {config.AUDIO_SAMPLE_RATE}Hz mono - "
+                  f"capturing {rate}Hz x{channels} and resampling")
+
+        def stream_callback(in_data, frame_count, time_info, status):
+            if self.resampler is not None:
+                callback(self.resampler.process(in_data).tobytes())
+            else:
+                callback(in_data)
+            return (in_data, self.pyaudio.paContinue)
+
+        self.stream = self.audio.open(
+            format=self.pyaudio.paInt16,
+            channels=channels,
+            rate=rate,
+            input=True,
+            frames_per_buffer=frames_per_buffer,
+            stream_callback=stream_callback
+        )
+        self.stream.start_stream()
+
+    def close(self):
+        """Stop and close the microphone stream if it is open"""
+        if self.stream:
+            try:
+                self.stream.stop_stream()
+                self.stream.close()
+            except Exception as e:
+                print(f"[PyAudioSource] Error closing stream: {e}")
+            self.stream = None
+
+    def is_active(self):
+        return self.stream is not None and self.stream.is_active()
+
+    def terminate(self):
+        self.close()
+        self.audio.terminate()
+
+
+class _ThreadedSource(AudioSource):
+    """Delivers buffers from a background thread, paced like a real device or faster"""
+
+    def __init__(self, speed=1.0):
+        """
+        Args:
+            speed: Playback speed relative to real time (None = as fast as possible)
+        """
+        self.speed = speed
+        self.thread = None
+        self.running = False
+        self.finished = threading.Event()  # Set when the source runs out of audio
+
+    @abstractmethod
+    def _read(self, count):
+        """Return up to `count` int16 samples, or an empty array at the end"""
+
+    def open(self, callback):
+        self.close()
+        self.running = True
+        self.finished.clear()
+        self.thread = threading.Thread(target=self._run, args=(callback,), daemon=True)
+        self.thread.start()
+
+    def _run(self, callback):
+        buffer_duration = config.AUDIO_CHUNK_SIZE / config.AUDIO_SAMPLE_RATE
+        next_time = time.perf_counter()
+
+        while self.running:
+            samples = self._read(config.AUDIO_CHUNK_SIZE)
+            if len(samples) == 0:
+                break
+            callback(samples.astype(np.int16, copy=False).tobytes())
+
+            # Pace against an absolute schedule so timing errors don't accumulate
+            if self.speed:
+                next_time += buffer_duration / self.speed
+                delay = next_time - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+        self.running = False
+        self.finished.set()
+
+    def close(self):
+        self.running = False
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join(timeout=1.0)
+        self.thread = None
+
+    def is_active(self):
+        return self.running
+
+
+class FileAudioSource(_ThreadedSource):
+    """Streams a WAV (or FLAC, with soundfile installed) file as if it were a microphone (resampled if needed)"""
+
+    def __init__(self, path, speed=1.0, loop=False):
+        """
+        Args:
+            path: 16-bit audio file, any sample rate, mono or stereo
+            speed: Playback speed relative to real time (None = as fast as possible)
+            loop: Start over at the end instead of finishing
+        """
+        super().__init__(speed)
+        self.path = str(path)
+        self.loop = loop
+        self.samples = self._load(self.path)
+        self.position = 0
+
+    def _load(self, path):
+        """Read the whole file into an int16 array at config.AUDIO_SAMPLE_RATE mono"""
+        if path.lower().endswith(".wav"):
+            with wave.open(path, "rb") as wav_file:
+                channels = wav_file.getnchannels()
+                sample_rate = wav_file.getframerate()
+                if wav_file.getsampwidth() != 2:
+                    raise ValueError(f"{path}: only 16-bit WAV files are supported")
+                samples = np.frombuffer(wav_file.readframes(wav_file.getnframes()), dtype=np.int16)
+        else:
+            try:
+                import soundfile
+            except ImportError:
+                raise ValueError(f"{path}: install soundfile to read non-WAV audio")
+            samples, sample_rate = soundfile.read(path, dtype="int16", always_2d=True)
+            channels = samples.shape[1]
+            samples = samples.reshape(-1)
+
+        if channels != config.AUDIO_CHANNELS or sample_rate != config.AUDIO_SAMPLE_RATE:
+            print(f"[FileAudioSource] Converting {sample_rate}Hz x{channels} to {config.AUDIO_SAMPLE_RATE}Hz mono")
+            resampler = StreamingResampler(sample_rate, channels)
+            block = sample_rate * channels * 10  # Convert 10s at a time to bound the working memory
+            samples = np.concatenate([
+                resampler.process(samples[start:start + block]) for start in range(0, len(samples), block)
+            ])
+        return samples
+
+    def _read(self, count):
+        if self.position >= len(self.samples) and self.loop:
+            self.position = 0
+        samples = self.samples[self.position:self.position + count]
+        self.position += len(samples)
+        return samples
+
+
+class SyntheticAudioSource(_ThreadedSource):
+    """Generates test signals - "speech" is a voiced tone with regular pauses that VAD detects"""
+
+    KINDS = ("speech", "tone", "noise", "silence")
+
+    def __init__(self, kind="speech", duration=None, speed=1.0, seed=0,
+                 speech_seconds=2.7, pause_seconds=0.6):
+        """
+        Args:
+            kind: One of KINDS
+            duration: Seconds to generate (None = until closed)
+            speed: Playback speed relative to real time (None = as fast as possible)
+            seed: Random seed for the noise component
+            speech_seconds: Length of each voiced burst ("speech" only)
+            pause_seconds: Length of each pause between bursts ("speech" only)
+        """
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown synthetic audio kind: {kind}")
+        super().__init__(speed)
+        self.kind = kind
+        self.total_samples = None if duration is None else int(duration * config.AUDIO_SAMPLE_RATE)
+        self.rng = np.random.default_rng(seed)
+        self.speech_seconds = speech_seconds
+        self.pause_seconds = pause_seconds
+        self.position = 0
+
+    def generate(self, seconds):
+        """Get the next `seconds` of the signal directly, without opening the source"""
+        return self._read(int(seconds * config.AUDIO_SAMPLE_RATE))
+
+    def _read(self, count):
+        if self.total_samples is not None:
+            count = min(count, self.total_samples - self.position)
+            if count <= 0:
+                return np.zeros(0, dtype=np.int16)
+
+        t = (self.position + np.arange(count)) / config.AUDIO_SAMPLE_RATE
+        self.position += count
+        noise = self.rng.normal(0, 30, count)
+
+        if self.kind == "silence":
+            signal = noise
+        elif self.kind == "noise":
+            signal = self.rng.normal(0, 3000, count)
+        elif self.kind == "tone":
+            signal = 3000 * np.sin(2 * np.pi * 440 * t) + noise
+        else:
+            # Voiced sound: 150Hz fundamental with harmonics and a 4Hz syllable rhythm
+            voiced = sum(np.sin(2 * np.pi * 150 * k * t) / k for k in range(1, 15))
+            voiced *= 3000 * (1 + 0.5 * np.sin(2 * np.pi * 4 * t))
+            speaking = (t % (self.speech_seconds + self.pause_seconds)) < self.speech_seconds
+            signal = voiced * speaking + noise
+
+        return np.clip(signal, -32768, 32767).astype(np.int16)
@@ -0,0 +1,119 @@
+"""
+Batch transcriber - gathers chunk transcriptions that are waiting at the same time
+and decodes them in one batched Faster-Whisper call
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+import numpy as np
+
+
+class BatchTranscriber:
+    """
+    Batching front end for SpeechToText.transcribe_words().
+
+    Callers on several threads (the TranscriptionQueue workers) block in
+    transcribe_words(). A batching thread takes the first waiting request,
+    then gathers more - up to `max_batch`, for at most `deadline` seconds -
+    and decodes them together with transcribe_words_batch(). It stops
+    gathering as soon as `backlog()` says no other chunk is waiting, so a
+    lone chunk is never held back when transcription keeps up.
+
+    There are `concurrency` batching threads, so at most that many decodes
+    (single chunks or batches) run at once however many callers wait.
+    `callers` is how many waiting callers it takes to fill a batch for
+    every one of them.
+    """
+
+    def __init__(self, speech_to_text, max_batch=4, deadline=0.15, backlog=None, concurrency=1):
+        """
+        Initialize batch transcriber
+
+        Args:
+            speech_to_text: SpeechToText or TranscriptionWorker
+            max_batch: Most chunks decoded in one call
+            deadline: Seconds to wait for more chunks after the first one
+            backlog: Returns how many chunks are submitted and not transcribed yet (None = always wait)
+            concurrency: Decodes running at the same time
+        """
+        self.speech_to_text = speech_to_text
+        self.max_batch = max_batch
+        self.deadline = deadline
+        self.backlog = backlog
+        self.requests = queue.Queue()
+        self.batch_sizes = []  # Size of every decoded batch (for reports)
+        self.callers = concurrency * max_batch  # Callers that may usefully wait in transcribe_words() at once
+
+        self.threads = [
+            threading.Thread(target=self._run_batches, name=f"ASR-batcher-{i + 1}", daemon=True)
+            for i in range(concurrency)
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def transcribe_words(self, audio_data, segment_map=None, profile=None):
+        """Same as SpeechToText.transcribe_words, decoded together with other waiting chunks"""
+        if audio_data is None or len(audio_data) == 0:
+            return []
+        future = Future()
+        self.requests.put((future, audio_data, segment_map, profile))
+        return future.result()
+
+    def _run_batches(self):
+        """Batching thread: gather waiting requests and decode them together"""
+        while True:
+            batch = [self.requests.get()]
+            if batch[0] is None:
+                break
+
+            gather_until = time.perf_counter() + self.deadline
+            while len(batch) < self.max_batch:
+                # Nothing else is queued behind this batch - don't wait for it
+                if self.backlog is not None and self.backlog() <= len(batch):
+                    break
+                remaining = gather_until - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    request = self.requests.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if request is None:
+                    self.requests.put(None)  # Stop after this batch
+                    break
+                batch.append(request)
+
+            # One decode per profile (chunks of one recording share theirs)
+            for profile in dict.fromkeys(request[3] for request in batch):
+                self._decode([request for request in batch if request[3] == profile], profile)
+
+    def _decode(self, batch, profile):
+        """Decode one batch and resolve its futures"""
+        self.batch_sizes.append(len(batch))
+        try:
+            if len(batch) == 1:
+                _, audio_data, segment_map, _ = batch[0]
+                results = [self.speech_to_text.transcribe_words(audio_data, segment_map=segment_map, profile=profile)]
+            else:
+                # All chunks back to back in one buffer, each decoded as its own clip
+                audio = np.concatenate([request[1] for request in batch])
+                clips = []
+                start = 0
+                for _, audio_data, segment_map, _ in batch:
+                    clips.append((start, start + len(audio_data), segment_map))
+                    start += len(audio_data)
+                print(f"[BatchTranscriber] Decoding {len(batch)} chunks in one batch")
+                results = self.speech_to_text.transcribe_words_batch(audio, clips, profile=profile)
+        except Exception as e:
+            for future, *_ in batch:
+                future.set_exception(e)
+            return
+
+        for (future, *_), words in zip(batch, results):
+            future.set_result(words)
+
+    def shutdown(self):
+        """Stop the batching threads once the waiting requests are decoded"""
+        for _ in self.threads:
+            self.requests.put(None)
@@ -2,6 +2,7 @@
 Enhanced Configuration with Multiple Writing Modes
 Using Cohere API (command-r7b-12-2024 model) for AI text refinement
 """
+import os
 
 # ==================== WRITING MODES ====================
 # All modes use Cohere's command-r7b-12-2024 model
@@ -142,16 +143,114 @@ def post_process_coding_text(text):
 MAX_HISTORY_ENTRIES = 1000  # Default: 1000 (~500 KB storage)
 # Reduce to 500 for less disk space, increase to 2000 for longer history
 
+# Per-user application data (same location as the launcher's lock file)
+APP_DATA_DIR = os.path.join(os.environ.get("LOCALAPPDATA", os.path.expanduser("~")), "WriteForMe")
+
 # Audio Recording Settings
 AUDIO_SAMPLE_RATE = 16000  # Hz
 AUDIO_CHUNK_SIZE = 1024    # samples per buffer
 AUDIO_CHANNELS = 1         # mono
 AUDIO_FORMAT = "int16"     # 16-bit audio
+AUDIO_RESAMPLER_TAPS = 32  # Filter taps per output sample when the device can't capture 16kHz mono
+AUDIO_RESAMPLER_ROLLOFF = 0.9  # Low-pass cutoff as a fraction of the output Nyquist (7.2kHz at 16kHz)
+AUDIO_BUFFER_SECONDS = 60  # Preallocated ring buffer for audio not yet chunked
+AUDIO_SPILL_TO_DISK = False  # Record into a memory-mapped file instead of RAM (multi-hour sessions)
+AUDIO_SESSION_DIR = os.path.join(APP_DATA_DIR, "sessions")  # Raw 16kHz mono int16 session files
+AUDIO_SESSION_KEEP_HOURS = 24  # Leftover session files (e.g. after a crash) are kept this long
+AUDIO_WARM_STREAM = False  # Keep the microphone stream open between recordings (instant start)
+AUDIO_PREROLL_MS = 500     # With a warm stream: audio from just before the hotkey to prepend
+
+# Streaming chunk boundaries (cut at pauses detected by VAD)
+CHUNK_MIN_SECONDS = 4.0    # Never close a chunk before this length
+CHUNK_MAX_SECONDS = 15.0   # Force a cut if no pause was found by then
+CHUNK_PAUSE_MS = 300       # Silence needed to close a chunk
+CHUNK_OVERLAP_SECONDS = 1.0  # Audio before each cut that is transcribed twice and stitched
+
+# Silence trimming before transcription (from the recorder's own VAD results)
+TRIM_SILENCE = True        # Send only speech (plus padding) to Whisper, skip its second VAD pass
+TRIM_PADDING_MS = 200      # Audio kept on each side of a speech run
+TRIM_MIN_SILENCE_MS = 600  # Shorter silences inside speech are kept
+
+# Speech recognition
+ASR_BACKEND = None         # "faster-whisper" or "vosk" (None = the one testing/backend_benchmark.py picked, else faster-whisper)
+ASR_BACKEND_CHOICE_FILE = os.path.join(APP_DATA_DIR, "asr_backend.json")  # Written by the backend benchmark
+ASR_BACKEND_TARGET_RTF = 0.5  # Backend benchmark: most accurate backend decoding at least this fast wins
+VOSK_MODEL = "vosk-model-small-en-us-0.15"  # Vosk model name (downloaded on first use) or directory
+ASR_MODEL = "small"        # Faster-Whisper model for committed text
+ASR_PARTIAL_MODEL = "tiny"  # Faster model for live partials in streaming mode (None = use ASR_MODEL only)
+ASR_DEVICE = "cpu"
+ASR_COMPUTE_TYPE = "int8"  # "int8" for CPU, "float16" for GPU
+ASR_CPU_THREADS = 0        # CTranslate2 threads shared by all loaded models (0 = tuned, else all cores)
+ASR_AUTO_TUNE = False      # Tune on the first load if this machine wasn't tuned yet (needs ASR_TUNING_AUDIO).
+                           # Saved tuning (also from testing/tune_asr.py) replaces ASR_MODEL/ASR_COMPUTE_TYPE
+ASR_TUNING_FILE = os.path.join(APP_DATA_DIR, "asr_tuning.json")  # Tuning result, redone on another machine
+ASR_TUNING_MODELS = ("tiny", "base", "small")  # Candidates, least to most accurate
+ASR_TUNING_COMPUTE_TYPES = ("int8", "int8_float32", "float32")  # Fastest to most precise (unsupported ones are skipped)
+ASR_TUNING_WORKERS = (1, 2)  # num_workers values tried
+ASR_TUNING_TARGET_RTF = 0.3  # Slowest acceptable decode time / audio length (headroom for chunks and streaming)
+ASR_TUNING_AUDIO = None    # Speech recording (16-bit WAV) to tune on (None = no automatic tuning)
+ASR_TUNING_SECONDS = 5.0   # Audio decoded per measurement
+ASR_WARMUP = True          # Decode a synthetic clip right after loading (first dictation is as fast as later ones)
+ASR_WARMUP_SECONDS = 2.0   # Length of the warm-up clip
+ASR_LANGUAGE = "en"
+ASR_VAD_MIN_SILENCE_MS = 500  # Faster-Whisper's own VAD (when it runs): silence that splits speech
+ASR_VAD_THRESHOLD = 0.3    # Faster-Whisper's own VAD: speech probability threshold
+
+# Decoding profiles - measure their real-time factor on your machine with
+# python testing/profile_benchmark.py (RTF = decode time / audio length)
+#   beam_size, best_of: Beam search width, candidates sampled at temperature > 0
+#   temperature: Fallback temperatures, tried in turn while a decode looks unreliable
+#   without_timestamps: Skip segment timestamp tokens (word timestamps still work)
+#   cpu_threads, num_workers: Used when a model is loaded (0 threads = share ASR_CPU_THREADS, 0 workers = tuned)
+ASR_PROFILES = {
+    "instant": {
+        "beam_size": 1, "best_of": 1, "temperature": (0.0,),
+        "without_timestamps": True, "cpu_threads": 0, "num_workers": 0,
+    },
+    "balanced": {
+        "beam_size": 3, "best_of": 3, "temperature": (0.0, 0.4, 0.8),
+        "without_timestamps": False, "cpu_threads": 0, "num_workers": 0,
+    },
+    "accurate": {
+        "beam_size": 5, "best_of": 5, "temperature": (0.0, 0.2, 0.4, 0.6, 0.8, 1.0),
+        "without_timestamps": False, "cpu_threads": 0, "num_workers": 0,
+    },
+}
+ASR_DEFAULT_PROFILE = "accurate"   # Loads ASR_MODEL, used when a request names no profile
+ASR_PUSH_TO_TALK_PROFILE = "instant"  # Short bursts: greedy decoding, text appears right away
+ASR_TOGGLE_PROFILE = "accurate"    # Long toggle sessions: beam search, chunks transcribe while you speak
+STREAM_PARTIAL_PROFILE = "instant"  # Live partials in streaming mode (loads ASR_PARTIAL_MODEL)
+ASR_WORKER_PROCESS = False  # Run Faster-Whisper in a separate process (keeps the UI responsive while transcribing)
+ASR_CONCURRENCY = 1        # Decodes running at the same time, batched or not (one model instance serializes anyway)
+ASR_MAX_PENDING_CHUNKS = 4  # Chunk dispatch waits while this many chunks are untranscribed
+ASR_MAX_BACKLOG_SECONDS = 30  # Warn when more speech than this is waiting for transcription
+ASR_BATCH_SIZE = 4         # Waiting chunks decoded together when transcription falls behind (1 = off)
+ASR_BATCH_DEADLINE_MS = 150  # How long a batch waits for more queued chunks
+ASR_CACHE = True           # Reuse results for audio that was transcribed before (same model and profile)
+ASR_CACHE_ENTRIES = 256    # Results kept in memory
+ASR_CACHE_DISK = False     # Also keep results on disk, across restarts
+ASR_CACHE_DIR = os.path.join(APP_DATA_DIR, "asr_cache")
+ASR_CACHE_DISK_MB = 50     # Least recently used results are deleted beyond this
+
+# Streaming transcription (replaces chunking: text is committed while you speak)
+ASR_STREAMING = False      # Re-decode a sliding window while recording, stopping only flushes the last words
+STREAM_STEP_MS = 300       # New audio between decodes (slower machines simply decode less often)
+STREAM_TRIM_SECONDS = 2.0  # Window is cut back to the end of the committed text once it covers this much audio
+STREAM_WINDOW_SECONDS = 15.0  # Hard limit: the window is cut even if nothing was committed yet
+STREAM_PROMPT_CHARS = 200  # Committed text passed to Whisper as context for the next window
+STREAM_FINALIZE_SECONDS = 3.0  # With a partials model: agreed audio re-decoded by ASR_MODEL in spans of this length
+
+# Visualizer queues (bounded, oldest frames are dropped when full)
+RAW_QUEUE_SIZE = 32        # Buffers waiting for VAD/FFT (~2s of audio)
+LEVEL_QUEUE_SIZE = 2       # Visualizer frames waiting for the GUI
+VISUALIZER_BATCH_SIZE = 8  # Queued buffers processed together when VAD/FFT falls behind
+VISUALIZER_BANDS = 12      # Logarithmic frequency bands shown by the widget
 
 # GUI Widget Settings
 WIDGET_WIDTH = 140  # Reduced from 180 for compact design
 WIDGET_HEIGHT = 36  # Reduced from 40 for sleeker look
 WIDGET_POSITION = "bottom-center"
+WIDGET_CAPTION_CHARS = 60  # Live transcript shown above the widget in streaming mode (last N characters)
 WIDGET_ALPHA = 1.0  # Fully opaque for the pill, transparency handled via colorkey
 
 # Colors (RGB)
@@ -50,6 +50,11 @@ class WidgetGUI:
         self.is_running = True
         self.processing_angle = 0
         
+        # Live partial transcript (streaming mode), shown in a caption above the pill
+        self.partial_text = ""
+        self.shown_partial_text = ""
+        self.caption = None
+        
         # Create Canvas
         self.canvas = Canvas(
             self.root,
@@ -251,8 +256,43 @@ class WidgetGUI:
             
         if changed:
             self._draw_ui()
+        
+        if self.partial_text != self.shown_partial_text:
+            self._draw_caption()
             
         self.root.after(20, self._smooth_visualizer)
+    
+    def _draw_caption(self):
+        """Show the latest partial transcript above the pill (runs on the Tk thread)"""
+        text = self.partial_text
+        self.shown_partial_text = text
+        
+        if not text:
+            if self.caption is not None:
+                self.caption.withdraw()
+            return
+        
+        if self.caption is None:
+            self.caption = tk.Toplevel(self.root)
+            self.caption.overrideredirect(True)
+            self.caption.attributes('-topmost', True)
+            self.caption_label = tk.Label(
+                self.caption, bg=config.COLOR_BACKGROUND, fg=config.COLOR_TEXT,
+                font=("Segoe UI", 9), padx=10, pady=4
+            )
+            self.caption_label.pack()
+        
+        # Only the end of the sentence fits - that's the part still changing
+        max_chars = config.WIDGET_CAPTION_CHARS
+        if len(text) > max_chars:
+            text = "…" + text[-max_chars:]
+        self.caption_label.configure(text=text)
+        self.caption.update_idletasks()
+        
+        x = self.root.winfo_x() + (config.WIDGET_WIDTH - self.caption.winfo_reqwidth()) // 2
+        y = self.root.winfo_y() - self.caption.winfo_reqheight() - 6
+        self.caption.geometry(f"+{x}+{y}")
+        self.caption.deiconify()
 
     def update_visualizer(self, data):
         """Update visualizer with FFT frequency bands and VAD status"""
@@ -282,6 +322,10 @@ class WidgetGUI:
             if normalized_val > self.target_levels[i]:
                 self.target_levels[i] = normalized_val
 
+    def update_partial_text(self, text):
+        """Set the live transcript shown above the widget (drawn by the smoothing loop)"""
+        self.partial_text = text or ""
+
     def show_processing(self):
         self.state = "processing"
         
@@ -295,6 +339,7 @@ class WidgetGUI:
         self.root.deiconify()
         
     def hide(self):
+        self.partial_text = ""
         self.root.withdraw()
         
     def start(self):
@@ -5,6 +5,7 @@ Runs WriteForMe as a system tray application with auto-start support
 import sys
 import os
 import threading
+import multiprocessing
 import time
 from pathlib import Path
 import pystray
@@ -225,4 +226,5 @@ def main():
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # Spawned ASR worker must not start a second tray app
     main()
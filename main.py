@@ -4,7 +4,7 @@ A local Python clone of Wispr Flow using speech recognition and AI
 Now with global hotkey support, multiple AI providers, and streaming chunk processing
 
 Features:
-    - Streaming transcription: Processes audio in 15-second chunks during recording
+    - Streaming transcription: Processes audio in chunks cut at natural pauses (4-15s)
     - Handles long speeches with pauses without breaking context
     - Combines all chunks when you stop for complete, refined output
     - Background processing: Keep speaking while previous chunks transcribe
@@ -18,15 +18,21 @@ Hotkeys:
 """
 import threading
 import time
+import multiprocessing
+from concurrent.futures import wait
 import ctypes # For High DPI awareness
 from pynput import keyboard as pynput_keyboard
 from colorama import Fore, Back, Style, init
 from audio_recorder import AudioRecorder
 from speech_to_text import SpeechToText
+from asr_worker import TranscriptionWorker
 from ai_provider_manager import AIProviderManager
 from paste_manager import PasteManager
 from gui_widget import WidgetGUI
 from data_storage import DataStorage
+from transcript_stitcher import TranscriptStitcher
+from transcription_queue import TranscriptionQueue
+from batch_transcriber import BatchTranscriber
 import config
 
 # Initialize colorama for colored terminal output
@@ -41,6 +47,13 @@ except Exception:
 
 class WisprFlowLocal:
     def __init__(self, silent_mode=False):
+        # Startup phase durations (s), the model loads in the background alongside the rest
+        self.startup_mark = time.perf_counter()  # End of the previous phase
+        self.startup_timings = {}  # Phase -> seconds, in order
+        self.model_load_seconds = None
+        self.startup_reported = False
+        self.startup_lock = threading.Lock()
+        
         # Default to NO AI mode - direct speech-to-text only
         self.use_ai_refinement = False
         self.ai_manager = None
@@ -56,18 +69,54 @@ class WisprFlowLocal:
         if not silent_mode:
             print(f"{Fore.YELLOW}⏳ Initializing components...{Style.RESET_ALL}")
         self.audio_recorder = AudioRecorder()
-        self.speech_to_text = SpeechToText()
+        # Whisper either in-process or in a worker process (same interface)
+        self.speech_to_text = TranscriptionWorker() if config.ASR_WORKER_PROCESS else SpeechToText()
         self.paste_manager = PasteManager()
         self.data_storage = DataStorage(max_entries=config.MAX_HISTORY_ENTRIES)
         
-        # Set up chunk callback for streaming transcription
-        self.audio_recorder.set_chunk_callback(self._on_audio_chunk)
-        self.transcribed_chunks = []  # Store chunks during recording
-        self.chunk_lock = threading.Lock()  # Thread safety for chunk list
-        self.active_chunk_threads = []  # Track in-flight chunk processing threads
-        self.thread_lock = threading.Lock()  # Thread safety for thread list
+        # Set up chunk callback for streaming transcription (streaming mode decodes the live audio instead)
+        self.streaming = config.ASR_STREAMING
+        if not self.streaming:
+            self.audio_recorder.set_chunk_callback(self._on_audio_chunk)
+        self.stream_thread = None  # Runs transcribe_stream() during a recording in streaming mode
+        self.stitcher = TranscriptStitcher(overlap=self.audio_recorder.chunk_overlap)  # Merges overlapping chunks
+        self.chunk_count = 0  # Chunks dispatched during recording
+        self.chunk_futures = []  # Transcription futures of this recording's chunks
+        self.chunk_lock = threading.Lock()  # Thread safety for chunk counter and futures
+        self.session_id = 0  # Incremented per recording, results from older ones are ignored
+        self.decode_profile = config.ASR_DEFAULT_PROFILE  # Decoding profile of the current recording
         self.recording_start_time = None  # Track total time
         
+        # Chunks that wait at the same time (ASR falling behind) are decoded as one batch,
+        # the batcher runs at most ASR_CONCURRENCY decodes
+        self.batcher = None
+        self.chunk_transcriber = self.speech_to_text
+        if config.ASR_BATCH_SIZE > 1:
+            self.batcher = BatchTranscriber(
+                self.speech_to_text,
+                max_batch=config.ASR_BATCH_SIZE,
+                deadline=config.ASR_BATCH_DEADLINE_MS / 1000,
+                backlog=lambda: self.transcription_queue.pending,
+                concurrency=config.ASR_CONCURRENCY
+            )
+            self.chunk_transcriber = self.batcher
+        
+        # Chunks are transcribed by a bounded pool, results come back in recording order
+        # With batching its workers only wait in the batcher, enough of them to fill its batches
+        self.transcription_queue = TranscriptionQueue(
+            max_workers=self.batcher.callers if self.batcher else config.ASR_CONCURRENCY,
+            max_pending=config.ASR_MAX_PENDING_CHUNKS,
+            max_backlog=config.ASR_MAX_BACKLOG_SECONDS,
+            on_result=self._on_chunk_transcribed,
+            on_backpressure=self._on_transcription_backpressure
+        )
+        
+        self._mark_startup("components")
+        
+        # Load the speech model without holding up the GUI and hotkeys - audio
+        # recorded before it is ready waits in the transcription queue
+        threading.Thread(target=self._load_speech_model, name="ASR-loader", daemon=True).start()
+        
         if not silent_mode:
             print(f"{Fore.GREEN}✓ All components ready!{Style.RESET_ALL}\n")
         
@@ -84,6 +133,40 @@ class WisprFlowLocal:
         self.push_to_talk_pressed = False
         self.current_modifiers = set()
         
+    def _mark_startup(self, phase):
+        """Record how long a startup phase took (since the previous one)"""
+        with self.startup_lock:
+            now = time.perf_counter()
+            self.startup_timings[phase] = now - self.startup_mark
+            self.startup_mark = now
+        self._report_startup()
+    
+    def _report_startup(self):
+        """Print the startup timings once the hotkeys and the speech model are both ready"""
+        with self.startup_lock:
+            if self.startup_reported or "hotkeys" not in self.startup_timings or self.model_load_seconds is None:
+                return
+            self.startup_reported = True
+        
+        ready = sum(self.startup_timings.values())
+        timings = " | ".join(f"{phase}: {seconds:.2f}s" for phase, seconds in self.startup_timings.items())
+        print(f"{Fore.YELLOW}⏱️  Startup: ready in {ready:.2f}s ({timings}) | "
+              f"model: {self.model_load_seconds:.2f}s in background{Style.RESET_ALL}")
+    
+    def _load_speech_model(self):
+        """Load the speech model in the background (startup runs on meanwhile)"""
+        load_start = time.perf_counter()
+        try:
+            self.speech_to_text.load()
+        except Exception as e:
+            print(f"{Fore.RED}✗ Speech model failed to load: {e}{Style.RESET_ALL}")
+            return
+        
+        self.model_load_seconds = time.perf_counter() - load_start
+        warmed = " and warmed up" if config.ASR_WARMUP else ""
+        print(f"{Fore.GREEN}✓ Speech model loaded{warmed} ({self.model_load_seconds:.1f}s){Style.RESET_ALL}")
+        self._report_startup()
+    
     def on_cancel(self):
         """Handle cancel button press"""
         print(f"\n{Fore.RED}✖ Cancelling recording...{Style.RESET_ALL}")
@@ -115,11 +198,24 @@ class WisprFlowLocal:
         
         # Clear previous chunks
         with self.chunk_lock:
-            self.transcribed_chunks = []
+            self.chunk_count = 0
+            self.chunk_futures = []
+            self.session_id += 1
+            # Greedy decoding for push-to-talk bursts, beam search for long toggle sessions
+            self.decode_profile = config.ASR_TOGGLE_PROFILE if self.toggle_mode_active else config.ASR_PUSH_TO_TALK_PROFILE
+        self.stitcher.reset()
         
         # Start audio recording
         self.audio_recorder.start_recording()
+        if self.streaming:
+            self.stream_thread = threading.Thread(
+                target=self._run_stream, args=(self.session_id, self.audio_recorder.stream_audio(), self.decode_profile),
+                daemon=True
+            )
+            self.stream_thread.start()
         print(f"{Fore.CYAN}🎤 Listening... Speak now!{Style.RESET_ALL}")
+        if not self.speech_to_text.ready.is_set():
+            print(f"{Fore.YELLOW}⏳ Speech model still loading - your audio is kept and transcribed once it's ready{Style.RESET_ALL}")
         
         # Show GUI after starting recording
         if self.gui:
@@ -154,96 +250,102 @@ class WisprFlowLocal:
         
         # Stop recording and get remaining audio (only what hasn't been chunked yet)
         audio_data = self.audio_recorder.stop_recording()
+        tail_window = (self.audio_recorder.tail_map, self.audio_recorder.tail_boundary)
         
         # Process in separate thread to avoid blocking
         processing_start = time.time()
-        threading.Thread(target=self._process_audio, args=(audio_data, processing_start), daemon=True).start()
+        threading.Thread(target=self._process_audio, args=(audio_data, tail_window, processing_start), daemon=True).start()
     
-    def _remove_duplicate_sentences(self, chunks):
-        """Remove duplicate sentences from combined chunks"""
-        if not chunks:
-            return ""
-        
-        # Combine all chunks
-        full_text = " ".join(chunks)
-        
-        # Split into phrases (using both punctuation and commas)
-        import re
-        # Split on: . ! ? , ; and multiple spaces
-        phrases = re.split(r'[.,;!?]+\s*', full_text)
-        
-        # Clean and filter phrases
-        cleaned_phrases = []
-        for phrase in phrases:
-            phrase = phrase.strip()
-            if phrase:  # Skip empty
-                cleaned_phrases.append(phrase)
-        
-        # Remove consecutive duplicates (case-insensitive)
-        unique_phrases = []
-        previous_normalized = None
-        
-        for phrase in cleaned_phrases:
-            normalized = phrase.lower().strip()
-            
-            # Skip if same as previous phrase
-            if normalized != previous_normalized:
-                unique_phrases.append(phrase)
-                previous_normalized = normalized
+    def _on_audio_chunk(self, chunk_audio, segment_map, chunk_boundary):
+        """Callback for audio chunks - queues the chunk for transcription"""
+        # Don't process chunks if recording was cancelled (stopped recordings still need them)
+        if not self.is_recording and not self.is_processing:
+            return None
+        
+        with self.chunk_lock:
+            self.chunk_count += 1
+            chunk_num = self.chunk_count
+            session_id = self.session_id
+            profile = self.decode_profile
+        
+        # Blocks the recorder's chunk monitor (not the microphone) while the queue is full
+        future = self.transcription_queue.submit(
+            self._transcribe_chunk, session_id, chunk_num, chunk_audio, segment_map, chunk_boundary, profile,
+            duration=segment_map.speech_duration
+        )
+        with self.chunk_lock:
+            if session_id == self.session_id:
+                self.chunk_futures.append(future)
+        return future
+    
+    def _transcribe_chunk(self, session_id, chunk_num, chunk_audio, segment_map, chunk_boundary, profile):
+        """Transcribe one chunk on a transcription queue worker"""
+        # Skip chunks of a cancelled recording that were still waiting in the queue
+        if session_id != self.session_id or (not self.is_recording and not self.is_processing):
+            return None
         
-        # Count removed duplicates
-        removed = len(cleaned_phrases) - len(unique_phrases)
-        if removed > 0:
-            print(f"{Fore.YELLOW}🔧 Removed {removed} duplicate phrase(s){Style.RESET_ALL}")
+        from datetime import datetime
+        start_timestamp = datetime.now().strftime("%H:%M:%S")
+        print(f"{Fore.MAGENTA}📦 [{start_timestamp}] Chunk #{chunk_num} - Starting transcription...{Style.RESET_ALL}")
         
-        # Join back with proper spacing
-        result = ", ".join(unique_phrases) + "."
+        # Transcribe chunk with word timestamps (overlap is merged by the stitcher)
+        transcribe_start = time.time()
+        words = self.chunk_transcriber.transcribe_words(chunk_audio, segment_map=segment_map, profile=profile)
+        transcribe_duration = time.time() - transcribe_start
         
-        return result
+        return session_id, chunk_num, chunk_boundary, words, transcribe_duration
     
-    def _on_audio_chunk(self, chunk_audio, chunk_start_time):
-        """Callback for processing audio chunks in background"""
-        # Track this thread
-        current_thread = threading.current_thread()
-        with self.thread_lock:
-            self.active_chunk_threads.append(current_thread)
+    def _on_chunk_transcribed(self, sequence, result):
+        """Receive chunk transcriptions in recording order"""
+        if result is None:
+            return
         
-        try:
-            # Don't process chunks if recording already stopped
-            if not self.is_recording:
-                return
-            
+        session_id, chunk_num, chunk_boundary, words, transcribe_duration = result
+        if session_id != self.session_id:
+            return
+        
+        self.stitcher.add_chunk(chunk_boundary, words)
+        
+        chunk_text = "".join(word for _, _, word in words).strip()
+        if chunk_text:
             from datetime import datetime
-            chunk_num = len(self.transcribed_chunks) + 1
-            start_timestamp = datetime.now().strftime("%H:%M:%S")
-            print(f"{Fore.MAGENTA}📦 [{start_timestamp}] Chunk #{chunk_num} - Starting transcription...{Style.RESET_ALL}")
-            
-            # Transcribe chunk
-            transcribe_start = time.time()
-            chunk_text = self.speech_to_text.transcribe_audio(chunk_audio)
-            transcribe_duration = time.time() - transcribe_start
-            
-            if chunk_text and chunk_text.strip():
-                with self.chunk_lock:
-                    # Avoid duplicates - check if this chunk is already processed
-                    if not self.transcribed_chunks or chunk_text.strip() != self.transcribed_chunks[-1]:
-                        self.transcribed_chunks.append(chunk_text.strip())
-                        end_timestamp = datetime.now().strftime("%H:%M:%S")
-                        print(f"{Fore.GREEN}✓ [{end_timestamp}] Chunk #{chunk_num} completed in {transcribe_duration:.1f}s: {chunk_text[:50]}...{Style.RESET_ALL}")
-            
+            end_timestamp = datetime.now().strftime("%H:%M:%S")
+            print(f"{Fore.GREEN}✓ [{end_timestamp}] Chunk #{chunk_num} completed in {transcribe_duration:.1f}s: {chunk_text[:50]}...{Style.RESET_ALL}")
+    
+    def _run_stream(self, session_id, audio_stream, profile):
+        """Transcribe the recording while it happens (streaming mode), committed words go to the stitcher"""
+        words = []
+        try:
+            for event in self.speech_to_text.transcribe_stream(audio_stream, profile=profile):
+                # Cancelled, or a newer recording took over
+                if session_id != self.session_id or (not self.is_recording and not self.is_processing):
+                    continue
+                
+                if self.gui and not event.is_final:
+                    self.gui.update_partial_text(f"{event.committed} {event.tentative}".strip())
+                
+                if event.new_words:
+                    words.extend(event.new_words)
+                    self.stitcher.add_chunk(0.0, words, replace=True)
+                    new_text = "".join(word for _, _, word in event.new_words).strip()
+                    print(f"{Fore.GREEN}✓ Committed: {Fore.WHITE}{new_text}{Style.RESET_ALL}")
         except Exception as e:
-            print(f"{Fore.RED}✗ Chunk transcription error: {e}{Style.RESET_ALL}")
-        finally:
-            # Always remove thread from tracking when done
-            with self.thread_lock:
-                if current_thread in self.active_chunk_threads:
-                    self.active_chunk_threads.remove(current_thread)
+            print(f"{Fore.RED}✗ Streaming transcription error: {e}{Style.RESET_ALL}")
+    
+    def _on_transcription_backpressure(self, is_behind):
+        """Report when transcription can't keep up with speech"""
+        queue = self.transcription_queue
+        if is_behind:
+            print(f"{Fore.YELLOW}⚠ Transcription falling behind: {queue.pending} chunk(s), "
+                  f"{queue.backlog_seconds:.0f}s of audio waiting{Style.RESET_ALL}")
+        else:
+            print(f"{Fore.GREEN}✓ Transcription caught up{Style.RESET_ALL}")
     
     def on_stop(self, mode="ai"):
         """Handle stop button press from GUI"""
         self.stop_recording_and_process()
     
-    def _process_audio(self, audio_data, processing_start):
+    def _process_audio(self, audio_data, tail_window, processing_start):
         """Process audio in background thread"""
         try:
             # Get current mode
@@ -251,65 +353,51 @@ class WisprFlowLocal:
             if self.gui:
                 current_mode = self.gui.get_current_mode()
             
-            # Wait for all in-flight chunk transcriptions to complete
-            max_wait = 30  # Maximum 30 seconds wait
-            wait_start = time.time()
-            last_count = -1
-            
-            while True:
-                with self.thread_lock:
-                    active_count = len(self.active_chunk_threads)
-                
-                # All chunks completed
-                if active_count == 0:
-                    break
-                
-                # Show progress when count changes
-                if active_count != last_count:
-                    print(f"{Fore.YELLOW}⏳ Waiting for {active_count} chunk(s) to complete...{Style.RESET_ALL}")
-                    last_count = active_count
-                
-                # Timeout protection
-                elapsed = time.time() - wait_start
-                if elapsed > max_wait:
-                    print(f"{Fore.RED}⚠️  Timeout: {active_count} chunk(s) still processing after {max_wait}s{Style.RESET_ALL}")
-                    break
-                
-                # Poll every 100ms
-                time.sleep(0.1)
-            
-            # Step 1: Transcribe only remaining audio (after last chunk)
-            final_transcription = ""
+            # Step 1: Transcribe only remaining audio (after last chunk, plus overlap) right
+            # away - it runs alongside the chunk transcriptions still in the queue
+            tail_map, tail_boundary = tail_window
             
-            if audio_data is not None and len(audio_data) > 0:
+            if self.streaming:
+                # Nearly everything is committed already - the stream only flushes its last words
+                print(f"{Fore.CYAN}[1/4] 🎯 Flushing streamed transcription...{Style.RESET_ALL}")
+                max_wait = 30  # Maximum 30 seconds wait
+                self.stream_thread.join(timeout=max_wait)
+                if self.stream_thread.is_alive():
+                    print(f"{Fore.RED}⚠️  Timeout: streaming transcription still running after {max_wait}s{Style.RESET_ALL}")
+            elif audio_data is not None and len(audio_data) > 0:
                 # Only transcribe if there's significant remaining audio (> 0.5 second)
-                remaining_duration = len(audio_data) / config.AUDIO_SAMPLE_RATE
+                remaining_duration = tail_map.original_end - tail_boundary
                 
                 if remaining_duration > 0.5:
                     print(f"{Fore.CYAN}[1/4] 🎯 Transcribing final {remaining_duration:.1f}s...{Style.RESET_ALL}")
-                    final_transcription = self.speech_to_text.transcribe_audio(audio_data)
+                    # Through the batcher: decoded together with chunks still waiting in the queue
+                    final_words = self.chunk_transcriber.transcribe_words(audio_data, segment_map=tail_map,
+                                                                          profile=self.decode_profile)
+                    self.stitcher.add_chunk(tail_boundary, final_words)
                 else:
                     print(f"{Fore.CYAN}[1/4] ⏭ Skipping final transcription (only {remaining_duration:.1f}s remaining){Style.RESET_ALL}")
             else:
                 print(f"{Fore.CYAN}[1/4] ⏭ No remaining audio to transcribe{Style.RESET_ALL}")
             
-            # Step 2: Combine all chunks with final transcription
+            # Join the chunk transcriptions (each future is done once its words were stitched),
+            # including a chunk cut just before the stop that was still waiting for a queue slot
+            if not self.audio_recorder.wait_for_dispatch(timeout=30):
+                print(f"{Fore.RED}⚠️  Timeout: a chunk is still waiting to be queued{Style.RESET_ALL}")
             with self.chunk_lock:
-                all_chunks = self.transcribed_chunks.copy()
-            
-            # Add final transcription if it has new content
-            if final_transcription and final_transcription.strip():
-                # Check for duplicates before adding
-                if not all_chunks or final_transcription.strip() != all_chunks[-1]:
-                    all_chunks.append(final_transcription.strip())
+                chunk_futures = list(self.chunk_futures)
+            unfinished = [future for future in chunk_futures if not future.done()]
+            if unfinished:
+                print(f"{Fore.YELLOW}⏳ Waiting for {len(unfinished)} chunk(s) to complete...{Style.RESET_ALL}")
+                max_wait = 30  # Maximum 30 seconds wait
+                _, not_done = wait(unfinished, timeout=max_wait)
+                if not_done:
+                    print(f"{Fore.RED}⚠️  Timeout: {len(not_done)} chunk(s) still processing after {max_wait}s{Style.RESET_ALL}")
             
-            # Step 2.5: Remove duplicate sentences
-            transcribed_text = self._remove_duplicate_sentences(all_chunks)
+            # Step 2: Merge all chunks - overlapping words are resolved by timestamp
+            transcribed_text = self.stitcher.get_text()
             
             if transcribed_text:
-                print(f"{Fore.GREEN}✓ Combined {len(all_chunks)} segments (duplicates removed){Style.RESET_ALL}")
-            else:
-                transcribed_text = ""
+                print(f"{Fore.GREEN}✓ Stitched {len(self.stitcher)} segments{Style.RESET_ALL}")
             
             if not transcribed_text or transcribed_text.strip() == "":
                 print(f"{Fore.RED}✗ No speech detected{Style.RESET_ALL}")
@@ -501,6 +589,7 @@ class WisprFlowLocal:
         
         # Hide GUI initially (will show on hotkey press)
         self.gui.hide()
+        self._mark_startup("gui")
         print(f"{Fore.GREEN}✓ GUI ready (hidden){Style.RESET_ALL}")
         
         # Start visualizer update thread
@@ -509,6 +598,7 @@ class WisprFlowLocal:
         
         # Setup global hotkeys
         self._setup_hotkeys()
+        self._mark_startup("hotkeys")
         
         print(f"\n{Fore.GREEN}{Style.BRIGHT}{'='*70}")
         print(f"{Fore.GREEN}{Style.BRIGHT}{'✓ WriteForMe is ready!':^70}")
@@ -543,6 +633,11 @@ class WisprFlowLocal:
                 pass
         
         self.audio_recorder.cleanup()
+        self.transcription_queue.shutdown()
+        if self.batcher:
+            self.batcher.shutdown()
+        if isinstance(self.speech_to_text, TranscriptionWorker):
+            self.speech_to_text.close()
         if self.gui:
             self.gui.destroy()
         print(f"{Fore.CYAN}👋 Goodbye!{Style.RESET_ALL}")
@@ -555,4 +650,5 @@ def main(silent_mode=False):
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # The ASR worker process re-enters a frozen exe here
     main(silent_mode=False)
@@ -0,0 +1,153 @@
+"""
+Speech segments - VAD speech runs and speech-only (compacted) audio for transcription
+"""
+import bisect
+import threading
+import numpy as np
+import config
+
+
+class SegmentMap:
+    """
+    Maps times in compacted (speech-only) audio back to recording time.
+
+    Each segment is (compact_start, original_start, duration) in seconds.
+    """
+
+    def __init__(self, segments, compacted=True):
+        """
+        Args:
+            segments: List of (compact_start, original_start, duration) tuples
+            compacted: False if the audio is the untouched original (identity map)
+        """
+        self.segments = list(segments)
+        self.compacted = compacted
+        self._starts = [segment[0] for segment in self.segments]
+
+    @classmethod
+    def identity(cls, offset, duration):
+        """Map for audio that starts at `offset` seconds and was not trimmed"""
+        return cls([(0.0, offset, duration)], compacted=False)
+
+    @property
+    def original_start(self):
+        """Recording time (s) of the first kept sample"""
+        return self.segments[0][1] if self.segments else 0.0
+
+    @property
+    def original_end(self):
+        """Recording time (s) just after the last kept sample"""
+        return self.segments[-1][1] + self.segments[-1][2] if self.segments else 0.0
+
+    @property
+    def speech_duration(self):
+        """Length (s) of the compacted audio"""
+        return sum(segment[2] for segment in self.segments)
+
+    def to_original(self, t):
+        """Convert a time (s) in the compacted audio to recording time"""
+        if not self.segments:
+            return t
+        index = max(0, bisect.bisect_right(self._starts, t) - 1)
+        compact_start, original_start, duration = self.segments[index]
+        return original_start + min(max(t - compact_start, 0.0), duration)
+
+
+class SpeechTimeline:
+    """
+    Speech runs found by VAD during one recording, in absolute sample positions.
+
+    Audio past `classified_end` has not been through VAD yet and is always
+    treated as speech.
+    """
+
+    def __init__(self):
+        self.segments = []      # [start, end) sample ranges of speech, in order
+        self.classified_end = 0  # Samples before this have been classified
+        self.lock = threading.Lock()
+
+    def reset(self):
+        """Forget everything (start of a new recording)"""
+        with self.lock:
+            self.segments = []
+            self.classified_end = 0
+
+    def add_speech(self, start, end):
+        """Record speech in [start, end), merging with the previous run if they touch"""
+        with self.lock:
+            if self.segments and self.segments[-1][1] >= start:
+                self.segments[-1][1] = max(self.segments[-1][1], end)
+            else:
+                self.segments.append([start, end])
+
+    def mark_classified(self, end):
+        """Everything before `end` has been classified"""
+        with self.lock:
+            self.classified_end = max(self.classified_end, end)
+
+    def prune(self, before):
+        """Drop speech runs that end before `before` (their audio was released)"""
+        with self.lock:
+            keep = 0
+            while keep < len(self.segments) and self.segments[keep][1] <= before:
+                keep += 1
+            del self.segments[:keep]
+
+    def speech_ranges(self, start, end, padding, min_silence):
+        """
+        Get the ranges of [start, end) to keep for transcription
+
+        Args:
+            start: Absolute start of the audio window
+            end: Absolute end of the audio window
+            padding: Samples of context kept around each speech run
+            min_silence: Silences shorter than this are kept (not cut out)
+
+        Returns:
+            list: [start, end) ranges in absolute sample positions
+        """
+        with self.lock:
+            runs = [list(run) for run in self.segments if run[1] > start and run[0] < end]
+            if self.classified_end < end:
+                runs.append([max(start, self.classified_end), end])
+
+        ranges = []
+        for run_start, run_end in runs:
+            run_start = max(start, run_start - padding)
+            run_end = min(end, run_end + padding)
+            if ranges and run_start - ranges[-1][1] < min_silence:
+                ranges[-1][1] = max(ranges[-1][1], run_end)
+            else:
+                ranges.append([run_start, run_end])
+        return ranges
+
+
+def compact_speech(audio, audio_start, ranges):
+    """
+    Cut audio down to the given speech ranges
+
+    Args:
+        audio: int16 samples starting at absolute position `audio_start`
+        audio_start: Absolute sample position of audio[0]
+        ranges: [start, end) absolute ranges to keep (from SpeechTimeline.speech_ranges)
+
+    Returns:
+        tuple: (compacted int16 audio, SegmentMap back to recording time)
+    """
+    sample_rate = config.AUDIO_SAMPLE_RATE
+    pieces = []
+    segments = []
+    compact_position = 0
+
+    for range_start, range_end in ranges:
+        pieces.append(audio[range_start - audio_start:range_end - audio_start])
+        segments.append((compact_position / sample_rate, range_start / sample_rate,
+                         (range_end - range_start) / sample_rate))
+        compact_position += range_end - range_start
+
+    # Nothing was cut out - hand back the original (view) with an identity map
+    if len(ranges) == 1 and ranges[0] == [audio_start, audio_start + len(audio)]:
+        return audio, SegmentMap.identity(audio_start / sample_rate, len(audio) / sample_rate)
+
+    compacted = np.concatenate(pieces) if pieces else np.zeros(0, dtype=np.int16)
+    return compacted, SegmentMap(segments)
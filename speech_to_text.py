@@ -1,71 +1,361 @@
 """
-Speech-to-Text module using Faster-Whisper (Offline, Accurate)
+Speech-to-Text module - offline transcription on a pluggable ASR backend
+(Faster-Whisper by default, see asr_backends.py)
 """
-from faster_whisper import WhisperModel
-import numpy as np
 import config
 import io
 import wave
 import tempfile
 import os
+import threading
+import time
+import bisect
+from functools import partial
+from asr_backends import get_backend
+from audio_sources import SyntheticAudioSource
+from streaming_transcriber import StreamingTranscriber
+from transcription_cache import TranscriptionCache
 
 
 class SpeechToText:
-    def __init__(self):
-        print("[SpeechToText] Initializing Faster-Whisper (small model)...")
+    """
+    Transcription with up to two model tiers on one ASR backend.
+
+    The accurate model (config.ASR_MODEL with Faster-Whisper) produces all
+    committed text. When the backend has a separate partials model
+    (config.ASR_PARTIAL_MODEL), a faster model re-decodes the live window
+    during streaming for low-latency partials. Models are loaded on first use,
+    or up front by load() (e.g. on a background thread at startup), and split
+    one CTranslate2 thread budget (config.ASR_CPU_THREADS). Transcriptions
+    that arrive while a model is loading wait for it.
+    
+    Every call can name a decoding profile from config.ASR_PROFILES (beam
+    size, temperature fallback, ...). A profile's cpu_threads and num_workers
+    only apply when a model is loaded: ASR_MODEL uses this instance's default
+    profile, the partials model config.STREAM_PARTIAL_PROFILE.
+    """
+    
+    def __init__(self, profile=None, backend=None):
+        """
+        Initialize speech-to-text (models load later)
+        
+        Args:
+            profile: Default decoding profile (default: config.ASR_DEFAULT_PROFILE)
+            backend: ASR backend name from asr_backends.BACKENDS (default: see asr_backends.get_backend)
+        """
+        self.profile = profile or config.ASR_DEFAULT_PROFILE
+        self.backend = get_backend(backend)
+        self._resolve_models()
+        
+        self.load_lock = threading.Lock()
+        self._model = None
+        self._partial_model = None
+        self.ready = threading.Event()  # Set by load() once every model is loaded
+        self.load_seconds = None        # How long load() took (including the warm-up)
+        self.warmup_timings = {}        # Model name -> first vs. steady-state decode time from warm_up()
+        
+        # Results for audio transcribed before (retries, re-runs, benchmark loops)
+        self.cache = None
+        if config.ASR_CACHE:
+            self.cache = TranscriptionCache(
+                max_entries=config.ASR_CACHE_ENTRIES,
+                directory=config.ASR_CACHE_DIR if config.ASR_CACHE_DISK else None,
+                max_disk_bytes=config.ASR_CACHE_DISK_MB * 1024 * 1024
+            )
         
-        # Initialize Faster-Whisper with small model
-        # compute_type: "int8" for CPU, "float16" for GPU
-        self.model = WhisperModel(
-            "small",
-            device="cpu",
-            compute_type="int8",
-            download_root=None  # Uses default cache
-        )
+        tiers = f"{self.model_name} + {self.partial_name} for partials" if self.tiered else self.model_name
+        print(f"[SpeechToText] {self.backend.label} ({tiers}) loads on first use")
+    
+    def _resolve_models(self):
+        """Get model names and thread split from the backend (again after tuning)"""
+        self.model_name = self.backend.model_name()
+        
+        # Partials only exist while streaming
+        self.partial_name = self.backend.model_name(partial=True)
+        self.tiered = config.ASR_STREAMING and self.partial_name != self.model_name
         
-        print("[SpeechToText] Faster-Whisper loaded successfully!")
+        # Split the thread budget so partials keep flowing while the accurate model finalizes
+        budget = config.ASR_CPU_THREADS or self.backend.thread_budget() or os.cpu_count() or 4
+        self.partial_threads = max(1, budget // 4) if self.tiered else 0
+        self.model_threads = max(1, budget - self.partial_threads)
+    
+    def load(self):
+        """
+        Load every model now instead of on first use (raises if a model can't be loaded).
+        On the first run with config.ASR_AUTO_TUNE the backend is tuned for this machine first.
+        """
+        start = time.perf_counter()
+        if config.ASR_AUTO_TUNE and self.backend.tune():
+            # Tuning runs outside load_lock: a dictation meanwhile loads the configured model,
+            # which then stays in use until the next start
+            with self.load_lock:
+                if self._model is None:
+                    self._resolve_models()
+                else:
+                    print("[SpeechToText] Model was loaded during tuning, tuned settings apply from the next start")
+        self.model
+        if self.tiered:
+            self.partial_model
+        if config.ASR_WARMUP:
+            self.warm_up()
+        self.load_seconds = time.perf_counter() - start
+        self.ready.set()
+    
+    def warm_up(self):
+        """
+        Decode a short synthetic clip with every loaded model and every profile the
+        app uses, so the first real dictation doesn't pay for lazy setup
+        (e.g. CTranslate2 allocations for each beam size, Silero VAD)
         
-    def transcribe_audio(self, audio_data):
+        Returns:
+            dict: "model/profile" -> {"first": s, "steady": s} decode times
         """
-        Transcribe complete audio data to text using Faster-Whisper
+        clip = SyntheticAudioSource(duration=config.ASR_WARMUP_SECONDS).generate(config.ASR_WARMUP_SECONDS)
+        
+        # Faster-Whisper's Silero VAD loads on the first vad_filter call (may drop the whole clip, so not timed)
+        self._transcribe_segments(clip, vad_filter=True)
+        
+        profiles = dict.fromkeys([self.profile, config.ASR_PUSH_TO_TALK_PROFILE, config.ASR_TOGGLE_PROFILE])
+        tiers = [(f"{self.model_name}/{profile}", self.model, profile) for profile in profiles]
+        if self.tiered:
+            tiers.append((f"{self.partial_name}/{config.STREAM_PARTIAL_PROFILE}", self.partial_model,
+                          config.STREAM_PARTIAL_PROFILE))
+        
+        for name, model, profile in tiers:
+            # Same decode twice: the first pays for the lazy setup, the second is steady state
+            times = []
+            for _ in range(2):
+                decode_start = time.perf_counter()
+                self._transcribe_segments(clip, word_timestamps=True, vad_filter=False, model=model,
+                                          profile=profile)
+                times.append(time.perf_counter() - decode_start)
+            self.warmup_timings[name] = {"first": times[0], "steady": times[1]}
+            print(f"[SpeechToText] Warm-up {name}: first decode {times[0]:.2f}s, steady state {times[1]:.2f}s")
+        
+        return self.warmup_timings
+    
+    @property
+    def model(self):
+        """Accurate model for committed text (loaded on first use)"""
+        if self._model is None:
+            with self.load_lock:
+                if self._model is None:
+                    self._model = self._load_model(self.model_name, self.profile, self.model_threads)
+        return self._model
+    
+    @property
+    def partial_model(self):
+        """Fast model for streaming partials (the accurate model when not tiered)"""
+        if not self.tiered:
+            return self.model
+        if self._partial_model is None:
+            with self.load_lock:
+                if self._partial_model is None:
+                    self._partial_model = self._load_model(self.partial_name, config.STREAM_PARTIAL_PROFILE,
+                                                           self.partial_threads)
+        return self._partial_model
+    
+    def _load_model(self, name, profile, shared_threads):
+        """Load one model with a profile's threading (its share of the budget by default)"""
+        settings = self._profile_settings(profile)
+        cpu_threads = settings["cpu_threads"] or shared_threads
+        print(f"[SpeechToText] Initializing {self.backend.label} ({name} model, {cpu_threads} threads)...")
+        
+        model = self.backend.load(name, settings, cpu_threads)
+        
+        print(f"[SpeechToText] {self.backend.label} {name} loaded successfully!")
+        return model
+        
+    def _profile_settings(self, profile):
+        """Get a decoding profile from config.ASR_PROFILES"""
+        try:
+            return config.ASR_PROFILES[profile]
+        except KeyError:
+            raise ValueError(f"Unknown ASR profile: {profile}") from None
+        
+    def transcribe_audio(self, audio_data, vad_filter=True, profile=None):
+        """
+        Transcribe complete audio data to text
         
         Args:
             audio_data: numpy array of int16 audio samples
+            vad_filter: Run the backend's own VAD (not needed for speech-only audio)
+            profile: Decoding profile name (default: this instance's profile)
             
         Returns:
             str: Transcribed text
         """
-        if audio_data is None or len(audio_data) == 0:
+        cache_key = self._cache_key(audio_data, "text", profile, vad_filter)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                print(f"[SpeechToText] Transcription from cache: {cached}")
+                return cached
+        
+        print(f"[SpeechToText] Transcribing with {self.backend.label}...")
+        segments = self._transcribe_segments(audio_data, vad_filter=vad_filter, profile=profile)
+        if segments is None:
             return ""
         
-        try:
-            # Convert int16 to float32 normalized to [-1.0, 1.0]
-            audio_float = audio_data.astype(np.float32) / 32768.0
-            
-            print("[SpeechToText] Transcribing with Faster-Whisper...")
-            
-            # Transcribe using Faster-Whisper
-            segments, info = self.model.transcribe(
-                audio_float,
-                language="en",
-                beam_size=5,
-                vad_filter=True,  # Voice Activity Detection
-                vad_parameters=dict(
-                    min_silence_duration_ms=500,
-                    threshold=0.3
-                )
-            )
+        # Combine all segments into single text
+        transcription = " ".join([segment.text for segment in segments]).strip()
+        
+        print(f"[SpeechToText] Transcription complete: {transcription}")
+        
+        if cache_key is not None:
+            self.cache.put(cache_key, transcription)
+        return transcription
+    
+    def transcribe_words(self, audio_data, offset=0.0, segment_map=None, profile=None):
+        """
+        Transcribe audio data into individual words with timestamps
+        
+        Args:
+            audio_data: numpy array of int16 audio samples
+            offset: Time (s) of the first sample, added to every timestamp
+            segment_map: SegmentMap for speech-only audio from AudioRecorder; maps
+                         timestamps back to recording time (offset is then ignored)
+            profile: Decoding profile name (default: this instance's profile)
             
-            # Combine all segments into single text
-            transcription = " ".join([segment.text for segment in segments]).strip()
+        Returns:
+            list: (start, end, word) tuples, word text keeps its leading space
+        """
+        # Silence was already cut out by the recorder's VAD - skip the second VAD pass
+        vad_filter = segment_map is None or not segment_map.compacted
+        
+        # Cached with times relative to the audio, mapped to recording time below
+        cache_key = self._cache_key(audio_data, "words", profile, vad_filter)
+        clip_words = self.cache.get(cache_key) if cache_key is not None else None
+        if clip_words is not None:
+            print(f"[SpeechToText] {len(clip_words)} words from cache")
+        else:
+            print(f"[SpeechToText] Transcribing with {self.backend.label}...")
+            segments = self._transcribe_segments(audio_data, word_timestamps=True, vad_filter=vad_filter,
+                                                 profile=profile)
+            if segments is None:
+                return []
+            clip_words = [word for segment in segments for word in segment.words]
+            if cache_key is not None:
+                self.cache.put(cache_key, clip_words)
+            print(f"[SpeechToText] Transcribed {len(clip_words)} words")
+        
+        if segment_map is not None:
+            to_original = segment_map.to_original
+        else:
+            to_original = lambda t: offset + t
+        
+        return [(to_original(start), to_original(end), word) for start, end, word in clip_words]
+    
+    def _cache_key(self, audio_data, kind, profile, vad_filter):
+        """Cache key for a transcription (None if caching is off or there is no audio)"""
+        if self.cache is None or audio_data is None or len(audio_data) == 0:
+            return None
+        profile = profile or self.profile
+        vad = (config.ASR_VAD_MIN_SILENCE_MS, config.ASR_VAD_THRESHOLD) if vad_filter else None
+        # Thread count can change floating point summation order, so results may differ slightly
+        return self.cache.key(audio_data, kind=kind, backend=self.backend.name, model=self.model_name,
+                              engine=self.backend.result_settings(), cpu_threads=self.model_threads, profile=profile,
+                              settings=self._profile_settings(profile), language=config.ASR_LANGUAGE, vad=vad)
+    
+    def transcribe_words_batch(self, audio_data, clips, profile=None):
+        """
+        Transcribe several chunks in one batched decode (one batch item per
+        chunk, e.g. Faster-Whisper's BatchedInferencePipeline)
+        
+        Args:
+            audio_data: numpy array of int16 audio samples, all chunks back to back
+            clips: (start, end, segment_map) per chunk - its sample range in audio_data
+                   and the SegmentMap that maps its times back to recording time
+            profile: Decoding profile name (default: this instance's profile)
             
-            print(f"[SpeechToText] Transcription complete: {transcription}")
+        Returns:
+            list: One list of (start, end, word) tuples per clip
+        """
+        # Clips longer than the batch window would lose their end - they are decoded alone
+        limit = self.backend.batch_clip_seconds(self.model)
+        max_samples = limit * config.AUDIO_SAMPLE_RATE if limit is not None else float("inf")
+        batched = [index for index, (start, end, _) in enumerate(clips) if end - start <= max_samples]
+        
+        results = [None] * len(clips)
+        if len(batched) > 1:
+            batch_results = self._transcribe_clips(audio_data, [clips[index] for index in batched], profile)
+            for index, words in zip(batched, batch_results):
+                results[index] = words
+        for index, (start, end, segment_map) in enumerate(clips):
+            if results[index] is None:
+                results[index] = self.transcribe_words(audio_data[start:end], segment_map=segment_map, profile=profile)
+        return results
+    
+    def _transcribe_clips(self, audio_data, clips, profile):
+        """Batched decode of clips that fit the backend's batch window (see transcribe_words_batch)"""
+        sample_rate = config.AUDIO_SAMPLE_RATE
+        try:
+            settings = self._profile_settings(profile or self.profile)
+            print(f"[SpeechToText] Transcribing {len(clips)} chunks in one batch...")
+            segments = self.backend.transcribe_batch(self.model, audio_data, [(start, end) for start, end, _ in clips],
+                                                     settings)
+        except Exception as e:
+            # e.g. faster-whisper before 1.1, or a backend without batching - decode the chunks one at a time instead
+            if not isinstance(e, NotImplementedError):
+                print(f"[SpeechToText] Batched decode failed ({e}), transcribing chunks one by one")
+            return [self.transcribe_words(audio_data[start:end], segment_map=segment_map, profile=profile)
+                    for start, end, segment_map in clips]
+        
+        # Give every word to the clip that contains its center
+        clip_starts = [start / sample_rate for start, _, _ in clips]
+        results = [[] for _ in clips]
+        for segment in segments:
+            for word_start, word_end, word in segment.words:
+                index = max(0, bisect.bisect_right(clip_starts, (word_start + word_end) / 2) - 1)
+                start, _, segment_map = clips[index]
+                to_original = segment_map.to_original if segment_map is not None else lambda t: t
+                clip_start = start / sample_rate
+                results[index].append((to_original(word_start - clip_start), to_original(word_end - clip_start), word))
+        
+        print(f"[SpeechToText] Transcribed {sum(len(words) for words in results)} words in {len(clips)} chunks")
+        
+        return results
+    
+    def transcribe_window(self, audio_data, offset=0.0, initial_prompt=None, partial=False, profile=None):
+        """
+        Transcribe one streaming window into words with timestamps (no logging,
+        it runs every few hundred milliseconds while recording)
+        
+        Args:
+            audio_data: numpy array of int16 audio samples
+            offset: Time (s) of the first sample, added to every timestamp
+            initial_prompt: Text already committed before the window (decoder context)
+            partial: Decode with the fast partials model and config.STREAM_PARTIAL_PROFILE
+            profile: Decoding profile name when not partial (default: this instance's profile)
             
-            return transcription
+        Returns:
+            list: (start, end, word) tuples, word text keeps its leading space
+        """
+        if partial:
+            model, profile = self.partial_model, config.STREAM_PARTIAL_PROFILE
+        else:
+            model = self.model
+        segments = self._transcribe_segments(audio_data, word_timestamps=True, initial_prompt=initial_prompt,
+                                             model=model, profile=profile)
+        if segments is None:
+            return []
+        return [(offset + start, offset + end, word) for segment in segments for start, end, word in segment.words]
+    
+    def _transcribe_segments(self, audio_data, word_timestamps=False, vad_filter=True, initial_prompt=None,
+                             model=None, profile=None):
+        """Run the backend and return its list of Segments (None on error or empty audio)"""
+        if audio_data is None or len(audio_data) == 0:
+            return None
+        
+        try:
+            model = model or self.model
+            settings = self._profile_settings(profile or self.profile)
+            return self.backend.transcribe(model, audio_data, settings, word_timestamps=word_timestamps,
+                                           vad_filter=vad_filter, initial_prompt=initial_prompt)
             
         except Exception as e:
             print(f"[SpeechToText] Error: {e}")
-            return ""
+            return None
     
     def _numpy_to_wav(self, audio_data):
         """Convert numpy array to WAV format bytes (kept for compatibility)"""
@@ -80,16 +370,26 @@ class SpeechToText:
         wav_buffer.seek(0)
         return wav_buffer.read()
     
-    def transcribe_stream(self, audio_stream):
+    def transcribe_stream(self, audio_stream, profile=None):
         """
-        Real-time transcription from audio stream (for future enhancement)
+        Real-time transcription from an audio stream (local agreement)
+        
+        The window of uncommitted audio is re-decoded every config.STREAM_STEP_MS,
+        words are committed once two consecutive decodes agree on them. When the
+        stream ends only the last few words are left to decode. With two model
+        tiers the fast model drives the window and the accurate model re-decodes
+        agreed audio in the background for the committed text.
         
         Args:
-            audio_stream: Generator yielding audio chunks
+            audio_stream: Iterable of int16 audio buffers, ends when recording stops
+            profile: Decoding profile for committed text (partials use config.STREAM_PARTIAL_PROFILE)
             
-        Returns:
-            str: Transcribed text
+        Yields:
+            StreamEvent: Partial updates while audio arrives, then one final event
         """
-        # This is a placeholder for potential streaming implementation
-        # Currently we transcribe the complete audio after stop is pressed
-        pass
+        decode = partial(self.transcribe_window, profile=profile)
+        if self.tiered:
+            transcriber = StreamingTranscriber(partial(self.transcribe_window, partial=True), finalize=decode)
+        else:
+            transcriber = StreamingTranscriber(decode)
+        return transcriber.stream(audio_stream)
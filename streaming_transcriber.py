@@ -0,0 +1,263 @@
+"""
+Streaming transcriber - re-decodes a sliding window of live audio and commits
+words once consecutive hypotheses agree (local agreement)
+"""
+import string
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import config
+
+# One update of the streamed transcript
+#   is_final: True for the last event, after the remaining audio was flushed
+#   committed: All committed text so far (never changes once emitted)
+#   tentative: Latest hypothesis after the committed text (may still change)
+#   new_words: (start, end, word) tuples committed by this event
+StreamEvent = namedtuple("StreamEvent", ["is_final", "committed", "tentative", "new_words"])
+
+
+def _normalize(word):
+    """Compare words without case, spacing or punctuation"""
+    return word.strip().lower().strip(string.punctuation)
+
+
+def _join(words):
+    """Text of (start, end, word) tuples - Faster-Whisper words carry their own leading space"""
+    return "".join(word for _, _, word in words).strip()
+
+
+class StreamingTranscriber:
+    """
+    Local-agreement streaming on top of a word-timestamped decoder.
+
+    Audio is collected in a window that starts where the committed text ends.
+    Every `step` seconds of new audio the whole window is decoded again. A
+    word is committed once two consecutive hypotheses agree on it (the
+    longest common prefix of both, past the committed text), so committed
+    text never changes. Once the committed words cover `trim_seconds` of the
+    window it is cut back to their end (at the latest when it grows past
+    `max_window`), which keeps every decode short.
+    flush() decodes what is left once and commits all of it - at that point
+    the window only holds the last few uncommitted words.
+
+    With a `finalize` decoder (two model tiers) the fast `decode` only drives
+    the window: agreed words are partials, and every `finalize_seconds` of
+    agreed audio is cut off and re-decoded by `finalize` on a background
+    thread. Only those words become committed text.
+    """
+
+    def __init__(self, decode, step=None, max_window=None, prompt_chars=None,
+                 finalize=None, finalize_seconds=None, trim_seconds=None):
+        """
+        Initialize streaming transcriber
+
+        Args:
+            decode: Called as decode(audio, offset=..., initial_prompt=...) with int16
+                    audio, returns (start, end, word) tuples in recording time
+            step: Seconds of new audio between decodes (default: config.STREAM_STEP_MS)
+            max_window: Longest window (s) decoded at once (default: config.STREAM_WINDOW_SECONDS)
+            prompt_chars: Committed text passed to the decoder as context (default: config.STREAM_PROMPT_CHARS)
+            finalize: Accurate decoder with the same signature for committed text (None = decode commits)
+            finalize_seconds: Agreed audio (s) per finalize call (default: config.STREAM_FINALIZE_SECONDS)
+            trim_seconds: Committed audio (s) in the window that gets it cut back, without
+                          finalize (default: config.STREAM_TRIM_SECONDS)
+        """
+        self.decode = decode
+        self.step = step if step is not None else config.STREAM_STEP_MS / 1000
+        self.max_window = max_window if max_window is not None else config.STREAM_WINDOW_SECONDS
+        self.prompt_chars = prompt_chars if prompt_chars is not None else config.STREAM_PROMPT_CHARS
+        self.finalize = finalize
+        self.finalize_seconds = finalize_seconds if finalize_seconds is not None else config.STREAM_FINALIZE_SECONDS
+        self.trim_seconds = trim_seconds if trim_seconds is not None else config.STREAM_TRIM_SECONDS
+        self.executor = None
+        if finalize is not None:
+            # One thread keeps finalize calls (and their results) in audio order
+            self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ASR-finalize")
+        self.reset()
+
+    def reset(self):
+        """Forget all audio and text (start of a new recording)"""
+        self.audio = np.zeros(0, dtype=np.int16)  # Window audio, starts at window_start
+        self.window_start = 0.0    # Recording time (s) of the first sample in the window
+        self.new_samples = 0       # Samples added since the last decode
+        self.committed = []        # Agreed (start, end, word) tuples
+        self.committed_end = 0.0   # End time (s) of the last agreed word
+        self.hypothesis = []       # Unagreed words of the last decode
+        self.spans = deque()       # Finalize calls in flight: (Future, first, last) agreed word indices
+        self.submitted = 0         # Agreed words handed to finalize
+        self.finalized = []        # Words from finalize (the committed text with two tiers)
+        self.finalized_upto = 0    # Agreed words replaced by finalized ones
+
+    def feed(self, samples):
+        """
+        Add audio and decode the window if enough new audio arrived
+
+        Args:
+            samples: int16 audio (numpy array or raw bytes) following the previous samples
+
+        Returns:
+            StreamEvent or None if the window wasn't decoded
+        """
+        if isinstance(samples, (bytes, bytearray, memoryview)):
+            samples = np.frombuffer(samples, dtype=np.int16)
+        if len(samples) == 0:
+            return None
+
+        self.audio = np.concatenate((self.audio, samples))
+        self.new_samples += len(samples)
+        if self.new_samples < self.step * config.AUDIO_SAMPLE_RATE:
+            return None
+
+        self.new_samples = 0
+        words = self._decode_window()
+
+        # Commit the longest prefix this hypothesis shares with the previous one
+        agreed = 0
+        for previous, current in zip(self.hypothesis, words):
+            if _normalize(previous[2]) != _normalize(current[2]):
+                break
+            agreed += 1
+        new_words = words[:agreed]
+        self._commit(new_words)
+        self.hypothesis = words[agreed:]
+
+        too_long = len(self.audio) > self.max_window * config.AUDIO_SAMPLE_RATE
+        committed_seconds = self.committed_end - self.window_start
+        if self.finalize is not None:
+            if too_long or committed_seconds >= self.finalize_seconds:
+                self._trim_window()
+            new_words = self._collect_finalized()
+        elif too_long or committed_seconds >= self.trim_seconds:
+            new_words = new_words + self._trim_window()
+
+        return StreamEvent(False, self._committed_text(), self._tentative_text(), new_words)
+
+    def flush(self):
+        """
+        Decode the remaining audio once and commit everything (end of the stream)
+
+        Returns:
+            StreamEvent: Final event with the complete text
+        """
+        if self.finalize is not None:
+            # The accurate model takes the rest of the window directly
+            self.committed.extend(self.hypothesis)
+            self._submit_span(self.audio, len(self.committed), always=True)
+            new_words = self._collect_finalized(wait=True)
+        else:
+            new_words = []
+            if len(self.audio) > 0:
+                new_words = self._decode_window()
+                self._commit(new_words)
+
+        event = StreamEvent(True, self._committed_text(), "", new_words)
+        self.audio = np.zeros(0, dtype=np.int16)
+        self.hypothesis = []
+        return event
+
+    def stream(self, audio_stream):
+        """
+        Transcribe an audio stream as it arrives
+
+        Args:
+            audio_stream: Iterable of int16 audio buffers, ends when the recording ends
+
+        Yields:
+            StreamEvent: One per decode, then a final one after the stream ends
+        """
+        try:
+            for samples in audio_stream:
+                event = self.feed(samples)
+                if event is not None:
+                    yield event
+            yield self.flush()
+        finally:
+            if self.executor is not None:
+                self.executor.shutdown(wait=False)
+
+    def _prompt(self, words):
+        """Decoder context from the text before a window (None if there is none)"""
+        if not self.prompt_chars:
+            return None
+        return _join(words)[-self.prompt_chars:] or None
+
+    def _committed_text(self):
+        return _join(self.finalized if self.finalize is not None else self.committed)
+
+    def _tentative_text(self):
+        if self.finalize is not None:
+            return _join(self.committed[self.finalized_upto:] + self.hypothesis)
+        return _join(self.hypothesis)
+
+    def _decode_window(self):
+        """Decode the window, returns its words after the committed text"""
+        words = self.decode(self.audio, offset=self.window_start, initial_prompt=self._prompt(self.committed))
+
+        # Words ending before the committed text are leftovers from the previous window
+        words = [word for word in words if word[0] > self.committed_end - 0.1]
+
+        # A committed word can be heard again right at the window start - drop repeated n-grams
+        if words and self.committed and words[0][0] - self.committed_end < 1.0:
+            for n in range(min(len(self.committed), len(words), 5), 0, -1):
+                tail = [_normalize(word[2]) for word in self.committed[-n:]]
+                head = [_normalize(word[2]) for word in words[:n]]
+                if tail == head:
+                    words = words[n:]
+                    break
+        return words
+
+    def _commit(self, words):
+        """Append words to the committed text"""
+        if words:
+            self.committed.extend(words)
+            self.committed_end = words[-1][1]
+
+    def _trim_window(self):
+        """Cut the window back to the committed text, returns words committed to make room"""
+        forced = []
+        if self.committed_end <= self.window_start and self.hypothesis:
+            # Nothing agreed in a whole window (e.g. a long unsteady passage) - accept the hypothesis
+            forced = self.hypothesis
+            self._commit(forced)
+            self.hypothesis = []
+
+        cut = self.committed_end
+        if cut <= self.window_start:
+            # No words at all - keep just the most recent audio
+            cut = self.window_start + len(self.audio) / config.AUDIO_SAMPLE_RATE - self.step
+        elif self.hypothesis:
+            # Cut in the gap before the next word so neither side clips it
+            cut = max(cut, (cut + self.hypothesis[0][0]) / 2)
+
+        samples = int(round((cut - self.window_start) * config.AUDIO_SAMPLE_RATE))
+        samples = max(0, min(samples, len(self.audio)))
+        if self.finalize is not None:
+            self._submit_span(self.audio[:samples], len(self.committed))
+        self.audio = self.audio[samples:].copy()
+        self.window_start += samples / config.AUDIO_SAMPLE_RATE
+        return forced
+
+    def _submit_span(self, audio, last, always=False):
+        """Re-decode audio that covers agreed words [submitted, last) with the accurate model"""
+        first = self.submitted
+        if len(audio) == 0 or (last == first and not always):
+            return  # Silence - nothing to finalize
+        future = self.executor.submit(self.finalize, audio.copy(), offset=self.window_start,
+                                      initial_prompt=self._prompt(self.committed[:first]))
+        self.spans.append((future, first, last))
+        self.submitted = last
+
+    def _collect_finalized(self, wait=False):
+        """Take finished finalize results in order, returns the newly committed words"""
+        new_words = []
+        while self.spans and (wait or self.spans[0][0].done()):
+            future, first, last = self.spans.popleft()
+            try:
+                words = future.result()
+            except Exception as e:
+                print(f"[StreamingTranscriber] Finalize error, keeping partial words: {e}")
+                words = self.committed[first:last]
+            new_words.extend(words)
+            self.finalized_upto = last
+        self.finalized.extend(new_words)
+        return new_words
@@ -0,0 +1,141 @@
+"""
+ASR backend benchmark - latency, real-time factor and memory of every installed
+backend in asr_backends.BACKENDS, then records the winner as this machine's default
+
+Each backend runs in its own process so its memory use is measured alone. The
+most accurate backend (first in BACKENDS) that decodes at least as fast as
+config.ASR_BACKEND_TARGET_RTF wins, otherwise the fastest one does.
+
+Usage:
+    python testing/backend_benchmark.py --file speech.wav
+    python testing/backend_benchmark.py --synthetic --seconds 5 --repeats 5
+
+--synthetic decodes a signal without words, so it only reports and never records a winner.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import config
+from asr_backends import BACKENDS, available_backends, save_backend_choice
+from audio_sources import FileAudioSource, SyntheticAudioSource
+from speech_segments import SegmentMap
+from speech_to_text import SpeechToText
+
+
+def benchmark(backend, audio, repeats):
+    """
+    Load one backend and decode the audio with it (run in a fresh process)
+
+    Returns:
+        dict: Load time, median decode latency, RTF and resident memory (MB)
+    """
+    import psutil
+    process = psutil.Process()
+    baseline = process.memory_info().rss
+
+    load_start = time.perf_counter()
+    stt = SpeechToText(backend=backend)
+    stt.cache = None  # Every repeat has to decode
+    stt.load()
+    load_seconds = time.perf_counter() - load_start
+
+    # Speech-only audio, as the recorder hands it over (no second VAD pass)
+    seconds = len(audio) / config.AUDIO_SAMPLE_RATE
+    segment_map = SegmentMap([(0.0, 0.0, seconds)])
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        stt.transcribe_words(audio, segment_map=segment_map)
+        times.append(time.perf_counter() - start)
+    latency = statistics.median(times)
+
+    rss = process.memory_info().rss
+    return {
+        "model": stt.model_name,
+        "load_seconds": load_seconds,
+        "latency": latency,
+        "rtf": latency / seconds,
+        "rss_mb": rss / 2**20,
+        "model_mb": (rss - baseline) / 2**20,
+    }
+
+
+def run_isolated(backend, args):
+    """Benchmark a backend in a child process (None if it failed)"""
+    command = [sys.executable, __file__, "--child", backend, "--seconds", str(args.seconds), "--repeats", str(args.repeats)]
+    command += ["--file", args.file] if args.file else ["--synthetic"]
+    print(f"[BackendBenchmark] Benchmarking {backend}...")
+    child = subprocess.run(command, capture_output=True, text=True)
+    if child.returncode != 0:
+        print(f"[BackendBenchmark] {backend} failed:\n{child.stderr.strip()}")
+        return None
+    return json.loads(child.stdout.strip().splitlines()[-1])
+
+
+def pick_winner(results):
+    """Most accurate backend that meets the target RTF, else the fastest one"""
+    for backend in BACKENDS:
+        if backend in results and results[backend]["rtf"] <= config.ASR_BACKEND_TARGET_RTF:
+            return backend
+    return min(results, key=lambda backend: results[backend]["rtf"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure every installed ASR backend and pick this machine's default")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--file", help="Speech recording (16-bit WAV, or FLAC with soundfile)")
+    group.add_argument("--synthetic", action="store_true",
+                       help="Speech-like test signal (no real words; implies --no-save)")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Audio decoded per repeat (s)")
+    parser.add_argument("--repeats", type=int, default=3, help="Decodes per backend (median is reported)")
+    parser.add_argument("--no-save", action="store_true", help="Only report, keep the recorded default")
+    parser.add_argument("--child", help=argparse.SUPPRESS)  # Benchmark one backend and print JSON
+    args = parser.parse_args()
+    # Timings on a buzz say nothing about dictation - only a real recording picks the machine's backend
+    if args.synthetic:
+        args.no_save = True
+
+    if args.file:
+        audio = FileAudioSource(args.file).samples
+    else:
+        audio = SyntheticAudioSource(duration=args.seconds).generate(args.seconds)
+    audio = audio[:int(args.seconds * config.AUDIO_SAMPLE_RATE)]
+
+    if args.child:
+        print(json.dumps(benchmark(args.child, audio, args.repeats)))
+        sys.exit(0)
+
+    results = {}
+    for backend in available_backends():
+        result = run_isolated(backend, args)
+        if result is not None:
+            results[backend] = result
+    if not results:
+        print("[BackendBenchmark] No ASR backend could be benchmarked")
+        sys.exit(1)
+    winner = pick_winner(results)
+
+    print(f"\n{'='*72}")
+    print(f"ASR backends on {len(audio) / config.AUDIO_SAMPLE_RATE:.1f}s of audio, median of {args.repeats} "
+          f"(target RTF {config.ASR_BACKEND_TARGET_RTF})")
+    print(f"{'-'*72}")
+    print(f"{'backend':>15} {'model':>28} {'load':>7} {'latency':>8} {'rtf':>6} {'rss':>8}")
+    for backend, result in results.items():
+        print(f"{backend:>15} {result['model'][-28:]:>28} {result['load_seconds']:6.1f}s {result['latency']:7.2f}s "
+              f"{result['rtf']:6.3f} {result['rss_mb']:6.0f}MB")
+    print(f"{'-'*72}")
+    if args.no_save:
+        print(f"Winner: {winner} (not saved)")
+    else:
+        save_backend_choice(winner, results)
+        print(f"Winner: {winner} - saved to {config.ASR_BACKEND_CHOICE_FILE}")
+    print(f"{'='*72}\n")
@@ -0,0 +1,222 @@
+"""
+Headless pipeline driver - runs the real AudioRecorder (chunking + VAD) and
+optionally Faster-Whisper on a file or synthetic source. No microphone needed,
+so load tests and latency measurements are reproducible.
+
+Usage:
+    python testing/headless_pipeline.py --synthetic 60
+    python testing/headless_pipeline.py --synthetic 120 --speed 4
+    python testing/headless_pipeline.py --file speech.wav --transcribe
+    python testing/headless_pipeline.py --file speech.wav --transcribe --worker
+    python testing/headless_pipeline.py --file speech.wav --transcribe --stream
+"""
+import argparse
+import sys
+import threading
+import time
+from concurrent.futures import wait
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import config
+from audio_recorder import AudioRecorder
+from audio_sources import FileAudioSource, SyntheticAudioSource
+from transcript_stitcher import TranscriptStitcher
+from transcription_queue import TranscriptionQueue
+from batch_transcriber import BatchTranscriber
+
+
+def run_pipeline(source, transcribe=False, worker=False, stream=False, profile=None):
+    """
+    Record everything the source delivers and report chunking/ASR timings
+
+    Args:
+        source: FileAudioSource or SyntheticAudioSource (must finish on its own)
+        transcribe: Also run Faster-Whisper on every chunk
+        worker: Transcribe in the ASR worker process instead of in-process
+        stream: Transcribe with transcribe_stream() while recording instead of chunking
+        profile: Decoding profile from config.ASR_PROFILES (default: config.ASR_DEFAULT_PROFILE)
+
+    Returns:
+        dict: Chunk statistics, timings and (if transcribing) the stitched text
+    """
+    stt = None
+    if transcribe and worker:
+        from asr_worker import TranscriptionWorker
+        stt = TranscriptionWorker()
+    elif transcribe:
+        from speech_to_text import SpeechToText
+        stt = SpeechToText()
+    if stt:
+        stt.load()  # Keep model loading out of the chunk timings
+
+    recorder = AudioRecorder(source=source)
+    stitcher = TranscriptStitcher(overlap=recorder.chunk_overlap)
+    chunks = []
+    futures = []
+    lock = threading.Lock()
+    behind_events = []
+
+    def transcribe_chunk(entry, chunk_audio, segment_map, chunk_boundary):
+        entry["queue_seconds"] = time.perf_counter() - entry["queued_at"]
+        start = time.perf_counter()
+        words = chunk_transcriber.transcribe_words(chunk_audio, segment_map=segment_map, profile=profile)
+        entry["asr_seconds"] = time.perf_counter() - start
+        return chunk_boundary, words
+
+    # Same batching and ordered, bounded queue as main.py
+    batcher = None
+    chunk_transcriber = stt
+    if stt and config.ASR_BATCH_SIZE > 1:
+        batcher = BatchTranscriber(stt, max_batch=config.ASR_BATCH_SIZE, deadline=config.ASR_BATCH_DEADLINE_MS / 1000,
+                                   backlog=lambda: transcription_queue.pending, concurrency=config.ASR_CONCURRENCY)
+        chunk_transcriber = batcher
+    transcription_queue = TranscriptionQueue(
+        max_workers=batcher.callers if batcher else config.ASR_CONCURRENCY,
+        max_pending=config.ASR_MAX_PENDING_CHUNKS,
+        max_backlog=config.ASR_MAX_BACKLOG_SECONDS,
+        on_result=lambda sequence, result: stitcher.add_chunk(*result),
+        on_backpressure=behind_events.append
+    )
+
+    def on_chunk(chunk_audio, segment_map, chunk_boundary):
+        # How much audio had been captured beyond this chunk when it was dispatched
+        chunk_end = segment_map.original_end
+        dispatch_lag = recorder.audio_buffer.write_pos / config.AUDIO_SAMPLE_RATE - chunk_end
+        entry = {
+            "offset": segment_map.original_start,
+            "boundary": chunk_boundary,
+            "duration": chunk_end - chunk_boundary,
+            "speech": segment_map.speech_duration,
+            "dispatch_lag": dispatch_lag,
+        }
+        with lock:
+            chunks.append(entry)
+        if stt:
+            entry["queued_at"] = time.perf_counter()
+            future = transcription_queue.submit(transcribe_chunk, entry, chunk_audio, segment_map,
+                                                chunk_boundary, duration=segment_map.speech_duration)
+            with lock:
+                futures.append(future)
+            return future
+        return None
+
+    stream_events = []
+
+    def run_stream(audio_stream):
+        for event in stt.transcribe_stream(audio_stream, profile=profile):
+            stream_events.append((time.perf_counter(), event))
+            if event.is_final:
+                stitcher.add_chunk(0.0, [word for _, e in stream_events for word in e.new_words])
+
+    stream_thread = None
+    if not (stt and stream):
+        recorder.set_chunk_callback(on_chunk)
+
+    wall_start = time.perf_counter()
+    recorder.start_recording()
+    if stt and stream:
+        stream_thread = threading.Thread(target=run_stream, args=(recorder.stream_audio(),), daemon=True)
+        stream_thread.start()
+    source.finished.wait()
+    tail = recorder.stop_recording()
+    stop_time = time.perf_counter()
+
+    # Final tail right away, alongside queued chunks, then join them - as main.py does
+    tail_seconds = 0.0
+    if stream_thread is not None:
+        # Streaming: only the words the stream hasn't committed yet are left
+        stream_thread.join()
+        tail = None
+    if tail is not None:
+        tail_seconds = recorder.tail_map.original_end - recorder.tail_boundary
+        if stt:
+            stitcher.add_chunk(recorder.tail_boundary, chunk_transcriber.transcribe_words(
+                tail, segment_map=recorder.tail_map, profile=profile))
+    recorder.wait_for_dispatch()
+    with lock:
+        chunk_futures = list(futures)
+    wait(chunk_futures)
+    tail_latency = time.perf_counter() - stop_time
+
+    # Chunks release their audio just after their futures complete
+    while recorder.pending_chunks:
+        time.sleep(0.01)
+    recorder.cleanup()
+    transcription_queue.shutdown()
+    if batcher:
+        batcher.shutdown()
+    if worker and stt:
+        stt.close()
+
+    return {
+        "audio_seconds": recorder.audio_buffer.write_pos / config.AUDIO_SAMPLE_RATE,
+        "wall_seconds": stop_time - wall_start,
+        "chunks": sorted(chunks, key=lambda c: c["boundary"]),
+        "tail_seconds": tail_seconds,
+        "tail_latency": tail_latency,
+        "dropped_raw_frames": recorder.dropped_raw_frames,
+        "fell_behind": behind_events.count(True),
+        "batch_sizes": batcher.batch_sizes if batcher else [],
+        # Counters live in the worker process with --worker
+        "cache": (stt.cache.hits, stt.cache.misses) if getattr(stt, "cache", None) else None,
+        "stream_decodes": len(stream_events),
+        "stream_final_words": len(stream_events[-1][1].new_words) if stream_events else 0,
+        "text": stitcher.get_text() if stt else None,
+    }
+
+
+def print_report(result):
+    """Print a summary of run_pipeline() results"""
+    chunks = result["chunks"]
+    print(f"\n{'='*60}")
+    print(f"Audio: {result['audio_seconds']:.1f}s in {result['wall_seconds']:.1f}s wall time")
+    print(f"Chunks: {len(chunks)} | Tail left at stop: {result['tail_seconds']:.2f}s")
+    print(f"Dropped VAD/FFT buffers: {result['dropped_raw_frames']} | ASR fell behind: {result['fell_behind']}x")
+    print(f"{'-'*60}")
+    print(f"{'#':>3} {'start':>8} {'length':>8} {'speech':>8} {'lag':>7} {'queued':>7} {'asr':>7} {'rtf':>6}")
+    for i, chunk in enumerate(chunks, 1):
+        asr = chunk.get("asr_seconds")
+        asr_text = f"{asr:6.2f}s" if asr is not None else "      -"
+        queued = chunk.get("queue_seconds")
+        queued_text = f"{queued:6.2f}s" if queued is not None else "      -"
+        rtf_text = f"{asr / chunk['duration']:6.2f}" if asr is not None else "     -"
+        print(f"{i:>3} {chunk['boundary']:7.2f}s {chunk['duration']:7.2f}s {chunk['speech']:7.2f}s "
+              f"{chunk['dispatch_lag']:6.2f}s {queued_text} {asr_text} {rtf_text}")
+    if result["text"] is not None:
+        print(f"{'-'*60}")
+        batches = [size for size in result["batch_sizes"] if size > 1]
+        if batches:
+            print(f"Batched decodes: {len(batches)} (largest {max(batches)} chunks)")
+        if result["cache"] and result["cache"][0]:
+            print(f"Cache: {result['cache'][0]} hits, {result['cache'][1]} misses")
+        if result["stream_decodes"]:
+            print(f"Streaming: {result['stream_decodes']} decodes, {result['stream_final_words']} word(s) left for the flush")
+        print(f"Stop-to-text latency: {result['tail_latency']:.2f}s")
+        print(f"Text: {result['text']}")
+    print(f"{'='*60}\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the recording pipeline without a microphone")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--file", help="16-bit WAV (or FLAC with soundfile), resampled to 16kHz mono if needed")
+    group.add_argument("--synthetic", type=float, metavar="SECONDS", help="Generate speech-like audio")
+    parser.add_argument("--speed", type=float, default=1.0, help="Playback speed (0 = as fast as possible, VAD may drop buffers)")
+    parser.add_argument("--transcribe", action="store_true", help="Run Faster-Whisper on each chunk")
+    parser.add_argument("--worker", action="store_true", help="Transcribe in the ASR worker process")
+    parser.add_argument("--stream", action="store_true", help="Transcribe while recording (local agreement) instead of chunking")
+    parser.add_argument("--profile", choices=sorted(config.ASR_PROFILES), help="Decoding profile (default: config.ASR_DEFAULT_PROFILE)")
+    args = parser.parse_args()
+
+    speed = args.speed or None
+    if args.file:
+        source = FileAudioSource(args.file, speed=speed)
+    else:
+        source = SyntheticAudioSource(duration=args.synthetic, speed=speed)
+
+    print_report(run_pipeline(source, transcribe=args.transcribe, worker=args.worker, stream=args.stream,
+                              profile=args.profile))
@@ -0,0 +1,83 @@
+"""
+Decoding profile benchmark - real-time factor (decode time / audio length) of every
+profile in config.ASR_PROFILES, on clips as long as push-to-talk bursts and chunks
+
+Usage:
+    python testing/profile_benchmark.py --file speech.wav
+    python testing/profile_benchmark.py --synthetic --lengths 2 5 15 --repeats 5
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import config
+from audio_sources import FileAudioSource, SyntheticAudioSource
+from speech_segments import SegmentMap
+from speech_to_text import SpeechToText
+
+
+def benchmark(profile, audio, lengths, repeats):
+    """
+    Decode the first `length` seconds of audio with one profile
+
+    Returns:
+        dict: Model load time and median RTF per clip length
+    """
+    load_start = time.perf_counter()
+    stt = SpeechToText(profile=profile)
+    stt.cache = None  # Every repeat has to decode
+    stt.load()
+    load_seconds = time.perf_counter() - load_start
+
+    rtf = {}
+    for length in lengths:
+        clip = audio[:int(length * config.AUDIO_SAMPLE_RATE)]
+        seconds = len(clip) / config.AUDIO_SAMPLE_RATE
+        # Speech-only audio, as the recorder hands it over (no second VAD pass)
+        segment_map = SegmentMap([(0.0, 0.0, seconds)])
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            stt.transcribe_words(clip, segment_map=segment_map)
+            times.append(time.perf_counter() - start)
+        rtf[length] = statistics.median(times) / seconds
+
+    return {"model": stt.model_name, "load_seconds": load_seconds, "rtf": rtf}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure the real-time factor of each decoding profile")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--file", help="Speech recording (16-bit WAV, or FLAC with soundfile)")
+    group.add_argument("--synthetic", action="store_true", help="Speech-like test signal (no real words)")
+    parser.add_argument("--lengths", type=float, nargs="+", default=[2.0, 5.0, 10.0, 15.0], help="Clip lengths (s)")
+    parser.add_argument("--repeats", type=int, default=3, help="Decodes per clip (median is reported)")
+    parser.add_argument("--profiles", nargs="+", choices=sorted(config.ASR_PROFILES), default=list(config.ASR_PROFILES))
+    args = parser.parse_args()
+
+    longest = max(args.lengths)
+    if args.file:
+        audio = FileAudioSource(args.file).samples
+    else:
+        audio = SyntheticAudioSource(duration=longest).generate(longest)
+    lengths = [length for length in args.lengths if length * config.AUDIO_SAMPLE_RATE <= len(audio)]
+
+    results = {profile: benchmark(profile, audio, lengths, args.repeats) for profile in args.profiles}
+
+    print(f"\n{'='*72}")
+    model = next(iter(results.values()))["model"]
+    print(f"{model} model ({config.ASR_DEVICE}) - "
+          f"RTF, median of {args.repeats} (below 1.0 = faster than real time)")
+    print(f"{'-'*72}")
+    print(f"{'profile':>10} {'beam':>5} {'load':>7} " + " ".join(f"{f'{length:g}s':>7}" for length in lengths))
+    for profile, result in results.items():
+        settings = config.ASR_PROFILES[profile]
+        print(f"{profile:>10} {settings['beam_size']:>5} {result['load_seconds']:6.1f}s " +
+              " ".join(f"{result['rtf'][length]:7.3f}" for length in lengths))
+    print(f"{'='*72}\n")
@@ -0,0 +1,99 @@
+"""
+Resampler benchmark - CPU cost of converting common device formats to 16kHz mono,
+fed in device-sized buffers exactly as PyAudioSource does
+
+Usage:
+    python testing/resampler_benchmark.py
+    python testing/resampler_benchmark.py --seconds 120 --taps 48
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import config
+from audio_resampler import StreamingResampler
+
+DEVICE_FORMATS = [
+    (48000, 2),
+    (48000, 1),
+    (44100, 2),
+    (44100, 1),
+    (32000, 1),
+    (22050, 1),
+    (8000, 1),
+]
+
+
+def make_input(rate, channels, seconds):
+    """Speech-band test signal (tone plus noise) as interleaved int16"""
+    rng = np.random.default_rng(0)
+    t = np.arange(int(rate * seconds)) / rate
+    mono = 6000 * np.sin(2 * np.pi * 440 * t) + rng.normal(0, 1000, len(t))
+    return np.repeat(mono[:, None], channels, axis=1).reshape(-1).astype(np.int16)
+
+
+def alias_level(rate, channels, taps):
+    """Output level (dB relative to input) of a tone between 8kHz and the input Nyquist"""
+    if rate <= config.AUDIO_SAMPLE_RATE:
+        return None
+    frequency = min(11000, rate / 2 * 0.9)
+    t = np.arange(rate) / rate
+    tone = 10000 * np.sin(2 * np.pi * frequency * t)
+    samples = np.repeat(tone[:, None], channels, axis=1).reshape(-1).astype(np.int16)
+    output = StreamingResampler(rate, channels, taps=taps).process(samples)[taps:]
+    return 20 * np.log10(max(np.abs(output).max(), 1) / 10000)
+
+
+def benchmark(rate, channels, seconds, taps):
+    """
+    Resample `seconds` of audio in device buffers
+
+    Returns:
+        dict: CPU milliseconds per second of audio and per buffer, alias level
+    """
+    samples = make_input(rate, channels, seconds)
+    frames_per_buffer = round(config.AUDIO_CHUNK_SIZE * rate / config.AUDIO_SAMPLE_RATE)
+    buffers = [samples[i:i + frames_per_buffer * channels].tobytes()
+               for i in range(0, len(samples), frames_per_buffer * channels)]
+
+    resampler = StreamingResampler(rate, channels, taps=taps)
+    output_samples = 0
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    for in_data in buffers:
+        output_samples += len(resampler.process(in_data))
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    return {
+        "ratio": f"{resampler.up}/{resampler.down}",
+        "cpu_ms_per_second": cpu / seconds * 1000,
+        "wall_us_per_buffer": wall / len(buffers) * 1e6,
+        "output_seconds": output_samples / config.AUDIO_SAMPLE_RATE,
+        "alias_db": alias_level(rate, channels, taps),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure StreamingResampler CPU cost")
+    parser.add_argument("--seconds", type=float, default=60, help="Audio per format")
+    parser.add_argument("--taps", type=int, default=config.AUDIO_RESAMPLER_TAPS, help="Filter taps per phase")
+    args = parser.parse_args()
+
+    print(f"\n{'='*72}")
+    print(f"StreamingResampler -> {config.AUDIO_SAMPLE_RATE}Hz mono, {args.taps} taps, {args.seconds:.0f}s per format")
+    print(f"{'-'*72}")
+    print(f"{'input':>14} {'ratio':>9} {'cpu ms/s':>9} {'% of core':>10} {'us/buffer':>10} {'alias':>9}")
+    for rate, channels in DEVICE_FORMATS:
+        result = benchmark(rate, channels, args.seconds, args.taps)
+        alias = f"{result['alias_db']:6.1f}dB" if result["alias_db"] is not None else "        -"
+        print(f"{f'{rate}Hz x{channels}':>14} {result['ratio']:>9} {result['cpu_ms_per_second']:9.2f} "
+              f"{result['cpu_ms_per_second'] / 10:9.3f}% {result['wall_us_per_buffer']:10.1f} {alias}")
+    print(f"{'='*72}\n")
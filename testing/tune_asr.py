@@ -0,0 +1,63 @@
+"""
+ASR tuning - re-runs the first-run tuner (asr_tuner.py): times real decodes across
+model sizes, compute types and cpu_threads/num_workers, and saves the pick that
+SpeechToText loads from then on
+
+Usage:
+    python testing/tune_asr.py --file speech.wav
+    python testing/tune_asr.py --file speech.wav --target-rtf 0.5
+    python testing/tune_asr.py --file speech.wav --models base small medium --threads 4 8 --no-save
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import config
+from asr_backends import FasterWhisperBackend
+from asr_tuner import ASRTuner, save_tuning
+from audio_sources import FileAudioSource
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pick Faster-Whisper settings for this machine")
+    parser.add_argument("--file", required=not config.ASR_TUNING_AUDIO,
+                        help="Speech recording (16-bit WAV, or FLAC with soundfile) - default: config.ASR_TUNING_AUDIO")
+    parser.add_argument("--models", nargs="+", help="Model sizes, least to most accurate")
+    parser.add_argument("--compute-types", nargs="+", help="Compute types, fastest to most precise")
+    parser.add_argument("--threads", type=int, nargs="+", help="cpu_threads values")
+    parser.add_argument("--workers", type=int, nargs="+", help="num_workers values")
+    parser.add_argument("--target-rtf", type=float, help=f"Slowest acceptable RTF (default {config.ASR_TUNING_TARGET_RTF})")
+    parser.add_argument("--repeats", type=int, default=2, help="Timed decodes per candidate (median is used)")
+    parser.add_argument("--no-save", action="store_true", help="Only report, keep the saved tuning")
+    args = parser.parse_args()
+
+    audio = None
+    if args.file:
+        audio = FileAudioSource(args.file).samples[:int(config.ASR_TUNING_SECONDS * config.AUDIO_SAMPLE_RATE)]
+
+    tuner = ASRTuner(FasterWhisperBackend(), audio=audio, models=args.models, compute_types=args.compute_types,
+                     threads=args.threads, workers=args.workers, target_rtf=args.target_rtf, repeats=args.repeats)
+    tuning = tuner.run()
+    if tuning is None:
+        sys.exit(1)
+
+    print(f"\n{'='*72}")
+    print(f"Faster-Whisper on {tuner.seconds:.1f}s of audio ({config.ASR_DEVICE}) - target RTF {tuner.target_rtf}")
+    print(f"{'-'*72}")
+    print(f"{'model':>8} {'compute':>13} {'threads':>8} {'workers':>8} {'load':>7} {'rtf':>7} {'throughput':>11}")
+    for result in tuning["results"]:
+        rtf_text = f"{result['rtf']:7.3f}" if result["rtf"] is not None else "      -"
+        print(f"{result['model']:>8} {result['compute_type']:>13} {result['cpu_threads']:>8} "
+              f"{result['num_workers']:>8} {result['load_seconds']:6.1f}s {rtf_text} {result['throughput_rtf']:11.3f}")
+    print(f"{'-'*72}")
+    pick = f"{tuning['model']} ({tuning['compute_type']}, {tuning['cpu_threads']} threads, {tuning['num_workers']} workers)"
+    if args.no_save:
+        print(f"Pick: {pick} (not saved)")
+    else:
+        save_tuning(tuning)
+        print(f"Pick: {pick} - saved to {config.ASR_TUNING_FILE}")
+    print(f"{'='*72}\n")
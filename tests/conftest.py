@@ -0,0 +1,9 @@
+"""
+Shared test setup - makes the project root importable
+"""
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
@@ -0,0 +1,32 @@
+"""
+Tests for asr_backends.py - the backend interface and backend selection
+"""
+import pytest
+
+from asr_backends import ASRBackend, VoskBackend, get_backend
+
+
+def test_backend_must_implement_the_interface():
+    class NoTranscribe(ASRBackend):
+        def model_name(self, partial=False):
+            return "model"
+
+        def load(self, name, settings, cpu_threads):
+            return object()
+
+    with pytest.raises(TypeError):
+        ASRBackend()
+    with pytest.raises(TypeError):
+        NoTranscribe()
+
+
+def test_batched_decoding_is_optional():
+    backend = VoskBackend()
+    with pytest.raises(NotImplementedError):
+        backend.transcribe_batch(None, None, [], {})
+
+
+def test_unknown_backend_name_raises():
+    assert isinstance(get_backend("vosk"), VoskBackend)
+    with pytest.raises(ValueError):
+        get_backend("no-such-engine")
@@ -0,0 +1,86 @@
+"""
+Tests for asr_tuner.py - candidate selection, with a backend that fakes decode times
+"""
+import time
+import numpy as np
+import pytest
+
+import config
+from asr_backends import FasterWhisperBackend
+from asr_tuner import ASRTuner, load_tuning
+
+# Seconds per decode of the 1s test clip
+DECODE_SECONDS = {"tiny": 0.01, "base": 0.02, "small": 0.2}
+PRECISION_COST = {"int8": 1.0, "int8_float32": 1.2, "float32": 3.0}
+
+
+class FakeBackend(FasterWhisperBackend):
+    def __init__(self):
+        super().__init__()
+        self.tuning = None
+        self.decoded = []
+
+    def load_model(self, name, compute_type, cpu_threads, num_workers):
+        return name, compute_type
+
+    def transcribe(self, model, audio_data, settings, word_timestamps=False, vad_filter=True, initial_prompt=None):
+        self.decoded.append(settings)
+        name, compute_type = model
+        time.sleep(DECODE_SECONDS[name] * PRECISION_COST[compute_type])
+        return []
+
+
+@pytest.fixture(autouse=True)
+def tuning_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "ASR_TUNING_FILE", str(tmp_path / "asr_tuning.json"))
+    monkeypatch.setattr(config, "ASR_TUNING_AUDIO", None)
+
+
+def tune(backend, target_rtf):
+    audio = np.zeros(config.AUDIO_SAMPLE_RATE, dtype=np.int16)
+    return ASRTuner(backend, audio=audio, models=["tiny", "base", "small"],
+                    compute_types=["int8", "int8_float32", "float32"], threads=[2],
+                    workers=[1], target_rtf=target_rtf, repeats=1).run()
+
+
+def test_picks_most_accurate_setting_that_meets_the_target():
+    tuning = tune(FakeBackend(), target_rtf=0.05)
+
+    # small is too slow, base keeps up up to int8_float32
+    assert (tuning["model"], tuning["compute_type"]) == ("base", "int8_float32")
+
+
+def test_falls_back_to_the_fastest_setting():
+    tuning = tune(FakeBackend(), target_rtf=0.001)
+
+    assert (tuning["model"], tuning["compute_type"]) == ("tiny", "int8")
+    assert tuning["rtf"] > 0.001
+
+
+def test_decodes_without_temperature_fallback():
+    backend = FakeBackend()
+    tune(backend, target_rtf=0.05)
+
+    assert all(len(settings["temperature"]) == 1 for settings in backend.decoded)
+
+
+def test_needs_a_speech_recording():
+    with pytest.raises(ValueError):
+        ASRTuner(FakeBackend())
+
+
+def test_backend_skips_tuning_without_a_recording():
+    backend = FakeBackend()
+
+    assert not backend.tune()
+    assert backend.decoded == []
+    assert load_tuning() is None
+
+
+def test_backend_saves_the_tuning():
+    backend = FakeBackend()
+    audio = np.zeros(config.AUDIO_SAMPLE_RATE, dtype=np.int16)
+
+    assert backend.tune(audio=audio, models=["tiny"], compute_types=["int8"], threads=[1], workers=[1], repeats=1)
+    assert load_tuning()["model"] == "tiny"
+    assert FasterWhisperBackend().model_name() == "tiny"
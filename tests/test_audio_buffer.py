@@ -0,0 +1,76 @@
+"""
+Tests for audio_buffer.py - ring buffer wrap-around, growth and reader references
+"""
+import numpy as np
+import pytest
+
+from audio_buffer import AudioRingBuffer, SessionAudioStore
+
+
+def samples(start, count):
+    return np.arange(start, start + count, dtype=np.int16)
+
+
+def test_views_across_the_wrap_are_contiguous():
+    buffer = AudioRingBuffer(10)
+    buffer.write(samples(0, 8))
+    buffer.release(6)
+    buffer.write(samples(8, 6))  # Wraps past the end of the storage
+
+    view = buffer.view(6, 14)
+    assert np.array_equal(view, samples(6, 8))
+    assert view.base is not None  # A view, not a copy
+    assert buffer.capacity == 10
+
+
+def test_buffer_grows_instead_of_overwriting_retained_audio():
+    buffer = AudioRingBuffer(10)
+    buffer.write(samples(0, 8))
+    old_view = buffer.view(0, 8)
+    buffer.write(samples(8, 8))
+
+    assert buffer.capacity >= 16
+    assert np.array_equal(buffer.view(0, 16), samples(0, 16))
+    assert np.array_equal(old_view, samples(0, 8))  # Earlier views stay valid
+
+
+def test_reader_reference_keeps_released_audio():
+    buffer = AudioRingBuffer(10)
+    buffer.write(samples(0, 8))
+    buffer.retain("chunk", 2)
+    buffer.release(8)
+
+    assert buffer.retained_from == 2
+    assert np.array_equal(buffer.view(2, 8), samples(2, 6))
+    buffer.drop("chunk")
+    with pytest.raises(ValueError):
+        buffer.view(2, 8)
+
+    # Without references released storage is reused, nothing grows
+    buffer.write(samples(8, 10))
+    assert buffer.capacity == 10
+
+
+def test_reset_forgets_samples_and_references():
+    buffer = AudioRingBuffer(10)
+    buffer.write(samples(0, 5))
+    buffer.retain("vad", 0)
+    buffer.reset()
+
+    assert len(buffer) == 0 and buffer.retained_from == 0
+    buffer.write(samples(100, 3))
+    assert np.array_equal(buffer.view(0), samples(100, 3))
+
+
+def test_session_store_matches_the_ring_buffer(tmp_path):
+    store = SessionAudioStore(directory=tmp_path)
+    store.write(samples(0, 8))
+    store.write(samples(8, 8))
+    store.release(4)
+
+    assert np.array_equal(store.view(4, 16), samples(4, 12))
+    with pytest.raises(ValueError):
+        store.view(0, 4)
+    path = store.path
+    store.close()
+    assert not path.exists()
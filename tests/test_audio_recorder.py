@@ -0,0 +1,221 @@
+"""
+Tests for audio_recorder.py - VAD bookkeeping, silence trimming and chunk cuts
+"""
+import threading
+import time
+
+import numpy as np
+import pytest
+
+pytest.importorskip("webrtcvad")
+
+import config
+from audio_recorder import AudioRecorder
+from audio_sources import SyntheticAudioSource
+
+RATE = config.AUDIO_SAMPLE_RATE
+BUFFER = config.AUDIO_CHUNK_SIZE
+
+
+@pytest.fixture
+def recorder():
+    recorder = AudioRecorder(source=SyntheticAudioSource(kind="silence"))
+    recorder.session_id += 1  # As start_recording() does, without opening the source
+    yield recorder
+    recorder.cleanup()
+
+
+def test_dropped_vad_buffers_are_not_trimmed(recorder):
+    audio = np.zeros(6 * RATE, dtype=np.int16)
+    recorder.audio_buffer.write(audio)
+
+    # VAD sees the first and last second only - the buffers in between were dropped
+    positions = range(0, len(audio) - BUFFER + 1, BUFFER)
+    dropped = [position for position in positions if RATE <= position < 5 * RATE]
+    for position in positions:
+        if position not in dropped:
+            recorder._run_vad(recorder.session_id, position, audio[position:position + BUFFER])
+
+    window_end = positions[-1] + BUFFER
+    compacted, segment_map = recorder._speech_only(recorder.audio_buffer.view(0, window_end), 0, window_end)
+
+    # Every unclassified sample survives trimming
+    gap_start, gap_end = dropped[0], dropped[-1] + BUFFER
+    kept = segment_map.segments
+    assert any(start * RATE <= gap_start and (start + length) * RATE >= gap_end for _, start, length in kept)
+    assert len(compacted) >= gap_end - gap_start
+
+
+def test_buffers_dropped_at_the_start_are_not_trimmed(recorder):
+    audio = np.zeros(3 * RATE, dtype=np.int16)
+    recorder.audio_buffer.write(audio)
+
+    first_seen = 10 * BUFFER
+    for position in range(first_seen, len(audio) - BUFFER + 1, BUFFER):
+        recorder._run_vad(recorder.session_id, position, audio[position:position + BUFFER])
+
+    ranges = recorder.speech_timeline.speech_ranges(0, len(audio), 0, 0)
+    assert ranges[0][0] == 0 and ranges[0][1] >= first_seen
+
+
+def test_classified_silence_is_trimmed(recorder):
+    audio = np.zeros(3 * RATE, dtype=np.int16)
+    recorder.audio_buffer.write(audio)
+
+    end = (len(audio) // BUFFER) * BUFFER
+    for position in range(0, end, BUFFER):
+        recorder._run_vad(recorder.session_id, position, audio[position:position + BUFFER])
+
+    # Only the unclassified remainder (less than one VAD frame) is left
+    ranges = recorder.speech_timeline.speech_ranges(0, end, 0, 0)
+    assert sum(range_end - range_start for range_start, range_end in ranges) < RATE // 50
+
+
+def test_stop_does_not_wait_for_a_blocked_chunk_callback(recorder):
+    entered, release = threading.Event(), threading.Event()
+    chunks = []
+
+    def on_chunk(chunk_audio, segment_map, chunk_boundary):
+        entered.set()
+        release.wait(timeout=5)  # Transcription queue full
+        chunks.append(chunk_boundary)
+
+    recorder.trim_silence = False
+    recorder.set_chunk_callback(on_chunk)
+    recorder.audio_buffer.write(np.zeros(2 * RATE, dtype=np.int16))
+    recorder.is_recording = True
+    recorder.pending_cut = RATE
+    recorder._notify_chunk_monitor()
+    assert entered.wait(timeout=5)
+
+    tail = recorder.stop_recording()
+    assert recorder.tail_boundary == 1.0  # The tail starts after the chunk that is still being handed over
+    assert len(tail) == RATE + int(recorder.chunk_overlap * RATE)
+    assert not recorder.wait_for_dispatch(timeout=0.1)
+
+    release.set()
+    assert recorder.wait_for_dispatch(timeout=5)
+    assert chunks == [0.0]
+
+
+def run_vad(recorder, audio):
+    recorder.audio_buffer.write(audio)
+    for position in range(0, len(audio) - BUFFER + 1, BUFFER):
+        recorder._run_vad(recorder.session_id, position, audio[position:position + BUFFER])
+
+
+def test_pause_after_the_minimum_length_cuts_in_its_middle(recorder):
+    run_vad(recorder, np.zeros(5 * RATE, dtype=np.int16))
+
+    min_samples = int(recorder.chunk_min_duration * RATE)
+    pause_samples = int(recorder.chunk_pause_duration * RATE)
+    assert recorder.pending_cut == min_samples + pause_samples // 2
+    assert recorder._next_chunk_cut() == recorder.pending_cut
+
+
+def test_no_cut_before_the_minimum_length(recorder):
+    run_vad(recorder, np.zeros(int(recorder.chunk_min_duration * RATE) - BUFFER, dtype=np.int16))
+
+    assert recorder.pending_cut is None
+    assert recorder._next_chunk_cut() is None
+
+
+def test_cut_is_forced_at_the_maximum_length(recorder):
+    # VAD fell behind - no pause is known, only the length
+    recorder.audio_buffer.write(np.zeros(int(recorder.chunk_max_duration * RATE) + BUFFER, dtype=np.int16))
+
+    assert recorder._next_chunk_cut() == int(recorder.chunk_max_duration * RATE)
+
+
+def test_audio_that_piled_up_is_cut_into_chunks_of_the_maximum_length(recorder):
+    chunks = []
+    max_samples = int(recorder.chunk_max_duration * RATE)
+    recorder.trim_silence = False
+    recorder.set_chunk_callback(lambda chunk_audio, segment_map, chunk_boundary: chunks.append(chunk_boundary))
+    recorder.is_recording = True
+
+    # Dispatch was held up for 2.5 chunks' worth of audio, then catches up
+    recorder.audio_buffer.write(np.zeros(max_samples * 5 // 2, dtype=np.int16))
+    recorder._notify_chunk_monitor()
+    deadline = time.time() + 5
+    while recorder.chunk_buffer_start < 2 * max_samples and time.time() < deadline:
+        time.sleep(0.01)
+    recorder.is_recording = False
+    assert recorder.wait_for_dispatch(timeout=5)
+
+    assert recorder.chunk_buffer_start == 2 * max_samples
+    assert chunks == [0.0, recorder.chunk_max_duration]
+
+
+def test_streaming_releases_audio_it_has_read(recorder):
+    capacity = recorder.audio_buffer.capacity
+    recorder.is_recording = True
+    stream = recorder.stream_audio()
+    piece = np.zeros(RATE, dtype=np.int16)
+
+    # Three times the ring buffer's capacity, read as it arrives
+    for _ in range(3 * capacity // RATE):
+        recorder.audio_buffer.write(piece)
+        assert len(next(stream)) == RATE
+
+    assert recorder.audio_buffer.capacity == capacity
+    assert recorder.audio_buffer.retained_from >= recorder.audio_buffer.write_pos - RATE
+    assert recorder.stop_recording() is None  # No tail to re-read and throw away
+    assert list(stream) == []
+
+
+class RecordedSyntheticSource(SyntheticAudioSource):
+    """Synthetic source that also keeps every buffer it delivered (under `lock`, with the delivery)"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.lock = threading.Lock()
+        self.delivered = []
+
+    def open(self, callback):
+        def deliver(in_data):
+            with self.lock:
+                callback(in_data)
+                self.delivered.append(in_data)
+        super().open(deliver)
+
+
+def test_warm_start_begins_with_the_preroll_and_keeps_vad_contiguous(monkeypatch):
+    monkeypatch.setattr(config, "AUDIO_WARM_STREAM", True)
+    source = RecordedSyntheticSource(kind="tone", speed=10.0)
+    recorder = AudioRecorder(source=source)
+    vad_calls = []
+    run_vad = recorder._run_vad
+
+    def recording_vad(session_id, position, audio_data):
+        vad_calls.append((session_id, position, len(audio_data)))
+        return run_vad(session_id, position, audio_data)
+
+    recorder._run_vad = recording_vad
+    preroll_samples = RATE * config.AUDIO_PREROLL_MS // 1000
+    try:
+        # Idle until the pre-roll ring is full
+        deadline = time.time() + 5
+        while len(source.delivered) * BUFFER < 2 * preroll_samples and time.time() < deadline:
+            time.sleep(0.01)
+        with source.lock:
+            recorder.start_recording()
+            idle = np.frombuffer(b"".join(source.delivered), dtype=np.int16)
+
+        assert recorder.audio_buffer.write_pos == preroll_samples
+        assert np.array_equal(recorder.audio_buffer.view(0, preroll_samples), idle[-preroll_samples:])
+        assert recorder.preroll.write_pos == 0
+
+        # Live buffers follow the pre-roll, and VAD reads the session without gaps
+        while recorder.audio_buffer.write_pos < preroll_samples + RATE // 2 and time.time() < deadline:
+            time.sleep(0.01)
+        recorder.stop_recording()
+        while recorder.vad_position < recorder.audio_buffer.write_pos - BUFFER and time.time() < deadline:
+            time.sleep(0.01)
+
+        session = [(position, count) for session_id, position, count in vad_calls if session_id == recorder.session_id]
+        assert session[0][0] == 0 and session[0][1] >= preroll_samples  # May be merged with the next buffers
+        assert all(position == previous + count for (previous, count), (position, _) in zip(session, session[1:]))
+        assert recorder.dropped_raw_frames == 0
+    finally:
+        recorder.cleanup()
@@ -0,0 +1,58 @@
+"""
+Tests for audio_resampler.py - chunked vs one-shot output, rates and downmixing
+"""
+import numpy as np
+import pytest
+
+from audio_resampler import StreamingResampler
+
+
+def tone(rate, seconds=0.5, frequency=440.0, channels=1):
+    t = np.arange(int(rate * seconds)) / rate
+    mono = (8000 * np.sin(2 * np.pi * frequency * t)).astype(np.int16)
+    return np.repeat(mono, channels) if channels > 1 else mono
+
+
+@pytest.mark.parametrize("rate", [48000, 44100, 22050, 8000])
+def test_chunked_output_matches_one_shot(rate):
+    audio = tone(rate)
+    one_shot = StreamingResampler(rate, output_rate=16000).process(audio)
+
+    resampler = StreamingResampler(rate, output_rate=16000)
+    sizes = [1, 7, 160, 441, 1024, 3]
+    chunks = []
+    position = 0
+    while position < len(audio):
+        size = sizes[len(chunks) % len(sizes)]
+        chunks.append(resampler.process(audio[position:position + size]))
+        position += size
+
+    assert np.array_equal(np.concatenate(chunks), one_shot)
+    assert abs(len(one_shot) - len(audio) * 16000 / rate) <= 1
+
+
+def test_tone_keeps_its_frequency_and_level():
+    output = StreamingResampler(44100, output_rate=16000).process(tone(44100, seconds=1.0))
+    steady = output[1000:-1000].astype(np.float64)
+
+    spectrum = np.abs(np.fft.rfft(steady))
+    peak = np.argmax(spectrum) * 16000 / len(steady)
+    assert abs(peak - 440.0) < 2.0
+    assert abs(np.max(np.abs(steady)) - 8000) < 200
+
+
+def test_stereo_bytes_are_downmixed():
+    audio = tone(48000, channels=2)
+    stereo = StreamingResampler(48000, input_channels=2, output_rate=16000).process(audio.tobytes())
+    mono = StreamingResampler(48000, output_rate=16000).process(audio[::2])
+
+    assert np.array_equal(stereo, mono)
+
+
+def test_reset_starts_a_new_stream():
+    resampler = StreamingResampler(48000, output_rate=16000)
+    first = resampler.process(tone(48000))
+    resampler.process(tone(48000, frequency=1000.0))
+    resampler.reset()
+
+    assert np.array_equal(resampler.process(tone(48000)), first)
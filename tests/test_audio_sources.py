@@ -0,0 +1,54 @@
+"""
+Tests for audio_sources.py - the source interface, files and synthetic signals
+"""
+import wave
+
+import numpy as np
+import pytest
+
+import config
+from audio_sources import AudioSource, FileAudioSource, SyntheticAudioSource, _ThreadedSource
+
+
+def test_incomplete_sources_fail_when_constructed():
+    class NoRead(_ThreadedSource):
+        pass
+
+    class NoActive(AudioSource):
+        def open(self, callback):
+            pass
+
+        def close(self):
+            pass
+
+    for source in (AudioSource, NoRead, NoActive):
+        with pytest.raises(TypeError):
+            source()
+
+
+def test_synthetic_source_delivers_buffers_until_its_duration():
+    source = SyntheticAudioSource(kind="tone", duration=0.5, speed=None)
+    buffers = []
+    source.open(buffers.append)
+    assert source.finished.wait(timeout=5)
+    source.close()
+
+    audio = np.frombuffer(b"".join(buffers), dtype=np.int16)
+    assert len(audio) == config.AUDIO_SAMPLE_RATE // 2
+    assert all(len(buffer) <= 2 * config.AUDIO_CHUNK_SIZE for buffer in buffers)
+    assert not source.is_active()
+
+
+def test_file_source_converts_to_the_pipeline_format(tmp_path):
+    path = tmp_path / "stereo.wav"
+    t = np.arange(48000) / 48000
+    tone = (3000 * np.sin(2 * np.pi * 440 * t)).astype(np.int16)
+    with wave.open(str(path), "wb") as wav_file:
+        wav_file.setnchannels(2)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(48000)
+        wav_file.writeframes(np.repeat(tone, 2).tobytes())
+
+    samples = FileAudioSource(path, speed=None).samples
+    assert abs(len(samples) - config.AUDIO_SAMPLE_RATE) <= 1
+    assert 2500 < np.max(np.abs(samples[1000:-1000])) < 3500
@@ -0,0 +1,83 @@
+"""
+Tests for batch_transcriber.py - lone chunks, batching a backlog and the decode limit
+"""
+import threading
+import time
+
+import numpy as np
+
+from batch_transcriber import BatchTranscriber
+from transcription_queue import TranscriptionQueue
+
+
+class FakeSpeechToText:
+    """Decodes a chunk to one word, its first sample, and tracks how many decodes overlap"""
+
+    def __init__(self, decode_seconds=0.02):
+        self.decode_seconds = decode_seconds
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+
+    def _decode(self, chunks):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(self.decode_seconds)
+        with self.lock:
+            self.running -= 1
+        return [[(0.0, 0.1, f" w{chunk[0]}")] for chunk in chunks]
+
+    def transcribe_words(self, audio_data, segment_map=None, profile=None):
+        return self._decode([audio_data])[0]
+
+    def transcribe_words_batch(self, audio_data, clips, profile=None):
+        return self._decode([audio_data[start:end] for start, end, _ in clips])
+
+
+def chunk(n):
+    return np.full(160, n, dtype=np.int16)
+
+
+def test_lone_chunk_is_not_held_for_the_deadline():
+    batcher = BatchTranscriber(FakeSpeechToText(decode_seconds=0), deadline=5.0, backlog=lambda: 1)
+    start = time.perf_counter()
+
+    assert batcher.transcribe_words(chunk(7)) == [(0.0, 0.1, " w7")]
+    assert time.perf_counter() - start < 1.0
+    assert batcher.batch_sizes == [1]
+    batcher.shutdown()
+
+
+def test_queue_backlog_is_batched_within_the_concurrency_limit():
+    stt = FakeSpeechToText()
+    results = []
+    transcription_queue = None
+    batcher = BatchTranscriber(stt, max_batch=4, deadline=0.5, backlog=lambda: transcription_queue.pending,
+                               concurrency=1)
+    transcription_queue = TranscriptionQueue(max_workers=batcher.callers, max_pending=8,
+                                             on_result=lambda sequence, words: results.append(words))
+
+    futures = [transcription_queue.submit(batcher.transcribe_words, chunk(n)) for n in range(8)]
+    for future in futures:
+        future.result(timeout=10)
+
+    assert results == [[(0.0, 0.1, f" w{n}")] for n in range(8)]
+    assert stt.max_running == 1
+    assert max(batcher.batch_sizes) > 1
+    batcher.shutdown()
+    transcription_queue.shutdown()
+
+
+def test_concurrency_bounds_parallel_decodes():
+    stt = FakeSpeechToText()
+    batcher = BatchTranscriber(stt, max_batch=1, concurrency=2)
+    threads = [threading.Thread(target=batcher.transcribe_words, args=(chunk(n),)) for n in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+
+    assert stt.max_running == 2
+    assert batcher.batch_sizes == [1] * 6
+    batcher.shutdown()
@@ -0,0 +1,54 @@
+"""
+Tests for speech_segments.py - speech timeline and speech-only audio
+"""
+import numpy as np
+from speech_segments import SegmentMap, SpeechTimeline, compact_speech
+
+RATE = 16000
+
+
+def test_unclassified_audio_is_kept():
+    timeline = SpeechTimeline()
+    timeline.add_speech(0, int(1.0 * RATE))
+    timeline.mark_classified(int(2.0 * RATE))
+
+    # Everything past the classified end counts as speech
+    assert timeline.speech_ranges(0, 5 * RATE, 0, 0) == [[0, RATE], [2 * RATE, 5 * RATE]]
+
+
+def test_gap_recorded_as_speech_is_kept():
+    timeline = SpeechTimeline()
+    timeline.add_speech(0, int(1.0 * RATE))
+    # Buffers [1s, 4s) were dropped before VAD - recorded as speech, not as silence
+    timeline.add_speech(int(1.0 * RATE), int(4.0 * RATE))
+    timeline.mark_classified(5 * RATE)
+
+    assert timeline.speech_ranges(0, 5 * RATE, 0, 0) == [[0, 4 * RATE]]
+
+
+def test_short_silences_and_padding_are_kept():
+    timeline = SpeechTimeline()
+    timeline.add_speech(RATE, 2 * RATE)
+    timeline.add_speech(2 * RATE + 100, 3 * RATE)
+    timeline.mark_classified(10 * RATE)
+
+    assert timeline.speech_ranges(0, 10 * RATE, 50, 200) == [[RATE - 50, 3 * RATE + 50]]
+
+
+def test_compact_speech_maps_back_to_recording_time():
+    audio = np.arange(4 * RATE, dtype=np.int16)
+    compacted, segment_map = compact_speech(audio, 0, [[0, RATE], [3 * RATE, 4 * RATE]])
+
+    assert len(compacted) == 2 * RATE
+    assert segment_map.compacted
+    assert segment_map.to_original(0.5) == 0.5
+    assert segment_map.to_original(1.5) == 3.5
+
+
+def test_compact_speech_without_cuts_returns_the_original():
+    audio = np.zeros(RATE, dtype=np.int16)
+    compacted, segment_map = compact_speech(audio, RATE, [[RATE, 2 * RATE]])
+
+    assert compacted is audio
+    assert not segment_map.compacted
+    assert segment_map.to_original(0.25) == SegmentMap.identity(1.0, 1.0).to_original(0.25) == 1.25
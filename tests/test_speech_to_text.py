@@ -0,0 +1,107 @@
+"""
+Tests for speech_to_text.py - background loading, with a backend that fakes slow model loads
+"""
+import threading
+import time
+
+import numpy as np
+import pytest
+
+import config
+from asr_backends import ASRBackend, Segment
+
+speech_to_text = pytest.importorskip("speech_to_text")
+
+
+class SlowLoadingBackend(ASRBackend):
+    name = "fake"
+    label = "Fake"
+
+    def __init__(self):
+        self.loads = []
+
+    def model_name(self, partial=False):
+        return "fake-model"
+
+    def load(self, name, settings, cpu_threads):
+        time.sleep(0.2)
+        self.loads.append(name)
+        return name
+
+    def transcribe(self, model, audio_data, settings, word_timestamps=False, vad_filter=True, initial_prompt=None):
+        return [Segment(" hello", [(0.0, 0.4, " hello")])]
+
+
+@pytest.fixture
+def stt(monkeypatch):
+    monkeypatch.setattr(config, "ASR_WARMUP", False)
+    monkeypatch.setattr(config, "ASR_CACHE", False)
+    monkeypatch.setattr(config, "ASR_AUTO_TUNE", False)
+    monkeypatch.setattr(config, "ASR_STREAMING", False)
+    backend = SlowLoadingBackend()
+    monkeypatch.setattr(speech_to_text, "get_backend", lambda name=None: backend)
+    return speech_to_text.SpeechToText()
+
+
+def test_construction_loads_nothing(stt):
+    assert stt.backend.loads == []
+    assert not stt.ready.is_set()
+
+
+def test_load_sets_ready_and_records_its_duration(stt):
+    stt.load()
+
+    assert stt.ready.is_set()
+    assert stt.backend.loads == ["fake-model"]
+    assert stt.load_seconds >= 0.2
+
+
+def test_transcription_during_a_background_load_waits_for_the_same_model(stt):
+    loader = threading.Thread(target=stt.load)
+    loader.start()
+    time.sleep(0.05)  # The loader holds the load lock
+
+    words = stt.transcribe_words(np.zeros(config.AUDIO_SAMPLE_RATE, dtype=np.int16), offset=2.0)
+    loader.join(timeout=5)
+
+    assert words == [(2.0, 2.4, " hello")]
+    assert stt.backend.loads == ["fake-model"]  # Loaded once, not again by the transcription
+
+
+class BatchingBackend(SlowLoadingBackend):
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+        self.singles = []
+
+    def load(self, name, settings, cpu_threads):
+        return name
+
+    def batch_clip_seconds(self, model):
+        return 30
+
+    def transcribe(self, model, audio_data, settings, word_timestamps=False, vad_filter=True, initial_prompt=None):
+        seconds = len(audio_data) / config.AUDIO_SAMPLE_RATE
+        self.singles.append(seconds)
+        return [Segment(" long", [(seconds - 0.5, seconds, " long")])]
+
+    def transcribe_batch(self, model, audio_data, clips, settings):
+        self.batches.append([(end - start) / config.AUDIO_SAMPLE_RATE for start, end in clips])
+        return [Segment(" short", [(start / config.AUDIO_SAMPLE_RATE + 0.1, start / config.AUDIO_SAMPLE_RATE + 0.3,
+                                    " short")]) for start, end in clips]
+
+
+def test_clips_longer_than_the_batch_window_are_decoded_alone(stt):
+    stt.backend = BatchingBackend()
+    rate = config.AUDIO_SAMPLE_RATE
+    lengths = [5 * rate, 31 * rate, 5 * rate]
+    starts = np.cumsum([0] + lengths[:-1])
+    clips = [(start, start + length, None) for start, length in zip(starts, lengths)]
+
+    results = stt.transcribe_words_batch(np.zeros(sum(lengths), dtype=np.int16), clips)
+
+    assert stt.backend.batches == [[5.0, 5.0]]
+    assert stt.backend.singles == [31.0]
+    assert [words[0][2] for words in results] == [" short", " long", " short"]
+    assert results[1] == [(30.5, 31.0, " long")]
+    assert results[2][0][:2] == pytest.approx((0.1, 0.3))  # Relative to its own clip
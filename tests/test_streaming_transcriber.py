@@ -0,0 +1,105 @@
+"""
+Tests for streaming_transcriber.py - local agreement, window trimming and flushing
+"""
+import numpy as np
+
+import config
+from streaming_transcriber import StreamingTranscriber
+
+RATE = config.AUDIO_SAMPLE_RATE
+WORD_SECONDS = 0.5
+
+
+class ScriptedDecoder:
+    """Hears word i in [0.5i + 0.05, 0.5i + 0.45) of the recording, records window lengths"""
+
+    def __init__(self, words):
+        self.words = words
+        self.windows = []
+
+    def __call__(self, audio, offset=0.0, initial_prompt=None):
+        self.windows.append(len(audio) / RATE)
+        end = offset + len(audio) / RATE
+        heard = []
+        for i, word in enumerate(self.words):
+            start = i * WORD_SECONDS + 0.05
+            if start >= offset - 0.01 and start + 0.4 <= end + 1e-6:
+                heard.append((start, start + 0.4, f" {word}"))
+        return heard
+
+
+def stream(transcriber, seconds, piece=0.1):
+    events = []
+    for _ in range(int(round(seconds / piece))):
+        event = transcriber.feed(np.zeros(int(piece * RATE), dtype=np.int16))
+        if event is not None:
+            events.append(event)
+    events.append(transcriber.flush())
+    return events
+
+
+def test_streams_the_whole_transcript():
+    words = [f"w{i}" for i in range(40)]
+    transcriber = StreamingTranscriber(ScriptedDecoder(words), step=0.3, max_window=15.0, prompt_chars=0)
+    events = stream(transcriber, len(words) * WORD_SECONDS)
+
+    assert events[-1].is_final
+    assert events[-1].committed == " ".join(words)
+
+
+def test_committed_text_only_grows():
+    words = [f"w{i}" for i in range(20)]
+    transcriber = StreamingTranscriber(ScriptedDecoder(words), step=0.3, prompt_chars=0)
+    events = stream(transcriber, len(words) * WORD_SECONDS)
+
+    committed = [event.committed for event in events]
+    assert all(later.startswith(earlier) for earlier, later in zip(committed, committed[1:]))
+
+
+def test_window_is_cut_back_once_text_is_committed():
+    words = [f"w{i}" for i in range(60)]
+    decoder = ScriptedDecoder(words)
+    transcriber = StreamingTranscriber(decoder, step=0.3, max_window=15.0, prompt_chars=0, trim_seconds=2.0)
+    stream(transcriber, len(words) * WORD_SECONDS)
+
+    # Decodes stay near trim_seconds plus the unagreed words, far below max_window
+    assert max(decoder.windows) < 4.0
+    assert sum(decoder.windows) / len(decoder.windows) < 3.0
+
+
+def test_flush_only_decodes_the_last_words():
+    words = [f"w{i}" for i in range(30)]
+    decoder = ScriptedDecoder(words)
+    transcriber = StreamingTranscriber(decoder, step=0.3, prompt_chars=0)
+    events = stream(transcriber, len(words) * WORD_SECONDS)
+
+    assert decoder.windows[-1] < 4.0
+    assert len(events[-1].new_words) < 8
+
+
+def test_disagreeing_word_stays_tentative():
+    class Flicker(ScriptedDecoder):
+        def __call__(self, audio, offset=0.0, initial_prompt=None):
+            heard = super().__call__(audio, offset, initial_prompt)
+            if heard:
+                start, end, _ = heard[-1]
+                heard[-1] = (start, end, f" guess{len(self.windows)}")  # Last word changes on every decode
+            return heard
+
+    transcriber = StreamingTranscriber(Flicker(["a", "b", "c", "d"]), step=0.3, prompt_chars=0)
+    events = [transcriber.feed(np.zeros(int(0.3 * RATE), dtype=np.int16)) for _ in range(7)]
+    last = events[-1]
+
+    assert "guess" not in last.committed
+    assert last.tentative.endswith(f"guess{len(transcriber.decode.windows)}")
+
+
+def test_tiered_commits_finalized_words():
+    words = [f"w{i}" for i in range(20)]
+    fast = ScriptedDecoder(words)
+    accurate = ScriptedDecoder([word.upper() for word in words])
+    transcriber = StreamingTranscriber(fast, step=0.3, prompt_chars=0, finalize=accurate, finalize_seconds=2.0)
+    events = list(transcriber.stream(np.zeros(int(0.1 * RATE), dtype=np.int16)
+                                     for _ in range(int(len(words) * WORD_SECONDS / 0.1))))
+
+    assert events[-1].committed == " ".join(word.upper() for word in words)
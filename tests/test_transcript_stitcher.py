@@ -0,0 +1,37 @@
+"""
+Tests for transcript_stitcher.py - splitting overlaps between chunks
+"""
+import pytest
+
+from transcript_stitcher import TranscriptStitcher
+
+
+def test_overlap_is_split_at_its_middle():
+    stitcher = TranscriptStitcher(overlap=1.0)
+    # The second chunk starts at 5s and re-hears 4-5s; both chunks heard " two" and " three"
+    stitcher.add_chunk(5.0, [(4.1, 4.3, " two"), (4.6, 4.95, " three"), (5.2, 5.5, " four")])
+    stitcher.add_chunk(0.0, [(0.5, 1.0, " one"), (4.1, 4.4, " two"), (4.6, 4.9, " three")])
+
+    assert stitcher.get_text() == "one two three four"
+    assert stitcher.get_words()[1] == (4.1, 4.4, " two")    # Center 4.25 - first half, first chunk
+    assert stitcher.get_words()[2] == (4.6, 4.95, " three")  # Center 4.775 - second half, second chunk
+
+
+def test_duplicate_boundary_raises():
+    stitcher = TranscriptStitcher(overlap=1.0)
+    stitcher.add_chunk(0.0, [(0.5, 1.0, " one")])
+
+    with pytest.raises(ValueError):
+        stitcher.add_chunk(0.0, [(0.5, 1.0, " uno")])
+    assert stitcher.get_text() == "one"
+
+
+def test_replace_updates_a_growing_chunk():
+    stitcher = TranscriptStitcher(overlap=1.0)
+    stitcher.add_chunk(0.0, [(0.5, 1.0, " one")], replace=True)
+    stitcher.add_chunk(0.0, [(0.5, 1.0, " one"), (1.2, 1.6, " two")], replace=True)
+
+    assert stitcher.get_text() == "one two"
+    assert len(stitcher) == 1
+    stitcher.reset()
+    assert stitcher.get_text() == ""
@@ -0,0 +1,56 @@
+"""
+Tests for transcription_cache.py - keys, memory LRU and the disk tier
+"""
+import numpy as np
+import pytest
+
+import config
+from transcription_cache import TranscriptionCache
+
+AUDIO = np.arange(1600, dtype=np.int16)
+
+
+def test_key_depends_on_audio_and_every_setting():
+    cache = TranscriptionCache()
+    key = cache.key(AUDIO, model="small", compute_type="int8")
+
+    assert cache.key(AUDIO.copy(), model="small", compute_type="int8") == key
+    assert cache.key(AUDIO + 1, model="small", compute_type="int8") != key
+    assert cache.key(AUDIO, model="base", compute_type="int8") != key
+    assert cache.key(AUDIO, model="small", compute_type="float32") != key
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = TranscriptionCache(max_entries=2)
+    cache.put("a", "A")
+    cache.put("b", "B")
+    cache.get("a")
+    cache.put("c", "C")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "A" and cache.get("c") == "C"
+    assert (cache.hits, cache.misses) == (3, 1)
+    assert cache.hit_rate == 0.75
+
+
+def test_disk_tier_survives_a_new_cache_and_keeps_its_cap(tmp_path):
+    cache = TranscriptionCache(directory=tmp_path, max_disk_bytes=200)
+    for i in range(10):
+        cache.put(f"key{i}", "x" * 40)
+
+    assert cache.disk_bytes <= 200
+    reopened = TranscriptionCache(directory=tmp_path, max_disk_bytes=200)
+    assert reopened.get("key9") == "x" * 40
+    assert reopened.get("key0") is None
+
+
+def test_speech_to_text_key_follows_compute_type(monkeypatch):
+    speech_to_text = pytest.importorskip("speech_to_text")
+    monkeypatch.setattr(config, "ASR_BACKEND", "faster-whisper")
+    stt = speech_to_text.SpeechToText()
+    stt.backend.tuning = None
+    key = stt._cache_key(AUDIO, "words", None, False)
+
+    # Same model after a re-tune to another compute type must not hit
+    monkeypatch.setattr(config, "ASR_COMPUTE_TYPE", "float32")
+    assert stt._cache_key(AUDIO, "words", None, False) != key
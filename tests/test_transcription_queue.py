@@ -0,0 +1,97 @@
+"""
+Tests for transcription_queue.py - in-order delivery, the worker limit and backpressure
+"""
+import threading
+import time
+
+import pytest
+
+from transcription_queue import TranscriptionQueue
+
+
+def test_results_are_delivered_in_submission_order():
+    delivered = []
+    transcription_queue = TranscriptionQueue(max_workers=4, max_pending=4,
+                                             on_result=lambda sequence, result: delivered.append((sequence, result)))
+
+    # Later jobs finish first
+    futures = [transcription_queue.submit(lambda n: time.sleep(0.04 * (4 - n)) or n, n) for n in range(4)]
+    assert [future.result(timeout=5) for future in futures] == [0, 1, 2, 3]
+
+    assert delivered == [(n, n) for n in range(4)]
+    transcription_queue.shutdown()
+
+
+def test_at_most_max_workers_jobs_run():
+    lock = threading.Lock()
+    running = []
+    most = []
+
+    def job():
+        with lock:
+            running.append(1)
+            most.append(len(running))
+        time.sleep(0.02)
+        with lock:
+            running.pop()
+
+    transcription_queue = TranscriptionQueue(max_workers=2, max_pending=6)
+    futures = [transcription_queue.submit(job) for _ in range(6)]
+    for future in futures:
+        future.result(timeout=5)
+
+    assert max(most) == 2
+    transcription_queue.shutdown()
+
+
+def test_submit_blocks_when_full_and_backpressure_is_signalled():
+    events = []
+    release = threading.Event()
+    transcription_queue = TranscriptionQueue(max_workers=1, max_pending=2, on_backpressure=events.append)
+    transcription_queue.submit(release.wait, 5)
+    transcription_queue.submit(lambda: None)
+    assert events == [True]
+
+    blocked = threading.Thread(target=transcription_queue.submit, args=(lambda: None,))
+    blocked.start()
+    blocked.join(timeout=0.2)
+    assert blocked.is_alive()  # No slot until a job is delivered
+
+    release.set()
+    blocked.join(timeout=5)
+    assert not blocked.is_alive()
+    transcription_queue.shutdown()
+    for worker in transcription_queue.workers:
+        worker.join(timeout=5)
+    assert events[-1] is False and transcription_queue.pending == 0
+
+
+def test_backlog_seconds_count_as_falling_behind():
+    events = []
+    release = threading.Event()
+    transcription_queue = TranscriptionQueue(max_workers=1, max_pending=10, max_backlog=5.0,
+                                             on_backpressure=events.append)
+    future = transcription_queue.submit(release.wait, 5, duration=6.0)
+
+    assert transcription_queue.is_behind and events == [True]
+    release.set()
+    future.result(timeout=5)
+    assert events == [True, False] and transcription_queue.backlog_seconds == 0
+    transcription_queue.shutdown()
+
+
+def test_failed_job_does_not_stall_later_results():
+    delivered = []
+    transcription_queue = TranscriptionQueue(max_workers=2, on_result=lambda sequence, result: delivered.append(result))
+
+    def fail():
+        raise RuntimeError("decoder crashed")
+
+    failed = transcription_queue.submit(fail)
+    later = transcription_queue.submit(lambda: "words")
+
+    assert later.result(timeout=5) == "words"
+    with pytest.raises(RuntimeError):
+        failed.result()
+    assert delivered == ["words"]
+    transcription_queue.shutdown()
@@ -0,0 +1,77 @@
+"""
+Transcript stitcher - merges overlapping chunk transcriptions using word timestamps
+"""
+import threading
+
+
+class TranscriptStitcher:
+    """
+    Combine word-timestamped transcriptions of overlapping audio chunks.
+
+    Each chunk is transcribed with `overlap` seconds of audio before its
+    boundary (the cut that closed the previous chunk). Words inside the
+    overlap are heard by both chunks, so the overlap is split at its middle:
+    a word belongs to the chunk whose half contains the word's center.
+    Chunks can be added in any order, but only once per boundary.
+    """
+
+    def __init__(self, overlap):
+        """
+        Initialize stitcher
+
+        Args:
+            overlap: Seconds of audio each chunk shares with the previous one
+        """
+        self.overlap = overlap
+        self.chunks = {}  # Chunk boundary (s) -> list of (start, end, word)
+        self.lock = threading.Lock()
+
+    def reset(self):
+        """Forget all chunks (start of a new recording)"""
+        with self.lock:
+            self.chunks = {}
+
+    def add_chunk(self, boundary, words, replace=False):
+        """
+        Add the words of one chunk
+
+        Args:
+            boundary: Time (s) where the chunk's own audio begins
+            words: List of (start, end, word) tuples with times since recording start
+            replace: Replace the words of a chunk added before (a transcript that grows, e.g. streaming)
+
+        Raises:
+            ValueError: A chunk with this boundary was added already (two cuts of the same audio)
+        """
+        with self.lock:
+            if boundary in self.chunks and not replace:
+                raise ValueError(f"Chunk at {boundary:.2f}s was added twice")
+            self.chunks[boundary] = list(words)
+
+    def __len__(self):
+        """Number of chunks added so far"""
+        return len(self.chunks)
+
+    def get_words(self):
+        """Get the merged (start, end, word) list in time order"""
+        with self.lock:
+            boundaries = sorted(self.chunks)
+            chunks = [self.chunks[boundary] for boundary in boundaries]
+
+        merged = []
+        for i, words in enumerate(chunks):
+            # Keep words whose center lies between the middles of the surrounding overlaps
+            keep_from = boundaries[i] - self.overlap / 2 if i > 0 else float("-inf")
+            keep_until = boundaries[i + 1] - self.overlap / 2 if i + 1 < len(boundaries) else float("inf")
+
+            for start, end, word in words:
+                center = (start + end) / 2
+                if keep_from <= center < keep_until:
+                    merged.append((start, end, word))
+
+        return merged
+
+    def get_text(self):
+        """Get the merged transcription text"""
+        # Faster-Whisper words carry their own leading space
+        return "".join(word for _, _, word in self.get_words()).strip()
@@ -0,0 +1,147 @@
+"""
+Transcription cache - remembers results for audio that was transcribed before,
+keyed on a hash of the int16 samples and everything that affects the decode
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from pathlib import Path
+import numpy as np
+
+
+class TranscriptionCache:
+    """
+    Two-tier cache for transcription results.
+
+    Keys are BLAKE2b hashes of the PCM samples plus the decode settings
+    (model, profile, language, ...), so any change to either is a miss.
+    The memory tier is an LRU of `max_entries` results. The optional disk
+    tier keeps one JSON file per result in `directory`, evicting the least
+    recently used files once they take more than `max_disk_bytes`. Values
+    must be JSON-serializable (text, or lists of word tuples).
+    """
+
+    def __init__(self, max_entries=256, directory=None, max_disk_bytes=50 * 1024 * 1024):
+        """
+        Initialize cache
+
+        Args:
+            max_entries: Results kept in memory
+            directory: Where the disk tier is kept (None = memory only)
+            max_disk_bytes: Size cap of the disk tier
+        """
+        self.max_entries = max_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # Key -> value, least recently used first
+        self.hits = 0
+        self.misses = 0
+
+        self.directory = None
+        self.disk_bytes = 0
+        if directory is not None:
+            self.directory = Path(directory)
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self.disk_bytes = sum(path.stat().st_size for path in self.directory.glob("*.json"))
+
+    def key(self, audio_data, **settings):
+        """
+        Build the cache key for a transcription
+
+        Args:
+            audio_data: numpy array of int16 audio samples
+            **settings: Everything else the result depends on (model, profile, language, ...)
+
+        Returns:
+            str: Hex digest
+        """
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(memoryview(np.ascontiguousarray(audio_data, dtype=np.int16)).cast('B'))
+        digest.update(json.dumps(settings, sort_keys=True, default=repr).encode())
+        return digest.hexdigest()
+
+    def get(self, key):
+        """Get a cached result (None on a miss), counts the hit or miss"""
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+
+        value = self._read_disk(key)
+        with self.lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._remember(key, value)
+        return value
+
+    def put(self, key, value):
+        """Store a result in both tiers"""
+        with self.lock:
+            self._remember(key, value)
+        self._write_disk(key, value)
+
+    @property
+    def hit_rate(self):
+        """Share of lookups that were hits (0.0 before the first lookup)"""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def clear(self):
+        """Forget every result, in memory and on disk (counters are kept)"""
+        with self.lock:
+            self.entries.clear()
+            if self.directory is not None:
+                for path in self.directory.glob("*.json"):
+                    path.unlink(missing_ok=True)
+                self.disk_bytes = 0
+
+    def _remember(self, key, value):
+        """Add to the memory LRU (lock held)"""
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def _read_disk(self, key):
+        if self.directory is None:
+            return None
+        path = self.directory / f"{key}.json"
+        try:
+            value = json.loads(path.read_text(encoding="utf-8"))
+            path.touch()  # Most recently used
+        except (OSError, ValueError):
+            return None
+        return value
+
+    def _write_disk(self, key, value):
+        if self.directory is None:
+            return
+        path = self.directory / f"{key}.json"
+        data = json.dumps(value)
+        try:
+            with self.lock:
+                if path.exists():
+                    self.disk_bytes -= path.stat().st_size
+                path.write_text(data, encoding="utf-8")
+                self.disk_bytes += path.stat().st_size
+                if self.disk_bytes > self.max_disk_bytes:
+                    self._evict_disk()
+        except OSError as e:
+            print(f"[TranscriptionCache] Could not write {path.name}: {e}")
+
+    def _evict_disk(self):
+        """Delete least recently used files until the disk tier fits its cap (lock held)"""
+        files = sorted(self.directory.glob("*.json"), key=lambda path: path.stat().st_mtime)
+        for path in files:
+            if self.disk_bytes <= self.max_disk_bytes:
+                break
+            try:
+                size = path.stat().st_size
+                path.unlink()
+                self.disk_bytes -= size
+            except OSError:
+                pass
@@ -0,0 +1,156 @@
+"""
+Transcription queue - bounded pool of ASR workers that delivers results in the
+order jobs were submitted (audio order), whatever order they finish in
+"""
+import queue
+import threading
+from concurrent.futures import Future
+
+
+class TranscriptionQueue:
+    """
+    Ordered, bounded executor for chunk transcriptions.
+
+    Every job gets a sequence number when it is submitted. Finished jobs wait
+    in a reorder buffer until all earlier jobs are done, then on_result is
+    called for them strictly in sequence order. A job's Future completes only
+    after its result was delivered, so once a Future is done every earlier
+    result has been delivered too.
+
+    At most `max_workers` jobs run at once. submit() blocks while
+    `max_pending` jobs are unfinished, and on_backpressure(True) is called
+    when the queue falls behind (too many jobs or too much untranscribed
+    audio), on_backpressure(False) once it has caught up.
+    """
+
+    def __init__(self, max_workers=1, max_pending=4, max_backlog=30.0,
+                 on_result=None, on_backpressure=None):
+        """
+        Initialize transcription queue
+
+        Args:
+            max_workers: Jobs transcribed at the same time
+            max_pending: Unfinished jobs allowed before submit() blocks
+            max_backlog: Seconds of queued audio considered "falling behind"
+            on_result: Called as on_result(sequence, result) in submission order
+            on_backpressure: Called as on_backpressure(is_behind) when that changes
+        """
+        self.max_pending = max_pending
+        self.max_backlog = max_backlog
+        self.on_result = on_result
+        self.on_backpressure = on_backpressure
+
+        self.jobs = queue.Queue()
+        self.slots = threading.BoundedSemaphore(max_pending)
+        self.lock = threading.Lock()        # Protects the counters and the reorder buffer
+        self.emit_lock = threading.Lock()   # Serializes in-order delivery
+        self.next_sequence = 0              # Sequence number of the next submitted job
+        self.next_delivery = 0              # Sequence number delivered next
+        self.finished = {}                  # Sequence -> finished job waiting for earlier ones
+        self.pending = 0                    # Submitted jobs not delivered yet
+        self.backlog_seconds = 0.0          # Audio duration of those jobs
+        self.is_behind = False
+
+        self.workers = [
+            threading.Thread(target=self._run_jobs, name=f"ASR-{i + 1}", daemon=True)
+            for i in range(max_workers)
+        ]
+        for worker in self.workers:
+            worker.start()
+
+    def submit(self, fn, *args, duration=0.0, **kwargs):
+        """
+        Queue fn(*args, **kwargs), blocking while the queue is full
+
+        Args:
+            fn: Transcription function, its return value is passed to on_result
+            duration: Seconds of audio the job covers (for the backlog estimate)
+
+        Returns:
+            concurrent.futures.Future: Done once the result has been delivered
+        """
+        self.slots.acquire()
+        future = Future()
+        with self.lock:
+            sequence = self.next_sequence
+            self.next_sequence += 1
+            self.pending += 1
+            self.backlog_seconds += duration
+            changed = self._update_behind()
+        self.jobs.put((sequence, future, fn, args, kwargs, duration))
+
+        if changed:
+            self._signal_backpressure()
+        return future
+
+    def _run_jobs(self):
+        """Worker thread: run jobs as they come, hand results to the reorder buffer"""
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                break
+
+            sequence, future, fn, args, kwargs, duration = job
+            value, error = None, None
+            if future.set_running_or_notify_cancel():
+                try:
+                    value = fn(*args, **kwargs)
+                except Exception as e:
+                    error = e
+
+            with self.lock:
+                self.finished[sequence] = (future, value, error, duration)
+            self._deliver_ready()
+
+    def _deliver_ready(self):
+        """Deliver every finished job whose predecessors have all been delivered"""
+        with self.emit_lock:
+            while True:
+                with self.lock:
+                    sequence = self.next_delivery
+                    item = self.finished.pop(sequence, None)
+                    if item is None:
+                        return
+                    self.next_delivery += 1
+
+                future, value, error, duration = item
+                if error is None and not future.cancelled() and self.on_result:
+                    try:
+                        self.on_result(sequence, value)
+                    except Exception as e:
+                        print(f"[TranscriptionQueue] Result handler error: {e}")
+                elif error is not None:
+                    print(f"[TranscriptionQueue] Job {sequence} failed: {error}")
+
+                with self.lock:
+                    self.pending -= 1
+                    self.backlog_seconds -= duration
+                    changed = self._update_behind()
+                self.slots.release()
+
+                if not future.cancelled():
+                    if error is None:
+                        future.set_result(value)
+                    else:
+                        future.set_exception(error)
+                if changed:
+                    self._signal_backpressure()
+
+    def _update_behind(self):
+        """Recompute is_behind (lock held), returns True if it changed"""
+        behind = self.pending >= self.max_pending or self.backlog_seconds > self.max_backlog
+        changed = behind != self.is_behind
+        self.is_behind = behind
+        return changed
+
+    def _signal_backpressure(self):
+        if self.on_backpressure:
+            try:
+                self.on_backpressure(self.is_behind)
+            except Exception as e:
+                print(f"[TranscriptionQueue] Backpressure handler error: {e}")
+
+    def shutdown(self):
+        """Stop the workers once the jobs already queued have run"""
+        for _ in self.workers:
+            self.jobs.put(None)